@@ -1,46 +1,136 @@
 import os
 from config import settings
 from utils.logger import setup_logger
+import time
 import pandas as pd
+import numpy as np
 import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+from api.token_cache import CachedTokenManager, cache_key, shared_token_manager
 
-# Configure Environment Variables for Library
-# We also inject directly into the config module to be safe against import order.
-import kiwoom_rest_api.config
+logger = setup_logger("KiwoomAPI")
 
-# Inject settings
-kiwoom_rest_api.config.API_KEY = settings.APP_KEY
-kiwoom_rest_api.config.API_SECRET = settings.APP_SECRET
-kiwoom_rest_api.config.USE_SANDBOX = True if settings.MODE == "PAPER" else False
-# Force base URL update
-if kiwoom_rest_api.config.USE_SANDBOX:
-    kiwoom_rest_api.config.DEFAULT_BASE_URL = kiwoom_rest_api.config.SANDBOX_BASE_URL # Just to be sure the getter uses it
-else:
-    # If library uses DEFAULT_BASE_URL as fallback
-    pass 
+_lib = None
+_lib_lock = threading.Lock()
+_SANDBOX_BASE_URL = None
 
-# Import Library Components
-from kiwoom_rest_api.auth.token import TokenManager
-from kiwoom_rest_api.koreanstock.chart import Chart
-from kiwoom_rest_api.koreanstock.order import Order
-from kiwoom_rest_api.koreanstock.account import Account
-from kiwoom_rest_api.config import get_base_url # Import getter
+def _library():
+    """
+    kiwoom_rest_api, imported and configured on first use. The library pulls in
+    the HTTP stack, which offline modes (backtest, optimizers) never need.
+    """
+    global _lib, _SANDBOX_BASE_URL
+    with _lib_lock:
+        if _lib is None:
+            # Configure Environment Variables for Library
+            # We also inject directly into the config module to be safe against import order.
+            import kiwoom_rest_api.config as config
 
-logger = setup_logger("KiwoomAPI")
+            # Inject settings
+            config.API_KEY = settings.APP_KEY
+            config.API_SECRET = settings.APP_SECRET
+            config.USE_SANDBOX = True if settings.MODE == "PAPER" else False
+            _SANDBOX_BASE_URL = config.SANDBOX_BASE_URL
+
+            # Import Library Components
+            from kiwoom_rest_api.auth.token import TokenManager
+            from kiwoom_rest_api.koreanstock.chart import Chart
+            from kiwoom_rest_api.koreanstock.order import Order
+            from kiwoom_rest_api.koreanstock.account import Account
+            from kiwoom_rest_api.koreanstock.stockinfo import StockInfo
+            from kiwoom_rest_api.config import get_base_url # Import getter
+            from kiwoom_rest_api.core.sync_client import make_request
+            _lib = SimpleNamespace(config=config, TokenManager=TokenManager, Chart=Chart, Order=Order,
+                                   Account=Account, StockInfo=StockInfo, get_base_url=get_base_url,
+                                   make_request=make_request)
+    return _lib
+
+def _token_issuer(base_url, app_key, app_secret):
+    """
+    Library TokenManager bound to one server and app key. The library's own
+    token request reads them from its process-wide config, which another
+    KiwoomAPI (other mode or server) may have switched by the time this one
+    (re)issues a token.
+    """
+    lib = _library()
+
+    class BoundTokenManager(lib.TokenManager):
+        def _request_new_token(self):
+            credentials = {"appkey": app_key, "secretkey": app_secret}
+            response = lib.make_request(endpoint=f"{base_url}{lib.config.TOKEN_URL}", method="POST",
+                                        data=dict(credentials, grant_type="client_credentials"),
+                                        headers={"appkey": app_key, "appsecret": app_secret})
+            self._update_token_info(response)
+
+    return BoundTokenManager()
+
+PAGE_INTERVAL = 0.2 # Min seconds between ka10080 page requests
+
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+# ka10080 item fields per column: (field, legacy fallback)
+_OHLCV_FIELDS = [('open_pric', 'stck_oprc'), ('high_pric', 'stck_hgpr'), ('low_pric', 'stck_lwpr'),
+                 ('cur_prc', 'stck_prpr'), ('trde_qty', 'cntg_vol')]
+
+def _is_success(res):
+    # Responses carry 'rt_cd' or 'return_code' depending on the API
+    if not res:
+        return False
+    return str(res.get('rt_cd', '')) == '0' or str(res.get('return_code', '')) == '0'
+
+def _page_times(items):
+    """Bar times (YYYYMMDDHHMMSS) of one ka10080 page as a str array."""
+    return np.array([item.get('cntr_tm') or (item.get('stck_bsop_date', '') + item.get('stck_cntg_hour', ''))
+                     for item in items], dtype=str)
+
+def _to_int64(values):
+    try:
+        return np.asarray(values, dtype=str).astype(np.int64), None
+    except ValueError:
+        # Malformed values: convert one by one and flag the failures
+        out = np.zeros(len(values), dtype=np.int64)
+        ok = np.ones(len(values), dtype=bool)
+        for i, value in enumerate(values):
+            try:
+                out[i] = int(value)
+            except ValueError:
+                ok[i] = False
+        return out, ok
+
+def _parse_page_values(items):
+    """
+    Columnar parse of one ka10080 page: returns an (n, 5) int64 array of
+    open/high/low/close/volume and a bool mask of rows that parsed.
+    Prices carry the tick direction as a sign ("-70100"), so absolute values are kept.
+    """
+    values = np.empty((len(items), len(_OHLCV_FIELDS)), dtype=np.int64)
+    valid = np.ones(len(items), dtype=bool)
+    for col, (field, fallback) in enumerate(_OHLCV_FIELDS):
+        column, ok = _to_int64([item.get(field) or item.get(fallback) or 0 for item in items])
+        values[:, col] = np.abs(column)
+        if ok is not None:
+            valid &= ok
+    return values, valid
 
 class KiwoomAPI:
-    def __init__(self, mode=None):
+    def __init__(self, mode=None, base_url=None):
+        """
+        mode: "PAPER" or "REAL" (default settings.MODE).
+        base_url: Server override, e.g. a local mock server (default settings.BASE_URL_OVERRIDE).
+        """
         # Initialize Library Components
         try:
+            lib = _library()
             # 1. Determine Mode (Override or Default)
             target_mode = mode if mode else settings.MODE
             
             # 2. Configure Library Config dynamically
             # We must set this BEFORE creating TokenManager
-            kiwoom_rest_api.config.USE_SANDBOX = True if target_mode == "PAPER" else False
+            lib.config.USE_SANDBOX = True if target_mode == "PAPER" else False
             
             if target_mode == "PAPER":
-                kiwoom_rest_api.config.API_KEY = settings.APP_KEY # This maps to PAPER key in settings if MODE=PAPER, but wait.
+                lib.config.API_KEY = settings.APP_KEY # This maps to PAPER key in settings if MODE=PAPER, but wait.
                 # settings.APP_KEY is already resolved based on settings.MODE.
                 # If we want to support REAL mode while settings.MODE is PAPER, we need raw keys.
                 # Check settings.py again.
@@ -61,26 +151,44 @@ class KiwoomAPI:
             
             # Re-read keys from env to be safe
             if target_mode == "PAPER":
-                 kiwoom_rest_api.config.API_KEY = os.getenv("APP_KEY_PAPER", "")
-                 kiwoom_rest_api.config.API_SECRET = os.getenv("APP_SECRET_PAPER", "")
+                 app_key, app_secret = os.getenv("APP_KEY_PAPER", ""), os.getenv("APP_SECRET_PAPER", "")
             else:
-                 kiwoom_rest_api.config.API_KEY = os.getenv("APP_KEY_REAL", "")
-                 kiwoom_rest_api.config.API_SECRET = os.getenv("APP_SECRET_REAL", "")
+                 app_key, app_secret = os.getenv("APP_KEY_REAL", ""), os.getenv("APP_SECRET_REAL", "")
+            lib.config.API_KEY, lib.config.API_SECRET = app_key, app_secret
             
             # Force base URL update
-            if kiwoom_rest_api.config.USE_SANDBOX:
-                kiwoom_rest_api.config.DEFAULT_BASE_URL = kiwoom_rest_api.config.SANDBOX_BASE_URL
+            override = base_url or settings.BASE_URL_OVERRIDE
+            if override:
+                # The token request reads the library config, so point both URLs at the override
+                lib.config.SANDBOX_BASE_URL = override.rstrip("/")
+                lib.config.DEFAULT_BASE_URL = override.rstrip("/")
+            elif lib.config.USE_SANDBOX:
+                lib.config.SANDBOX_BASE_URL = _SANDBOX_BASE_URL
+                lib.config.DEFAULT_BASE_URL = lib.config.SANDBOX_BASE_URL
             else:
-                kiwoom_rest_api.config.DEFAULT_BASE_URL = "https://api.kiwoom.com"
+                lib.config.DEFAULT_BASE_URL = "https://api.kiwoom.com"
 
-            self.token_manager = TokenManager()
+            self.rate_limiter = None # Optional utils.rate_limiter.RateLimiter shared across threads
             
             # Explicitly get base_url to prevent double-slash issue in library
-            base_url = get_base_url()
+            base_url = lib.get_base_url()
+            
+            # One token per server/app key, shared with other instances and (via the cache file) processes.
+            # An overridden (mock/local) server gets its own token: its port and tokens don't outlive it.
+            # The issuer carries its own credentials and server, not the library's global config.
+            issuer = lambda: _token_issuer(base_url, app_key, app_secret)
+            if override:
+                self.token_manager = CachedTokenManager(issuer(), cache_key(base_url, app_key),
+                                                        refresh_margin=settings.TOKEN_REFRESH_MARGIN)
+            else:
+                self.token_manager = shared_token_manager(issuer, base_url, app_key,
+                                                          path=settings.TOKEN_CACHE_FILE or None,
+                                                          refresh_margin=settings.TOKEN_REFRESH_MARGIN)
             
-            self.chart = Chart(token_manager=self.token_manager, base_url=base_url)
-            self.order = Order(token_manager=self.token_manager, base_url=base_url)
-            self.account = Account(token_manager=self.token_manager, base_url=base_url)
+            self.chart = lib.Chart(token_manager=self.token_manager, base_url=base_url)
+            self.order = lib.Order(token_manager=self.token_manager, base_url=base_url)
+            self.account = lib.Account(token_manager=self.token_manager, base_url=base_url)
+            self.stockinfo = lib.StockInfo(token_manager=self.token_manager, base_url=base_url)
             
             logger.info(f"Kiwoom API initialized in {target_mode} mode.")
             
@@ -92,230 +200,292 @@ class KiwoomAPI:
         """
         Get OHLCV using stock_minute_chart_request_ka10080 with pagination.
         days: Number of days to fetch (default ~3 years = 1095)
+        Returns a list of dicts in ascending time (see get_ohlcv_frame).
+        """
+        df = self.get_ohlcv_frame(code, time_unit, days)
+        return None if df is None else df.to_dict('records')
+
+    def get_ohlcv_frame(self, code, time_unit="60", days=1095, strict=False):
+        """
+        Paginated ka10080 download as a DataFrame (time, open, high, low, close, volume),
+        ascending time. Returns None on error.
+        strict: also return None when a continuation page fails, instead of the pages fetched so far.
+        Pipelined: each page is parsed into typed arrays by a worker thread
+        while the next page is requested.
         """
-        import time
         try:
             target_date = (datetime.datetime.now() - datetime.timedelta(days=days)).strftime("%Y%m%d")
-            all_ohlcv = []
+            time_pages = []
+            value_pages = [] # Futures of _parse_page_values
             next_key = None
+            last_request = 0.0
             
-            while True:
-                # ka10080 params: stk_cd, tic_scope, upd_stkpc_tp, cont_yn, next_key
-                # tic_scope: "60" for 60 minutes
-                
-                kwargs = {
-                    "stk_cd": code,
-                    "tic_scope": str(time_unit),
-                    "upd_stkpc_tp": "1", # Adjusted price
-                    "cont_yn": "Y" if next_key else "N"
-                }
-                if next_key:
-                    kwargs["next_key"] = next_key
-                
-                res = self.chart.stock_minute_chart_request_ka10080(**kwargs)
-                
-                # Check success (supports 'rt_cd' or 'return_code')
-                is_success = False
-                if str(res.get('rt_cd', '')) == '0':
-                    is_success = True
-                elif str(res.get('return_code', '')) == '0':
-                    is_success = True
+            with ThreadPoolExecutor(max_workers=1) as parser:
+                while True:
+                    # ka10080 params: stk_cd, tic_scope, upd_stkpc_tp, cont_yn, next_key
+                    # tic_scope: "60" for 60 minutes
+                    kwargs = {
+                        "stk_cd": code,
+                        "tic_scope": str(time_unit),
+                        "upd_stkpc_tp": "1", # Adjusted price
+                        "cont_yn": "Y" if next_key else "N"
+                    }
+                    if next_key:
+                        kwargs["next_key"] = next_key
                     
-                if not is_success:
-                    ret_msg = res.get('return_msg', '')
-                    logger.error(f"OHLCV Error: {res}")
+                    if self.rate_limiter:
+                        # Quota shared with other threads using this API
+                        self.rate_limiter.acquire()
+                    elif next_key:
+                        # Rate limit safety, counted from the previous request's start
+                        wait = PAGE_INTERVAL - (time.monotonic() - last_request)
+                        if wait > 0:
+                            time.sleep(wait)
                     
-                    if '8001' in ret_msg or '8005' in ret_msg:
-                        logger.error("CRITICAL: Authentication failed. Please check your APP_KEY and APP_SECRET in .env file.")
-                        logger.error("If the keys are correct, the token might be expired or the server might be rate-limiting.")
+                    last_request = time.monotonic()
+                    res = self.chart.stock_minute_chart_request_ka10080(**kwargs)
                     
-                    break
+                    # Check success (supports 'rt_cd' or 'return_code')
+                    if not _is_success(res):
+                        ret_msg = res.get('return_msg', '')
+                        logger.error(f"OHLCV Error: {res}")
+                        
+                        if '8001' in ret_msg or '8005' in ret_msg:
+                            logger.error("CRITICAL: Authentication failed. Please check your APP_KEY and APP_SECRET in .env file.")
+                            logger.error("If the keys are correct, the token might be expired or the server might be rate-limiting.")
+                            # Don't keep handing out a rejected token; the next request issues a new one
+                            self.token_manager.invalidate()
+                        
+                        if strict and time_pages:
+                            return None
+                        break
+                        
+                    # output2 has list. Sometimes key is 'stk_min_pole_chart_qry'
+                    items = res.get('output2') or res.get('stk_min_pole_chart_qry') or []
                     
-                # output2 has list. Sometimes key is 'stk_min_pole_chart_qry'
-                items = res.get('output2') or res.get('stk_min_pole_chart_qry') or []
-                
-                if not isinstance(items, list):
-                    items = []
-
-                # Debug: Log item count
-                logger.info(f"Loop {len(all_ohlcv)//900 + 1}: Received {len(items)} items. Parsing...")
-                
-                batch_ohlcv = []
-                parse_errors = 0
-                
-                for item in items:
-                    # Format: cntr_tm(YYYYMMDDHHMMSS)
-                    dt_str = item.get('cntr_tm', '')
-                    # Fallback
-                    if not dt_str:
-                         dt_str = item.get('stck_bsop_date', '') + item.get('stck_cntg_hour', '')
+                    if not isinstance(items, list):
+                        items = []
+                    if not items:
+                        break
                     
-                    try:
-                        batch_ohlcv.append({
-                            'time': dt_str,
-                            'open': abs(int(item.get('open_pric') or item.get('stck_oprc') or 0)),
-                            'high': abs(int(item.get('high_pric') or item.get('stck_hgpr') or 0)),
-                            'low': abs(int(item.get('low_pric') or item.get('stck_lwpr') or 0)),
-                            'close': abs(int(item.get('cur_prc') or item.get('stck_prpr') or 0)),
-                            'volume': abs(int(item.get('trde_qty') or item.get('cntg_vol') or 0)) 
-                        })
-                    except ValueError:
-                        parse_errors += 1
-                        continue 
-                
-                logger.info(f"Loop parsed {len(batch_ohlcv)} valid rows. Errors: {parse_errors}")
-                
-                if not batch_ohlcv:
-                    break
+                    times = _page_times(items)
+                    time_pages.append(times)
+                    value_pages.append(parser.submit(_parse_page_values, items))
+                    logger.info(f"Page {len(time_pages)}: Received {len(items)} items.")
                     
-                all_ohlcv.extend(batch_ohlcv)
-                
-                # Check date condition (last item is oldest in this batch typically?)
-                # Kiwoom returns latest first. So last item is oldest.
-                last_time = batch_ohlcv[-1]['time'][:8] # YYYYMMDD
-                if last_time < target_date:
-                    logger.info(f"Reached target date {target_date} (Current: {last_time}). Stopping.")
-                    break
-                
-                # Check continuation
-                cont_yn = res.get('cont-yn', 'N') # Note: response key might be 'cont-yn' or 'next-key' existence
-                next_key = res.get('next-key', '')
-                
-                if cont_yn != 'Y' or not next_key:
-                    break
+                    # Kiwoom returns latest first: stop once the page reaches past the target date
+                    oldest = times[-1][:8]
+                    if (times.astype('U8') < target_date).any():
+                        logger.info(f"Reached target date {target_date} (Current: {oldest}). Stopping.")
+                        break
+                    
+                    # Check continuation
+                    cont_yn = res.get('cont-yn', 'N') # Note: response key might be 'cont-yn' or 'next-key' existence
+                    next_key = res.get('next-key', '')
                     
-                logger.info(f"Fetching continuation... (oldest: {last_time})")
-                time.sleep(0.2) # Rate limit safety
+                    if cont_yn != 'Y' or not next_key:
+                        break
+                        
+                    logger.info(f"Fetching continuation... (oldest: {oldest})")
                 
-            return all_ohlcv[::-1] # Convert to Ascending Time
+                parsed = [future.result() for future in value_pages]
+            
+            if not parsed:
+                return pd.DataFrame(columns=['time'] + OHLCV_COLUMNS)
+            
+            times = np.concatenate(time_pages)
+            values = np.concatenate([page for page, _ in parsed])
+            valid = np.concatenate([mask for _, mask in parsed])
+            logger.info(f"Parsed {valid.sum()} valid rows. Errors: {(~valid).sum()}")
+            
+            # Convert to Ascending Time
+            df = pd.DataFrame(values[valid][::-1], columns=OHLCV_COLUMNS)
+            df.insert(0, 'time', times[valid][::-1].astype(object))
+            return df
             
         except Exception as e:
             logger.error(f"Error fetching OHLCV: {e}")
             return None
 
-    def get_holdings(self):
+    def _account_evaluation(self):
+        """Raw kt00018 response (totals + per-symbol holdings), None on failure."""
+        # kt00018 takes no account number: the account is the token owner's
+        res = self.account.account_evaluation_balance_detail_request_kt00018(
+            query_type="1",
+            domestic_exchange_type="KRX"
+        )
+        if not _is_success(res):
+            logger.error(f"Account Evaluation Error: {res}")
+            return None
+        return res
+
+    @staticmethod
+    def _parse_holdings(res):
+        """{code: qty} from kt00018 'acnt_evlt_remn_indv_tot' (legacy: 'output2')."""
+        items = res.get('acnt_evlt_remn_indv_tot') or res.get('output2') or []
+        holdings = {}
+        for item in items:
+            # 'pdno' in older docs, 'stk_cd' (A-prefixed, e.g. A005930) in kt00018
+            code = item.get('pdno', '') or item.get('stk_cd', '')
+            if code.startswith('A'):
+                code = code[1:]
+            qty = int(item.get('rmnd_qty') or item.get('hldg_qty') or 0)
+            if code and qty > 0:
+                holdings[code] = qty
+        return holdings
+
+    @staticmethod
+    def _parse_balance(res):
+        # Totals are top-level fields (legacy: nested under 'output1')
+        summary = res.get('output1') or res
+        return float(summary.get('prsm_dpst_aset_amt', 0))
+
+    def get_account_snapshot(self):
         """
-        Get current holdings using kt00018 'output2'
-        Returns dict: { 'code': qty, ... }
+        Balance and holdings from a single kt00018 request:
+        { 'balance': estimated deposit assets, 'cash': balance minus the holdings' evaluation,
+          'holdings': { code: qty } }, or None on failure.
         """
         try:
-            res = self.account.account_evaluation_balance_detail_request_kt00018(
-                query_type="1",
-                domestic_exchange_type="KRX"
-            )
-            
-            if not res or res.get('rt_cd') != '0':
-                logger.error(f"Holdings Error: {res}")
-                return {}
-                
-            items = res.get('output2', [])
-            if not items:
-                return {}
-                
-            holdings = {}
-            for item in items:
-                # Code might be A005930 or 005930. 
-                # Usually Kiwoom API returns pure code or A-prefixed.
-                # 'stk_cd' or 'itm_no'. 
-                # Let's clean it up.
-                code = item.get('pdno', '') # 'pdno' is typically product number/code in newer API docs
-                # If pdno is missing, try synonyms
-                if not code:
-                     code = item.get('stk_cd', '')
-                     
-                # Remove 'A' prefix if present
-                if code.startswith('A'):
-                    code = code[1:]
-                    
-                qty = int(item.get('hldg_qty') or 0)
-                
-                if code and qty > 0:
-                    holdings[code] = qty
-                    
+            res = self._account_evaluation()
+            if res is None:
+                return None
+            summary = res.get('output1') or res
+            balance = self._parse_balance(res)
+            holdings = self._parse_holdings(res)
             logger.info(f"Account Holdings: {holdings}")
-            return holdings
-            
+            return {
+                'balance': balance,
+                'cash': balance - float(summary.get('tot_evlt_amt') or 0),
+                'holdings': holdings,
+            }
         except Exception as e:
-            logger.error(f"Error fetching holdings: {e}")
-            return {}
+            logger.error(f"Error fetching account snapshot: {e}")
+            return None
+
+    def get_holdings(self):
+        """
+        Get current holdings (kt00018).
+        Returns dict: { 'code': qty, ... }
+        """
+        snapshot = self.get_account_snapshot()
+        return snapshot['holdings'] if snapshot else {}
 
     def get_balance(self):
         """
-        Get balance using account_evaluation_balance_detail_request_kt00018
+        Get balance (estimated deposit assets) using kt00018
+        """
+        snapshot = self.get_account_snapshot()
+        return snapshot['balance'] if snapshot else None
+
+    def place_order(self, code, qty, order_type="BUY", price=0):
+        """
+        Place Order using kt10000 / kt10001
         """
         try:
-            # We assume TokenManager handles auth tokens.
-            # But KT00018 might need account number?
-            # From docstring `kt00018` usage: `query_type`, `domestic_exchange_type`. No acc_no.
-            # This implies `Account` class or Library config might need account no?
-            # Inspecting `account.py` again?
-            # No, `kt00018` docstring example showed NO account number arg.
-            # Usually strict REST API needs it in header or body.
-            # Maybe the library's `KiwoomBaseAPI` or `Account` reads it from somewhere?
-            # OR `kt00018` is a user-level query based on the Token's owner?
+            # trde_tp: 3 = Market, 0 = Limit (ord_uv = limit price)
+            trde_tp = "3" if price == 0 else "0"
+            
+            target_method = self.order.stock_buy_order_request_kt10000 if order_type == "BUY" else self.order.stock_sell_order_request_kt10001
             
-            res = self.account.account_evaluation_balance_detail_request_kt00018(
-                query_type="1",
-                domestic_exchange_type="KRX"
+            res = target_method(
+                dmst_stex_tp="KRX",
+                stk_cd=code,
+                ord_qty=str(qty),
+                trde_tp=trde_tp,
+                ord_uv="" if price == 0 else str(price),
             )
             
-            if not res or res.get('rt_cd') != '0':
-                logger.error(f"Balance Error: {res}")
+            if not _is_success(res):
+                logger.error(f"Order Error: {res}")
                 return None
-                
-            summary = res.get('output1', {})
-            return float(summary.get('prsm_dpst_aset_amt', 0))
+            
+            logger.info(f"Order Placed: {order_type} {code} {qty}")
+            return res
             
         except Exception as e:
-            logger.error(f"Error fetching balance: {e}")
+            logger.error(f"Error placing order: {e}")
             return None
 
-    def place_order(self, code, qty, order_type="BUY", price=0):
+    def cancel_order(self, code, ord_no, qty=0):
         """
-        Place Order using kt10000 / kt10001
+        Cancel the unfilled quantity of an order using kt10003 (qty=0: all of it).
+        Returns the response (the cancel's own ord_no) or None on failure.
         """
         try:
-            # 00: Limit, 01: Market
-            ord_dvsn = "01" if price == 0 else "00"
+            res = self.order.stock_cancel_order_request_kt10003(
+                dmst_stex_tp="KRX",
+                orig_ord_no=str(ord_no),
+                stk_cd=code,
+                cncl_qty=str(qty), # "0" cancels the whole remainder
+            )
+            
+            if not _is_success(res):
+                logger.error(f"Cancel Error: {res}")
+                return None
             
-            # Need to pass account??
-            # Order method signature: `stk_cd` etc.
-            # Previous `grep` of order.py showed `stock_buy_order_request_kt10000`.
-            # Let's hope it follows logic.
-            # Wait, `kt10000` usually requires account info.
-            # If function signature doesn't take it, maybe it's implicitly handled.
+            logger.info(f"Cancel Placed: {code} #{ord_no}")
+            return res
             
-            # Re-checking Order signature from memory/grep: 
-            # I didn't see FULL signature in grep, just def line.
-            # But assume standard kwargs matching API.
-            # If it fails, we will see in logs.
+        except Exception as e:
+            logger.error(f"Error cancelling order: {e}")
+            return None
+
+    def get_order_fills(self, code):
+        """
+        Today's orders of one symbol with their fills, using ka10076.
+        Returns dict: { ord_no: { 'filled': qty, 'remaining': qty, 'price': fill price } }, None on failure.
+        """
+        try:
+            res = self.account.filled_orders_request_ka10076(
+                qry_tp="1", # By symbol
+                sell_tp="0", # Buy and sell
+                stex_tp="1", # KRX
+                stock_code=code,
+            )
             
-            target_method = self.order.stock_buy_order_request_kt10000 if order_type == "BUY" else self.order.stock_sell_order_request_kt10001
+            if not _is_success(res):
+                logger.error(f"Order Fills Error: {res}")
+                return None
             
-            # Kiwoom REST usually needs: ord_qty, ord_prc, itm_no, ord_dvsn
-            # The library functions often map snake_case to API fields.
-            # e.g. `itm_no` -> `stk_cd`.
-            # I will use snake_case args if library uses them (refer to Chart usage `stk_cd`).
-            # Chart used `stk_cd`. So Order likely uses `stk_cd` too.
-            # But `kt10000` usually uses `itm_no` in official spec.
-            # I should use `stk_cd` if that's what the wrapper calls it.
-            # Let's try `stk_cd` as arg name based on chart.py pattern.
+            fills = {}
+            for item in res.get('cntr') or []:
+                ord_no = item.get('ord_no', '')
+                if not ord_no:
+                    continue
+                # Prices may carry a tick-direction sign like chart prices
+                fills[ord_no] = {
+                    'filled': int(item.get('cntr_qty') or 0),
+                    'remaining': int(item.get('oso_qty') or 0),
+                    'price': abs(float(item.get('cntr_pric') or 0)),
+                }
+            return fills
             
-            res = target_method(
-                ord_qty=str(qty),
-                ord_prc=str(price),
-                stk_cd=code, # Assuming wrapper normalizes this name
-                ord_dvsn=ord_dvsn,
-                tr_to="0" # Trade type?
-            )
+        except Exception as e:
+            logger.error(f"Error fetching order fills: {e}")
+            return None
+
+    def get_current_price(self, code):
+        """
+        Current price of one symbol using ka10001 (a single small request, no chart pages).
+        Returns float, None on failure.
+        """
+        try:
+            if self.rate_limiter:
+                self.rate_limiter.acquire()
+            res = self.stockinfo.basic_stock_information_request_ka10001(stock_code=code)
             
-            if not res or res.get('rt_cd') != '0':
-                logger.error(f"Order Error: {res}")
+            if not _is_success(res):
+                logger.error(f"Current Price Error: {res}")
+                ret_msg = (res or {}).get('return_msg', '')
+                if '8001' in ret_msg or '8005' in ret_msg:
+                    self.token_manager.invalidate()
                 return None
             
-            logger.info(f"Order Placed: {order_type} {code} {qty}")
-            return res
+            # Signed by the day's direction ("-70100"), like chart prices
+            price = abs(float(res.get('cur_prc') or 0))
+            return price or None
             
         except Exception as e:
-            logger.error(f"Error placing order: {e}")
+            logger.error(f"Error fetching current price: {e}")
             return None
@@ -0,0 +1,398 @@
+"""
+Local stand-in for the Kiwoom REST API, for offline load tests.
+
+Serves the endpoints api/kiwoom.py uses, with the broker's response shapes:
+    POST /oauth2/token          token issue
+    POST /api/dostk/chart       ka10080 minute chart, paginated latest-first
+                                with cont-yn / next-key request and response headers
+    POST /api/dostk/acnt        kt00018 account evaluation (deposit + holdings),
+                                ka10076 order fills (reported `fill_delay` seconds after the order)
+    POST /api/dostk/stkinfo     ka10001 basic stock info (current price)
+    POST /api/dostk/ordr        kt10000 buy / kt10001 sell, filled at the last price,
+                                kt10003 cancel of an order's unfilled quantity
+
+Bars are either recorded frames added with add_bars() (e.g. stored CSVs)
+or synthetic session-aligned random walks generated on first request.
+The last price of a symbol is its latest close unless moved with set_price().
+Latency, a requests-per-second limit and random server errors can be
+injected to measure how the client side copes.
+
+Usage:
+    with MockKiwoomServer(latency=0.05, rate_limit=20) as server:
+        settings.BASE_URL_OVERRIDE = server.base_url
+        KiwoomAPI().get_ohlcv("005930", "30")
+"""
+import json
+import random
+import threading
+import time
+import zlib
+from collections import Counter, deque
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import numpy as np
+import pandas as pd
+from data.bar_store import parse_bar_times
+from utils.market_time import is_trading_day
+
+PAGE_SIZE = 900 # ka10080 rows per page
+SESSION_OPEN_MINUTES = 9 * 60
+SESSION_CLOSE_MINUTES = 15 * 60 + 30
+
+MSG_OK = "정상적으로 처리되었습니다"
+MSG_RATE_LIMIT = "허용된 요청 개수를 초과하였습니다[1700:허용된 요청 개수를 초과하였습니다. API ID=%s]"
+MSG_BAD_TOKEN = "[8005:Token이 유효하지 않습니다]"
+
+
+def synthetic_bars(code, time_unit="60", days=1095, end=None):
+    """
+    Deterministic per-symbol random walk of `time_unit` minute bars over the
+    trading days in the last `days` calendar days (up to `end`, default today).
+    """
+    end = pd.Timestamp(end or datetime.now()).normalize()
+    dates = pd.date_range(end - pd.Timedelta(days=days), end, freq="D")
+    dates = dates[is_trading_day(dates.values)]
+    minutes = int(time_unit)
+    offsets = np.arange(SESSION_OPEN_MINUTES, SESSION_CLOSE_MINUTES, minutes)
+    starts = (dates.values[:, None] + offsets[None, :].astype('timedelta64[m]')).ravel()
+
+    rng = np.random.default_rng(zlib.crc32(code.encode()))
+    n = len(starts)
+    close = np.round(20000 * np.exp(np.cumsum(rng.normal(0, 0.006, n))), -1).clip(min=100)
+    open_ = np.r_[close[0], close[:-1]]
+    spread = np.round(close * rng.uniform(0, 0.006, n), -1)
+    return pd.DataFrame({
+        'time': pd.DatetimeIndex(starts).strftime("%Y%m%d%H%M%S"),
+        'open': open_,
+        'high': np.maximum(open_, close) + spread,
+        'low': np.minimum(open_, close) - spread,
+        'close': close,
+        'volume': rng.integers(1000, 200000, n),
+    })
+
+
+class MockBroker:
+    """Account state behind kt00018 / kt10000 / kt10001."""
+
+    def __init__(self, deposit=1000000):
+        self.deposit = deposit
+        self.holdings = {} # code -> qty
+        self.orders = []
+        self.lock = threading.Lock()
+        self._order_no = 0
+
+    def fill(self, side, code, qty, price):
+        with self.lock:
+            amount = qty * price
+            if side == "BUY":
+                if amount > self.deposit:
+                    return None
+                self.deposit -= amount
+                self.holdings[code] = self.holdings.get(code, 0) + qty
+            else:
+                if self.holdings.get(code, 0) < qty:
+                    return None
+                self.deposit += amount
+                self.holdings[code] -= qty
+                if not self.holdings[code]:
+                    del self.holdings[code]
+            self._order_no += 1
+            self.orders.append({'ord_no': f"{self._order_no:07d}", 'side': side, 'code': code, 'qty': qty, 'price': price,
+                                'time': time.monotonic(), 'cancel_at': None})
+            return self.orders[-1]
+
+    def cancel(self, order, at):
+        """Undo an accepted order's settlement; ka10076 shows it cancelled from `at` (monotonic)."""
+        with self.lock:
+            amount = order['qty'] * order['price']
+            if order['side'] == "BUY":
+                self.deposit += amount
+                self.holdings[order['code']] -= order['qty']
+                if not self.holdings[order['code']]:
+                    del self.holdings[order['code']]
+            else:
+                self.deposit -= amount
+                self.holdings[order['code']] = self.holdings.get(order['code'], 0) + order['qty']
+            order['cancel_at'] = at
+            self._order_no += 1
+            return f"{self._order_no:07d}"
+
+
+class MockKiwoomServer:
+    """
+    latency: base seconds added to every response (plus uniform `jitter`).
+    rate_limit: max requests per second across all endpoints (None = unlimited);
+        excess requests get HTTP `rate_limit_status` (429), or HTTP 200 with
+        return_code 5 like the broker when rate_limit_status=200.
+    error_rate: probability of answering a data request with HTTP 500.
+    fill_delay: seconds before an order shows as filled in ka10076 (the account
+        itself is settled when the order is accepted).
+    cancel_delay: seconds before a kt10003 cancel takes effect; an order whose
+        fill is due before then is filled and the cancel has nothing left to cancel.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0, rate_limit=None,
+                 rate_limit_status=429, error_rate=0.0, page_size=PAGE_SIZE, history_days=1095,
+                 deposit=1000000, fill_delay=0.0, cancel_delay=0.0, seed=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_limit = rate_limit
+        self.rate_limit_status = rate_limit_status
+        self.error_rate = error_rate
+        self.page_size = page_size
+        self.history_days = history_days
+        self.fill_delay = fill_delay
+        self.cancel_delay = cancel_delay
+        self.broker = MockBroker(deposit)
+        self.stats = Counter()
+
+        self._bars = {} # (code, time_unit) -> DataFrame, latest first
+        self._prices = {} # code -> price set with set_price()
+        self._tokens = set()
+        self.token_keys = {} # token -> app key it was issued to
+        self._recent = deque()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def add_bars(self, code, time_unit, df):
+        """Serve recorded bars (DataFrame with time/open/high/low/close/volume) for code."""
+        order = np.argsort(parse_bar_times(df['time'].values), kind='stable')[::-1]
+        self._bars[(code, str(time_unit))] = df.iloc[order].reset_index(drop=True)
+
+    def bars(self, code, time_unit):
+        key = (code, str(time_unit))
+        with self._lock:
+            if key not in self._bars:
+                self.add_bars(code, time_unit, synthetic_bars(code, time_unit, self.history_days))
+            return self._bars[key]
+
+    def set_price(self, code, price):
+        """Move the symbol's current price (ka10001, fills and evaluations) away from its last close."""
+        self._prices[code] = int(price)
+
+    def last_price(self, code):
+        if code in self._prices:
+            return self._prices[code]
+        # Latest close of whichever series of the symbol was served (or a synthetic one)
+        for (bar_code, _), df in list(self._bars.items()):
+            if bar_code == code:
+                return int(df['close'].iloc[0])
+        return int(self.bars(code, "60")['close'].iloc[0])
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.stats[key] += n
+
+    def _delay(self):
+        if self.latency or self.jitter:
+            with self._lock:
+                extra = self._rng.uniform(0, self.jitter) if self.jitter else 0.0
+            time.sleep(self.latency + extra)
+
+    def _rate_limited(self):
+        if not self.rate_limit:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and now - self._recent[0] >= 1.0:
+                self._recent.popleft()
+            if len(self._recent) >= self.rate_limit:
+                return True
+            self._recent.append(now)
+            return False
+
+    def _inject_error(self):
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def handle(self, path, headers, body):
+        """Returns (status, json body, extra response headers)."""
+        api_id = headers.get('api-id', 'token' if path == "/oauth2/token" else '')
+        self._count('requests')
+        self._count(f"requests.{api_id}")
+        self._delay()
+
+        if self._rate_limited():
+            self._count('rate_limited')
+            return self.rate_limit_status, {'return_code': 5, 'return_msg': MSG_RATE_LIMIT % api_id}, {}
+        if path == "/oauth2/token":
+            return self._token(body)
+        if headers.get('authorization', '').split(" ")[-1] not in self._tokens:
+            self._count('unauthorized')
+            return 200, {'return_code': 3, 'return_msg': MSG_BAD_TOKEN}, {}
+        if self._inject_error():
+            self._count('errors')
+            return 500, {'return_code': 1, 'return_msg': "Injected server error"}, {}
+
+        if path == "/api/dostk/chart" and api_id == "ka10080":
+            return self._minute_chart(headers, body)
+        if path == "/api/dostk/acnt" and api_id == "kt00018":
+            return self._account_evaluation()
+        if path == "/api/dostk/acnt" and api_id == "ka10076":
+            return self._fills(body)
+        if path == "/api/dostk/stkinfo" and api_id == "ka10001":
+            return self._stock_info(body)
+        if path == "/api/dostk/ordr" and api_id in ("kt10000", "kt10001"):
+            return self._order("BUY" if api_id == "kt10000" else "SELL", body)
+        if path == "/api/dostk/ordr" and api_id == "kt10003":
+            return self._cancel(body)
+        self._count('not_found')
+        return 404, {'return_code': 2, 'return_msg': f"Unsupported {path} {api_id}"}, {}
+
+    def _token(self, body):
+        token = f"mock-{len(self._tokens) + 1:06d}"
+        with self._lock:
+            self._tokens.add(token)
+            self.token_keys[token] = body.get('appkey')
+        expires = (datetime.now() + timedelta(hours=24)).strftime("%Y%m%d%H%M%S")
+        return 200, {'expires_dt': expires, 'token_type': "bearer", 'token': token,
+                     'return_code': 0, 'return_msg': MSG_OK}, {}
+
+    def _minute_chart(self, headers, body):
+        df = self.bars(body.get('stk_cd', ''), body.get('tic_scope', '60'))
+        start = int(headers.get('next-key') or 0) if headers.get('cont-yn') == "Y" else 0
+        page = df.iloc[start:start + self.page_size]
+        more = start + self.page_size < len(df)
+        self._count('bars_served', len(page))
+
+        # Prices are signed strings like the broker's ("-70100" on a down tick)
+        sign = np.where(page['close'].values < page['open'].values, "-", "+")
+        items = [
+            {'cur_prc': f"{s}{c:.0f}", 'trde_qty': str(int(v)), 'cntr_tm': str(t),
+             'open_pric': f"{s}{o:.0f}", 'high_pric': f"{s}{h:.0f}", 'low_pric': f"{s}{lo:.0f}"}
+            for s, t, o, h, lo, c, v in zip(sign, page['time'].values, page['open'].values,
+                                            page['high'].values, page['low'].values,
+                                            page['close'].values, page['volume'].values)
+        ]
+        response_headers = {'cont-yn': "Y" if more else "N",
+                            'next-key': str(start + self.page_size) if more else "",
+                            'api-id': "ka10080"}
+        return 200, {'stk_cd': body.get('stk_cd', ''), 'stk_min_pole_chart_qry': items,
+                     'return_code': 0, 'return_msg': MSG_OK}, response_headers
+
+    def _account_evaluation(self):
+        with self.broker.lock:
+            deposit, holdings = self.broker.deposit, dict(self.broker.holdings)
+        items = []
+        evaluation = 0
+        for code, qty in holdings.items():
+            price = self.last_price(code)
+            evaluation += price * qty
+            items.append({'stk_cd': f"A{code}", 'rmnd_qty': f"{qty:012d}", 'cur_prc': f"{price:012d}",
+                          'evlt_amt': f"{price * qty:015d}"})
+        return 200, {'tot_evlt_amt': f"{evaluation:015d}", 'prsm_dpst_aset_amt': f"{deposit + evaluation:015d}",
+                     'acnt_evlt_remn_indv_tot': items, 'return_code': 0, 'return_msg': MSG_OK}, {}
+
+    def _fills(self, body):
+        code = body.get('stk_cd')
+        now = time.monotonic()
+        with self.broker.lock:
+            orders = [o for o in self.broker.orders if code is None or o['code'] == code]
+        items = []
+        for o in reversed(orders): # Latest first
+            cancelled = o['cancel_at'] is not None and now >= o['cancel_at']
+            filled = o['qty'] if now - o['time'] >= self.fill_delay and o['cancel_at'] is None else 0
+            state = "취소" if cancelled else "체결" if filled else "접수"
+            items.append({'ord_no': o['ord_no'], 'stk_cd': o['code'], 'io_tp_nm': "+매수" if o['side'] == "BUY" else "-매도",
+                          'ord_qty': str(o['qty']), 'cntr_qty': str(filled),
+                          'oso_qty': str(0 if cancelled else o['qty'] - filled),
+                          'cntr_pric': str(o['price']) if filled else "", 'ord_stt': state})
+        return 200, {'cntr': items, 'return_code': 0, 'return_msg': MSG_OK}, {}
+
+    def _stock_info(self, body):
+        code = body.get('stk_cd', '')
+        price = self.last_price(code)
+        # Signed like the chart prices, relative to the previous close
+        prev = int(self.bars(code, "60")['close'].iloc[1])
+        sign = "-" if price < prev else "+"
+        return 200, {'stk_cd': code, 'cur_prc': f"{sign}{price}", 'pred_pre': f"{sign}{abs(price - prev)}",
+                     'return_code': 0, 'return_msg': MSG_OK}, {}
+
+    def _order(self, side, body):
+        code = body.get('stk_cd', '')
+        qty = int(body.get('ord_qty') or 0)
+        price = int(body.get('ord_uv') or 0) or self.last_price(code)
+        order = self.broker.fill(side, code, qty, price) if qty > 0 else None
+        if order is None:
+            self._count('orders_rejected')
+            return 200, {'return_code': 20, 'return_msg': "주문가능금액/수량이 부족합니다"}, {}
+        self._count('orders')
+        return 200, {'ord_no': order['ord_no'], 'dmst_stex_tp': body.get('dmst_stex_tp', 'KRX'),
+                     'return_code': 0, 'return_msg': MSG_OK}, {}
+
+    def _cancel(self, body):
+        ord_no = body.get('orig_ord_no', '')
+        now = time.monotonic()
+        with self.broker.lock:
+            order = next((o for o in self.broker.orders if o['ord_no'] == ord_no), None)
+        if order is None or order['cancel_at'] is not None or now - order['time'] >= self.fill_delay:
+            self._count('cancels_rejected')
+            return 200, {'return_code': 20, 'return_msg': "취소가능수량이 없습니다"}, {}
+        self._count('cancels')
+        at = now + self.cancel_delay
+        if order['time'] + self.fill_delay < at:
+            # The fill reaches the exchange first: accepted, but nothing is left to cancel
+            return 200, {'ord_no': "", 'base_orig_ord_no': ord_no, 'cncl_qty': "0",
+                         'return_code': 0, 'return_msg': MSG_OK}, {}
+        cancel_no = self.broker.cancel(order, at)
+        return 200, {'ord_no': cancel_no, 'base_orig_ord_no': ord_no, 'cncl_qty': str(order['qty']),
+                     'return_code': 0, 'return_msg': MSG_OK}, {}
+
+
+def _make_handler(server):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            length = int(self.headers.get('content-length') or 0)
+            raw = self.rfile.read(length) if length else b""
+            try:
+                body = json.loads(raw) if raw else {}
+            except ValueError:
+                body = {}
+            headers = {k.lower(): v for k, v in self.headers.items()}
+            status, payload, extra = server.handle(self.path, headers, body)
+
+            data = json.dumps(payload, ensure_ascii=False).encode()
+            self.send_response(status)
+            self.send_header('content-type', "application/json;charset=UTF-8")
+            self.send_header('content-length', str(len(data)))
+            if extra:
+                # The client library copies exposed headers into the response dict
+                self.send_header('access-control-expose-headers', ",".join(extra))
+                for key, value in extra.items():
+                    self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
@@ -0,0 +1,193 @@
+"""
+Access token cache shared by every KiwoomAPI in a process and, through a
+file on disk, by every process and worker using the same server and app key.
+
+The cache file (settings.TOKEN_CACHE_FILE) holds one entry per server/app key:
+
+    {"<key>": {"token": "...", "expires": 1760000000.0, "issued": 1759913600.0}}
+
+Readers and writers hold an exclusive lock on "<file>.lock" while they check
+and (re)issue a token, so concurrent processes starting together issue one
+token between them. A token is reused until `refresh_margin` seconds before
+its expiry; long-running processes (the bot) can refresh it in the background
+with start_auto_refresh() so requests never wait on the auth round-trip.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from utils.logger import setup_logger
+
+try:
+    import fcntl
+except ImportError: # Windows
+    fcntl = None
+    import msvcrt
+
+logger = setup_logger("TokenCache")
+
+DEFAULT_TTL = 3600 # Seconds assumed when the token response has no expiry
+
+
+def cache_key(base_url, app_key):
+    """Entry key for a server/app key pair (the app key itself is not stored)."""
+    return hashlib.sha1(f"{base_url.rstrip('/')}|{app_key}".encode()).hexdigest()[:16]
+
+
+@contextmanager
+def _file_lock(path):
+    with open(path, "a+") as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class CachedTokenManager:
+    """
+    Drop-in for kiwoom_rest_api's TokenManager (get_token / access_token).
+
+    issuer: library TokenManager used to request new tokens.
+    key: cache_key() of the server and app key.
+    path: cache file, None to share the token within this process only.
+    refresh_margin: seconds before expiry at which a token is replaced.
+    """
+
+    def __init__(self, issuer, key, path=None, refresh_margin=300):
+        self.issuer = issuer
+        self.key = key
+        self.path = path
+        self.refresh_margin = refresh_margin
+        self.token = None
+        self.expires = 0.0
+        self.issued_count = 0 # Tokens this instance requested from the server
+        self._lock = threading.Lock()
+        self._refresher = None
+        self._stop = threading.Event()
+
+    @property
+    def access_token(self):
+        return self.get_token()
+
+    def _is_fresh(self, expires):
+        return time.time() < expires - self.refresh_margin
+
+    def get_token(self):
+        if self.token and self._is_fresh(self.expires):
+            return self.token
+        with self._lock:
+            if not (self.token and self._is_fresh(self.expires)):
+                self._load_or_issue()
+            return self.token
+
+    def refresh(self, force=False):
+        """Replace the token if it is due (or unconditionally with force). Returns the token."""
+        with self._lock:
+            self._load_or_issue(force=force)
+            return self.token
+
+    def invalidate(self):
+        """Drop a token the server rejected, here and in the cache file."""
+        with self._lock:
+            rejected, self.token, self.expires = self.token, None, 0.0
+            if self.path and rejected:
+                with _file_lock(self.path + ".lock"):
+                    entries = self._read()
+                    if entries.get(self.key, {}).get('token') == rejected:
+                        del entries[self.key]
+                        self._write(entries)
+
+    def _load_or_issue(self, force=False):
+        if not self.path:
+            if force or not (self.token and self._is_fresh(self.expires)):
+                self._issue()
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        with _file_lock(self.path + ".lock"):
+            entries = self._read()
+            entry = entries.get(self.key)
+            # Another process may have refreshed it since we last looked
+            # An entry without a token (written before failed issues were rejected) counts as missing
+            if entry and entry.get('token') and self._is_fresh(entry['expires']) \
+                    and not (force and entry['token'] == self.token):
+                self.token, self.expires = entry['token'], entry['expires']
+                return
+            self._issue()
+            entries[self.key] = {'token': self.token, 'expires': self.expires, 'issued': time.time()}
+            self._write(entries)
+
+    def _issue(self):
+        # Cleared first so a failed request cannot leave the previous token or expiry behind
+        self.issuer._access_token, self.issuer._token_expiry = None, None
+        self.issuer._request_new_token()
+        if not self.issuer._access_token:
+            raise RuntimeError("Token request returned no access token")
+        expiry = getattr(self.issuer, '_token_expiry', None)
+        self.token = self.issuer._access_token
+        self.expires = expiry.timestamp() if expiry else time.time() + DEFAULT_TTL
+        self.issued_count += 1
+        logger.info(f"Issued new access token (expires {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self.expires))})")
+
+    def _read(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _write(self, entries):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(entries, f, indent=1)
+        os.chmod(tmp, 0o600)
+        os.replace(tmp, self.path)
+
+    def start_auto_refresh(self):
+        """Refresh the token in a daemon thread shortly before it expires."""
+        if self._refresher and self._refresher.is_alive():
+            return
+        self._stop.clear()
+        self._refresher = threading.Thread(target=self._refresh_loop, name="TokenRefresh", daemon=True)
+        self._refresher.start()
+
+    def stop_auto_refresh(self):
+        self._stop.set()
+        if self._refresher:
+            self._refresher.join()
+
+    def _refresh_loop(self):
+        while not self._stop.is_set():
+            try:
+                self.get_token()
+                # Wake up when the token enters the refresh margin
+                wait = max(1.0, self.expires - self.refresh_margin - time.time() + 1.0)
+            except Exception as e:
+                logger.error(f"Background token refresh failed: {e}")
+                wait = 30.0
+            self._stop.wait(wait)
+
+
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def shared_token_manager(issuer_factory, base_url, app_key, path=None, refresh_margin=300):
+    """The process-wide CachedTokenManager for a server/app key (created on first use)."""
+    key = cache_key(base_url, app_key)
+    with _managers_lock:
+        manager = _managers.get((key, path))
+        if manager is None:
+            manager = CachedTokenManager(issuer_factory(), key, path, refresh_margin)
+            _managers[(key, path)] = manager
+        return manager
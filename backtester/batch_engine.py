@@ -0,0 +1,228 @@
+import numpy as np
+from config import settings
+from config.profiles import load_profiles
+from utils.logger import setup_logger
+from utils.trend_analyzer import TrendAnalyzer
+from backtester.engine import BacktestEngine
+from backtester.exit_scan import (EXIT_STOP_LOSS, EXIT_TAKE_PROFIT, EXIT_MAX_HOLD_LIMIT,
+                                  EXIT_MAX_HOLD_PROFIT, EXIT_NONE, EXIT_STRATEGY, exit_reason_text)
+
+logger = setup_logger("BatchBacktester")
+
+class BatchBacktestEngine:
+    """
+    Runs many parameter sets of the BacktestEngine rules in one bar walk.
+    The entry (and optional exit) rule is the strategy's, as in BacktestEngine.
+
+    Each parameter set is a dict of BacktestEngine keyword arguments
+    (rsi_oversold, stop_loss_pct, take_profit_pct, max_hold_days,
+    min_profit_yield, max_hold_max_days); missing keys come from the
+    symbol's profile, as in BacktestEngine. Balances and open positions of all sets live in
+    arrays and are advanced together bar by bar, so N sets cost about one
+    pass. Results match N separate BacktestEngine.run() calls.
+    """
+
+    def __init__(self, strategy, param_sets, profiles=None):
+        self.strategy = strategy
+        self.profiles = profiles
+        self.param_sets = [dict(p) for p in param_sets]
+        self.initial_capital = settings.INITIAL_CAPITAL
+        self.fee_buy = 0.00015 # 0.015%
+        self.fee_sell = 0.00015 + 0.0018 # 0.015% + 0.18% Tax
+        self.trades = [[] for _ in self.param_sets]
+        self.code = None
+        self.time_unit = None
+        self.start_date = None
+        self.end_date = None
+
+    def _param_array(self, name, default):
+        return np.array([default if p.get(name) is None else p[name] for p in self.param_sets], dtype=np.float64)
+
+    def get_params(self, k):
+        """Effective parameters of set k, like BacktestEngine.get_params()."""
+        return {
+            'rsi_oversold': self.rsi_oversold[k],
+            'rsi_period': getattr(self.strategy, 'rsi_period', None),
+            'stop_loss_pct': self.stop_loss_pct[k],
+            'take_profit_pct': self.take_profit_pct[k],
+            'max_hold_days': self.max_hold_days[k],
+            'max_hold_max_days': self.max_hold_max_days[k],
+            'min_profit_yield': self.min_profit_yield[k]
+        }
+
+    def run(self, df, code="UNKNOWN", time_unit="60", scanner=None):
+        """Backtest every parameter set on df; returns one result dict per set, in order."""
+        self.code = code
+        self.time_unit = str(time_unit)
+        if scanner is None:
+            scanner = BacktestEngine(self.strategy, profiles=self.profiles).prepare_scanner(df, code)
+
+        profile = (load_profiles() if self.profiles is None else self.profiles).get(code)
+        self.rsi_oversold = self._param_array('rsi_oversold', profile.rsi_oversold)
+        self.stop_loss_pct = self._param_array('stop_loss_pct', profile.stop_loss_pct)
+        self.take_profit_pct = self._param_array('take_profit_pct', profile.take_profit_pct)
+        self.max_hold_days = self._param_array('max_hold_days', profile.max_hold_days)
+        self.min_profit_yield = self._param_array('min_profit_yield', profile.min_profit_yield)
+        self.max_hold_max_days = self._param_array('max_hold_max_days', profile.max_hold_max_days)
+        cooldown_days = profile.cooldown_days
+
+        n_sets = len(self.param_sets)
+        self.trades = [[] for _ in range(n_sets)]
+        self.balance = np.full(n_sets, float(self.initial_capital))
+        self.total_fees = np.zeros(n_sets)
+        self.in_position = np.zeros(n_sets, dtype=bool)
+        self.entry_price = np.zeros(n_sets)
+        self.entry_idx = np.zeros(n_sets, dtype=np.int64)
+        self.qty = np.zeros(n_sets)
+        self.cost = np.zeros(n_sets)
+        self.fee_entry = np.zeros(n_sets)
+        # First trading-day ordinal a set may enter again after a Stop Loss
+        resume_ord = np.full(n_sets, np.iinfo(np.int64).min, dtype=np.int64)
+
+        n = scanner.length
+        self.start_date = scanner.times[0] if n else None
+        self.end_date = scanner.times[-1] if n else None
+        logger.info(f"Starting batch backtest: {n_sets} parameter sets over {n} bars")
+
+        # Entry rule per distinct threshold (sets -> row of the mask matrix)
+        thresholds, set_rows = np.unique(self.rsi_oversold, return_inverse=True)
+        entry_masks = np.array([scanner.entry_mask(self.strategy, t) for t in thresholds]).reshape(len(thresholds), n)
+        exit_mask = scanner.exit_mask(self.strategy)
+        # Bars where at least one set could enter; idle stretches are skipped
+        signal_bars = np.flatnonzero(entry_masks.any(axis=0))
+
+        i = 0
+        while i < n:
+            if not self.in_position.any():
+                k = np.searchsorted(signal_bars, i, side='left')
+                if k == len(signal_bars):
+                    break
+                i = signal_bars[k]
+
+            # 1. Manage open positions
+            held = np.flatnonzero(self.in_position)
+            if len(held):
+                entry = self.entry_price[held]
+                pnl_pct = (scanner.sell_price[i] - entry) / entry * 100
+                days_held = scanner.day_ord[i] - scanner.day_ord[self.entry_idx[held]]
+
+                stop = pnl_pct <= self.stop_loss_pct[held]
+                take = pnl_pct >= self.take_profit_pct[held]
+                hard = days_held >= self.max_hold_max_days[held]
+                profit_met = (days_held >= self.max_hold_days[held]) & (pnl_pct >= self.min_profit_yield[held])
+
+                reason = np.full(len(held), EXIT_STRATEGY, dtype=np.int8)
+                reason[profit_met] = EXIT_MAX_HOLD_PROFIT
+                reason[hard] = EXIT_MAX_HOLD_LIMIT
+                reason[take] = EXIT_TAKE_PROFIT
+                reason[stop] = EXIT_STOP_LOSS
+                exiting = stop | take | hard | profit_met
+                if exit_mask is not None and exit_mask[i]:
+                    exiting[:] = True
+                if exiting.any():
+                    sets = held[exiting]
+                    self._sell(scanner, sets, i, reason[exiting])
+                    stopped = sets[reason[exiting] == EXIT_STOP_LOSS]
+                    resume_ord[stopped] = scanner.day_ord[i] + cooldown_days
+
+            # 2. Entries for flat sets (same-bar re-entry after an exit is allowed)
+            if entry_masks[:, i].any():
+                ready = (~self.in_position & entry_masks[set_rows, i]
+                         & (scanner.day_ord[i] >= resume_ord))
+                if ready.any():
+                    self._buy(scanner, np.flatnonzero(ready), i)
+            i += 1
+
+        # Finalize - Force Close
+        if n and self.in_position.any():
+            sets = np.flatnonzero(self.in_position)
+            self._sell(scanner, sets, n - 1, np.full(len(sets), EXIT_NONE, dtype=np.int8))
+
+        trend = TrendAnalyzer().calculate_trend(df)
+        return [self._performance(k, trend) for k in range(n_sets)]
+
+    def _buy(self, scanner, sets, i):
+        # Vector form of BacktestEngine._buy()
+        buy_price = scanner.buy_price[i]
+        max_buy_amt = self.balance[sets] * 0.95
+        qty = np.floor(max_buy_amt / (buy_price * (1 + self.fee_buy)))
+        filled = qty > 0
+        sets, qty = sets[filled], qty[filled]
+        if len(sets) == 0:
+            return
+        cost = qty * buy_price
+        fee = cost * self.fee_buy
+        self.balance[sets] -= (cost + fee)
+        self.total_fees[sets] += fee
+        self.in_position[sets] = True
+        self.entry_price[sets] = buy_price
+        self.entry_idx[sets] = i
+        self.qty[sets] = qty
+        self.cost[sets] = cost
+        self.fee_entry[sets] = fee
+
+    def _sell(self, scanner, sets, j, reasons):
+        # Vector form of BacktestEngine._sell()
+        sell_price = scanner.sell_price[j]
+        revenue = self.qty[sets] * sell_price
+        fee = revenue * self.fee_sell
+        net_revenue = revenue - fee
+        self.balance[sets] += net_revenue
+        self.total_fees[sets] += fee
+
+        invested = self.cost[sets] + self.fee_entry[sets]
+        pnl = net_revenue - invested
+        pnl_pct = (pnl / invested) * 100
+
+        for pos, k in enumerate(sets):
+            self.trades[k].append({
+                'entry_time': scanner.times[self.entry_idx[k]],
+                'exit_time': scanner.times[j],
+                'entry_price': float(self.entry_price[k]),
+                'exit_price': float(sell_price),
+                'qty': int(self.qty[k]),
+                'pnl': int(pnl[pos]),
+                'pnl_pct': round(float(pnl_pct[pos]), 2),
+                'reason': exit_reason_text(reasons[pos], sell_price, self.entry_price[k])
+            })
+        self.in_position[sets] = False
+
+    def _performance(self, k, trend):
+        # Same keys as BacktestEngine._calculate_performance()
+        trades = self.trades[k]
+        final_balance = float(self.balance[k])
+        win_trades = [t for t in trades if t['pnl'] > 0]
+        return {
+            'final_balance': final_balance,
+            'return': (final_balance - self.initial_capital) / self.initial_capital * 100,
+            'total_trades': len(trades),
+            'win_trades': len(win_trades),
+            'loss_trades': len(trades) - len(win_trades),
+            'count_sl': len([t for t in trades if "Stop Loss" in t['reason']]),
+            'count_tp': len([t for t in trades if "Take Profit" in t['reason']]),
+            'count_mh_win': len([t for t in trades if "Max Hold" in t['reason'] and t['pnl'] > 0]),
+            'count_mh_loss': len([t for t in trades if "Max Hold" in t['reason'] and t['pnl'] <= 0]),
+            'total_fees': int(self.total_fees[k]),
+            'trend': trend['trend'].value,
+            'slope': trend['slope']
+        }
+
+
+def run_strategies(df, strategies, code="UNKNOWN", time_unit="60", **engine_kwargs):
+    """
+    Backtest several strategies on the same data in one run. Indicators are
+    computed once into a shared IndicatorCache (an EMA used by two strategies
+    is computed once) and the ExitScanner arrays are shared as well.
+    Returns {strategy name: (result, engine)} in the given order.
+    """
+    scanner = BacktestEngine(strategies[0]).prepare_scanner(df, code)
+    for strategy in strategies[1:]:
+        strategy.indicators(df, cache=scanner.indicators)
+    logger.info(f"Computed {scanner.indicators.computed} distinct indicators for {len(strategies)} strategies")
+
+    results = {}
+    for strategy in strategies:
+        engine = BacktestEngine(strategy, **engine_kwargs)
+        res = engine.run_fast(df, code=code, save_results=False, time_unit=time_unit, scanner=scanner)
+        results[strategy.name] = (res, engine)
+    return results
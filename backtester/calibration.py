@@ -0,0 +1,330 @@
+"""
+Universe calibration: per-symbol entry threshold, timeframe and exit parameters.
+
+For every symbol and candidate timeframe, the whole parameter grid
+(rsi_oversold x stop_loss_pct x take_profit_pct x max_hold_days) is
+backtested in one BatchBacktestEngine walk, so the indicators and exit
+arrays are computed once per (symbol, timeframe) and shared by every set.
+The per-set metrics are cached on disk under the data checksum and grid, so
+a nightly re-run only walks symbols whose bars changed.
+
+Robustness filter: trades are split by entry time at `split` of the bars.
+A set qualifies when it has CALIBRATION_MIN_TRADES trades before the split,
+CALIBRATION_MIN_OOS_TRADES after it, and a positive out-of-sample return.
+Qualifying sets are ranked by the lower of their in-sample return and the
+median in-sample return of their grid neighbours (one step on each axis),
+so a lone spike surrounded by losing parameters loses to a broad plateau. Symbols with no qualifying set
+(or not calibrated in this run) keep their entry from the latest version,
+or their settings.py profile if they have none.
+
+The selections are written as a versioned TOML profile file
+(CALIBRATION_DIR/profiles_v0001.toml, ...) in the config/profiles.py layout,
+validated by loading it, and then copied to CALIBRATION_DIR/profiles.toml,
+which settings.PROFILE_FILE picks up when present. A run whose profiles
+equal the latest version's publishes nothing.
+"""
+import itertools
+import json
+import os
+import re
+import shutil
+import tomllib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+import numpy as np
+from config import settings
+from config.profiles import ProfileRegistry
+from backtester.batch_engine import BatchBacktestEngine
+from backtester.checkpoint import data_checksum, param_hash, _json_default
+from backtester.exit_scan import parse_times
+from strategy.rsi_macd import RsiMacdStrategy
+from utils.logger import setup_logger
+
+logger = setup_logger("Calibration")
+
+GRID_FIELDS = ('rsi_oversold', 'stop_loss_pct', 'take_profit_pct', 'max_hold_days')
+METRICS = ('return', 'trades', 'is_return', 'is_trades', 'oos_return', 'oos_trades')
+CACHE_VERSION = 1
+LATEST_FILE = "profiles.toml"
+
+
+def default_grid(source=settings):
+    """{field: candidate values} from the CALIBRATION_* settings."""
+    return {
+        'rsi_oversold': list(source.CALIBRATION_RSI_GRID),
+        'stop_loss_pct': list(source.CALIBRATION_STOP_LOSS_GRID),
+        'take_profit_pct': list(source.CALIBRATION_TAKE_PROFIT_GRID),
+        'max_hold_days': list(source.CALIBRATION_MAX_HOLD_GRID),
+    }
+
+
+def grid_sets(grid):
+    """Every parameter set of the grid, in row-major order of GRID_FIELDS."""
+    return [dict(zip(GRID_FIELDS, values)) for values in itertools.product(*(grid[f] for f in GRID_FIELDS))]
+
+
+def _compound(pnl_pct):
+    return (np.prod(1 + np.asarray(pnl_pct, dtype=np.float64) / 100) - 1) * 100 if len(pnl_pct) else 0.0
+
+
+def evaluate_grid(df, code, timeframe, grid, split, profiles=None, strategy=None):
+    """
+    Backtest every set of `grid` on df in one batch walk.
+    Returns {metric: list per set}: 'return' / 'trades' over all bars, and the
+    compounded trade return and trade count of trades entered before
+    ('is_') and after ('oos_') the bar at `split` of the data.
+    """
+    batch = BatchBacktestEngine(strategy or RsiMacdStrategy(), grid_sets(grid), profiles)
+    results = batch.run(df, code=code, time_unit=timeframe)
+    times = parse_times(df['time'].values)
+    cut = times[min(int(len(times) * split), len(times) - 1)]
+
+    metrics = {name: [] for name in METRICS}
+    for res, trades in zip(results, batch.trades):
+        inside = [t['pnl_pct'] for t in trades if t['entry_time'] < cut]
+        outside = [t['pnl_pct'] for t in trades if t['entry_time'] >= cut]
+        metrics['return'].append(res['return'])
+        metrics['trades'].append(res['total_trades'])
+        metrics['is_return'].append(_compound(inside))
+        metrics['is_trades'].append(len(inside))
+        metrics['oos_return'].append(_compound(outside))
+        metrics['oos_trades'].append(len(outside))
+    return metrics
+
+
+class GridCache:
+    """
+    Grid metrics per (symbol, timeframe), one JSON file each, valid while the
+    bars (data_checksum), the grid, the split and the base profile are unchanged.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(df, grid, split, profile):
+        return param_hash({'version': CACHE_VERSION, 'data': data_checksum(df), 'grid': grid,
+                           'split': split, 'profile': profile._asdict()})
+
+    def _path(self, code, timeframe):
+        return os.path.join(self.directory, f"{code}_{timeframe}.json")
+
+    def load(self, code, timeframe, key):
+        path = self._path(code, timeframe)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable grid cache {path}: {e}")
+            return None
+        return entry['metrics'] if entry.get('key') == key else None
+
+    def save(self, code, timeframe, key, metrics):
+        path = self._path(code, timeframe)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({'key': key, 'metrics': metrics}, f, default=_json_default)
+        os.replace(tmp, path)
+
+
+def calibrate_symbol(code, timeframes, grid, split, profiles, cache_dir=None):
+    """
+    Grid metrics of one symbol per timeframe ({timeframe: metrics}, timeframes
+    without data omitted) and how many came from the cache. Runs in a worker process.
+    """
+    from data.data_manager import DataManager
+    dm = DataManager(use_api=False)
+    cache = GridCache(cache_dir) if cache_dir else None
+    profile = profiles.get(code)
+    by_timeframe = {}
+    cached = 0
+    for timeframe in timeframes:
+        df = dm.load_data(code, timeframe)
+        if df is None or df.empty:
+            continue
+        key = GridCache.key(df, grid, split, profile) if cache else None
+        metrics = cache.load(code, timeframe, key) if cache else None
+        if metrics is None:
+            metrics = evaluate_grid(df, code, timeframe, grid, split, profiles)
+            if cache:
+                cache.save(code, timeframe, key, metrics)
+        else:
+            cached += 1
+        by_timeframe[timeframe] = metrics
+    return by_timeframe, cached
+
+
+def plateau(values, shape):
+    """
+    Robust score of each grid point: the lower of its own value and the median
+    of its neighbours one step away (diagonals included; a point with no
+    neighbours scores its own value).
+    """
+    grid = np.asarray(values, dtype=np.float64).reshape(shape)
+    padded = np.pad(grid, 1, constant_values=np.nan)
+    neighbours = [padded[tuple(slice(1 + o, 1 + o + n) for o, n in zip(offset, shape))]
+                  for offset in itertools.product((-1, 0, 1), repeat=len(shape)) if any(offset)]
+    stacked = np.stack(neighbours)
+    lonely = np.isnan(stacked).all(axis=0)
+    stacked[:, lonely] = grid[lonely]
+    return np.minimum(grid, np.nanmedian(stacked, axis=0)).ravel()
+
+
+def select(by_timeframe, grid, min_trades=None, min_oos_trades=None):
+    """
+    The robust choice among every timeframe's grid (see module docstring):
+    a dict with timeframe, params, score and the set's metrics, or None.
+    """
+    min_trades = settings.CALIBRATION_MIN_TRADES if min_trades is None else min_trades
+    min_oos_trades = settings.CALIBRATION_MIN_OOS_TRADES if min_oos_trades is None else min_oos_trades
+    shape = tuple(len(grid[f]) for f in GRID_FIELDS)
+    sets = grid_sets(grid)
+    best = None
+    for timeframe, metrics in sorted(by_timeframe.items()):
+        m = {name: np.asarray(metrics[name], dtype=np.float64) for name in METRICS}
+        score = plateau(m['is_return'], shape)
+        ok = ((m['is_trades'] >= min_trades) & (m['oos_trades'] >= min_oos_trades)
+              & (m['oos_return'] > 0) & (score > 0))
+        if not ok.any():
+            continue
+        k = int(np.argmax(np.where(ok, score, -np.inf)))
+        if best is None or score[k] > best['score']:
+            best = {'timeframe': timeframe, 'params': sets[k], 'score': float(score[k]),
+                    'metrics': {name: int(m[name][k]) if name.endswith('trades') else float(m[name][k])
+                                for name in METRICS}}
+    return best
+
+
+def _toml_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (int, np.integer)):
+        return str(int(value))
+    if isinstance(value, (float, np.floating)):
+        return repr(round(float(value), 4))
+    if isinstance(value, (list, tuple)):
+        return "[" + ", ".join(_toml_value(v) for v in value) + "]"
+    return json.dumps(str(value), ensure_ascii=False) # TOML basic strings use JSON escapes
+
+
+def _toml_table(lines, header, fields):
+    lines.append(f"[{header}]")
+    lines.extend(f"{key} = {_toml_value(value)}" for key, value in fields.items())
+    lines.append("")
+
+
+def next_version(directory):
+    versions = [int(m.group(1)) for name in os.listdir(directory)
+                if (m := re.fullmatch(r"profiles_v(\d+)\.toml", name))]
+    return max(versions, default=0) + 1
+
+
+def _latest_symbols(latest):
+    if not os.path.exists(latest):
+        return None, {}
+    with open(latest, "rb") as f:
+        data = tomllib.load(f)
+    return data.get('calibration', {}).get('version'), data.get('symbols', {})
+
+
+def write_profiles(directory, selections, profiles, meta):
+    """
+    Write selections ({code: select() result or None}) as the next versioned
+    profile file, check that it loads, and make it the latest
+    (directory/profiles.toml). Symbols without a new selection keep their entry
+    from the latest version. When the result equals the latest version,
+    nothing is written. Returns (version, path, changed).
+    """
+    os.makedirs(directory, exist_ok=True)
+    latest = os.path.join(directory, LATEST_FILE)
+    previous_version, previous = _latest_symbols(latest)
+    symbols = dict(previous)
+    symbols.update({code: {'name': profiles.get(code).name, 'timeframe': choice['timeframe'], **choice['params']}
+                    for code, choice in selections.items() if choice is not None})
+    if previous_version is not None and symbols == previous:
+        return previous_version, latest, False
+
+    version = next_version(directory)
+    lines = ["# Generated by calibrate.py; rerun the calibration instead of editing.", ""]
+    _toml_table(lines, "calibration", {'version': version, **meta})
+    for code, fields in symbols.items():
+        _toml_table(lines, f'symbols."{code}"', fields)
+    for code, choice in selections.items():
+        # Ignored by ProfileRegistry; kept for review of each run
+        if choice is None:
+            _toml_table(lines, f'results."{code}"', {'status': "kept previous profile"})
+        else:
+            _toml_table(lines, f'results."{code}"', {'status': "calibrated", 'score': choice['score'],
+                                                     **choice['metrics']})
+
+    path = os.path.join(directory, f"profiles_v{version:04d}.toml")
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines))
+    try:
+        ProfileRegistry.from_toml(tmp) # Never publish a file the bot cannot load
+    except ValueError:
+        os.remove(tmp)
+        raise
+    os.replace(tmp, path)
+
+    shutil.copyfile(path, latest + ".tmp")
+    os.replace(latest + ".tmp", latest)
+    return version, path, True
+
+
+def run_calibration(codes=None, timeframes=None, grid=None, split=None, directory=None, workers=None,
+                    profiles=None, use_cache=True):
+    """
+    Calibrate codes (default TARGET_STOCKS) in parallel, one process per symbol,
+    and publish the result as a new profile version. Returns a summary dict.
+    """
+    codes = list(codes or settings.TARGET_STOCKS)
+    timeframes = [str(tf) for tf in (timeframes or settings.CALIBRATION_TIMEFRAMES)]
+    grid = grid or default_grid()
+    split = settings.CALIBRATION_SPLIT if split is None else split
+    directory = directory or settings.CALIBRATION_DIR
+    # Base parameters (exit rules outside the grid, market type) from settings.py,
+    # not from a previous calibration, so runs do not drift on their own output
+    profiles = profiles if profiles is not None else ProfileRegistry.from_settings()
+    cache_dir = os.path.join(directory, "cache") if use_cache else None
+
+    began = datetime.now()
+    n_sets = len(grid_sets(grid))
+    logger.info(f"Calibrating {len(codes)} symbols x {len(timeframes)} timeframes x {n_sets} parameter sets")
+    selections = {}
+    missing = []
+    cached = 0
+    with ProcessPoolExecutor(max_workers=workers or settings.CALIBRATION_WORKERS) as pool:
+        futures = {code: pool.submit(calibrate_symbol, code, timeframes, grid, split, profiles, cache_dir)
+                   for code in codes}
+        for code, future in futures.items():
+            by_timeframe, hits = future.result()
+            cached += hits
+            if not by_timeframe:
+                missing.append(code)
+                continue
+            selections[code] = select(by_timeframe, grid)
+            choice = selections[code]
+            if choice is None:
+                logger.info(f"{code}: no parameter set passed the robustness filter; keeping its previous profile")
+            else:
+                logger.info(f"{code}: {choice['timeframe']}M {choice['params']} (in-sample plateau "
+                            f"{choice['score']:.1f}%, out-of-sample {choice['metrics']['oos_return']:.1f}%)")
+    if missing:
+        logger.warning(f"No stored data for {len(missing)} symbols: {', '.join(missing)}")
+
+    meta = {'generated': began.isoformat(timespec='seconds'), 'timeframes': timeframes, 'split': split,
+            'sets': n_sets, **{f"grid_{f}": grid[f] for f in GRID_FIELDS}}
+    version, path, changed = write_profiles(directory, selections, profiles, meta)
+    calibrated = [code for code, choice in selections.items() if choice is not None]
+    elapsed = (datetime.now() - began).total_seconds()
+    action = "Wrote profile version" if changed else "Profiles unchanged; latest is version"
+    logger.info(f"{action} {version} ({len(calibrated)}/{len(codes)} symbols calibrated, "
+                f"{cached} grids from cache) at {path} in {elapsed:.1f}s")
+    return {'version': version, 'path': path, 'changed': changed, 'calibrated': calibrated,
+            'kept': [code for code, choice in selections.items() if choice is None],
+            'missing': missing, 'cached': cached, 'elapsed': elapsed, 'selections': selections}
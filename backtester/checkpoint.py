@@ -0,0 +1,194 @@
+import glob
+import hashlib
+import json
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data.bar_store import parse_bar_times
+from utils.logger import setup_logger
+
+logger = setup_logger("Checkpoint")
+
+CHECKPOINT_DIR = "backtest_results/checkpoints"
+STATE_DIR = os.path.join(CHECKPOINT_DIR, "state")
+STATE_VERSION = 1
+# Bars of history an incremental run recomputes indicators over (EMA/rolling
+# warm-up effects are below float precision after this many bars)
+INDICATOR_TAIL = 1000
+
+
+def _json_default(value):
+    # numpy scalars (np.int64, np.float64, ...) -> plain Python values
+    if hasattr(value, 'item'):
+        return value.item()
+    return str(value)
+
+
+def param_hash(params):
+    """Stable short hash of a parameter dict (key order independent)."""
+    payload = json.dumps(params, sort_keys=True, default=_json_default)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def data_checksum(df, rows=None):
+    """sha1 of the bar times and OHLCV values of the first `rows` bars (default all)."""
+    frame = df if rows is None else df.iloc[:rows]
+    digest = hashlib.sha1()
+    digest.update(parse_bar_times(frame['time'].values).tobytes())
+    for column in ('open', 'high', 'low', 'close', 'volume'):
+        digest.update(np.ascontiguousarray(frame[column].to_numpy(dtype=np.float64)).tobytes())
+    return digest.hexdigest()
+
+
+class OptimizationCheckpoint:
+    """
+    Append-only JSONL store for one optimization sweep.
+
+    Each completed parameter combination is written (and flushed) as soon as
+    it finishes, so an interrupted sweep loses at most the point in flight.
+    Lines look like: {"run_id": ..., "hash": ..., "params": {...}, "result": {...}}
+
+    Run IDs are "<mode>_<code>_<grid hash>_<timestamp>". The grid hash covers
+    the search ranges, the fixed parameters around them (strategy, symbol
+    profile) and the data_checksum() of the bars, so `find_latest` only
+    resumes sweeps whose recorded points are still valid.
+    """
+
+    def __init__(self, run_id, directory=CHECKPOINT_DIR):
+        self.run_id = run_id
+        self.directory = directory
+        self.path = os.path.join(directory, f"{run_id}.jsonl")
+        self._done = {}
+
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            self._load()
+
+    @staticmethod
+    def grid_key(mode, code, grid, checksum="", params=None):
+        payload = {'grid': grid, 'data': checksum, 'params': params or {}}
+        return f"{mode}_{code}_{param_hash(payload)[:8]}"
+
+    @classmethod
+    def new(cls, grid_key, directory=CHECKPOINT_DIR):
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        return cls(f"{grid_key}_{timestamp}", directory)
+
+    @classmethod
+    def find_latest(cls, grid_key, directory=CHECKPOINT_DIR):
+        """Return the most recent checkpoint for this grid, or None."""
+        paths = sorted(glob.glob(os.path.join(directory, f"{grid_key}_*.jsonl")))
+        if not paths:
+            return None
+        run_id = os.path.splitext(os.path.basename(paths[-1]))[0]
+        return cls(run_id, directory)
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_no, line in enumerate(f, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    logger.warning(f"Skipping corrupt checkpoint line {line_no} in {self.path}")
+                    continue
+                self._done[entry['hash']] = entry
+        logger.info(f"Loaded {len(self._done)} completed points from {self.path}")
+
+    def __len__(self):
+        return len(self._done)
+
+    def is_done(self, params):
+        return param_hash(params) in self._done
+
+    def get(self, params):
+        entry = self._done.get(param_hash(params))
+        return entry['result'] if entry else None
+
+    def record(self, params, result):
+        entry = {
+            'run_id': self.run_id,
+            'hash': param_hash(params),
+            'params': params,
+            'result': result
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, default=_json_default) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._done[entry['hash']] = entry
+
+    def results(self):
+        return [entry['result'] for entry in self._done.values()]
+
+
+class BacktestStateStore:
+    """
+    End-of-data engine states for incremental backtests, one JSON file per
+    (symbol, timeframe, strategy, parameters) key.
+
+    A state records the number of bars it was taken on and their
+    data_checksum(); BacktestEngine.run() resumes from it only when the new
+    data starts with exactly those bars, so edited or re-downloaded history
+    falls back to a full run.
+    """
+
+    def __init__(self, directory=STATE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(code, time_unit, params):
+        return f"{code}_{time_unit}_{param_hash(params)}"
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            logger.warning(f"Ignoring unreadable backtest state {path}: {e}")
+            return None
+        if state.get('version') != STATE_VERSION:
+            return None
+        return _restore_times(state)
+
+    def save(self, key, state):
+        state = dict(state, version=STATE_VERSION, saved=datetime.now().isoformat())
+        path = self._path(key)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(state, f, default=_json_default)
+        # Atomic replace: a crash never leaves a half-written state behind
+        os.replace(tmp, path)
+
+    def delete(self, key):
+        path = self._path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _restore_times(state):
+    # Timestamps are stored as strings; the engine works with pd.Timestamp
+    def ts(value):
+        return None if value is None else pd.Timestamp(value)
+
+    for name in ('start_date', 'end_date'):
+        state[name] = ts(state.get(name))
+    if state.get('position'):
+        state['position']['time'] = ts(state['position']['time'])
+    if state.get('last_exit'):
+        state['last_exit']['time'] = ts(state['last_exit']['time'])
+    for trade in state.get('trades', []):
+        trade['entry_time'] = ts(trade['entry_time'])
+        trade['exit_time'] = ts(trade['exit_time'])
+    return state
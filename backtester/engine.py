@@ -1,18 +1,32 @@
 import pandas as pd
+import numpy as np
 import os
 from datetime import datetime
 from datetime import timedelta
 from config import settings
+from config.profiles import load_profiles
 from utils.logger import setup_logger
 from utils.market_time import get_trading_days_diff
 from utils.price_utils import get_tick_size
 from utils.trend_analyzer import TrendAnalyzer, TrendType
+from backtester.results_db import ResultsDB
+from backtester.exit_scan import ExitScanner, EXIT_NONE, exit_reason_text
+from backtester.checkpoint import BacktestStateStore, data_checksum, INDICATOR_TAIL
 
 logger = setup_logger("Backtester")
 
 class BacktestEngine:
-    def __init__(self, strategy, rsi_oversold=None, stop_loss_pct=None, take_profit_pct=None, max_hold_days=None, min_profit_yield=None, max_hold_max_days=None):
+    def __init__(self, strategy, rsi_oversold=None, stop_loss_pct=None, take_profit_pct=None, max_hold_days=None, min_profit_yield=None, max_hold_max_days=None, profiles=None):
+        """
+        Explicit parameters (an optimization trial) take precedence over the
+        symbol's profile; the rest are resolved from `profiles`
+        (default: config.profiles.load_profiles()) once per run.
+        """
         self.strategy = strategy
+        self.profiles = profiles
+        self._overrides = {k: v for k, v in (('stop_loss_pct', stop_loss_pct), ('take_profit_pct', take_profit_pct),
+                                             ('max_hold_days', max_hold_days), ('min_profit_yield', min_profit_yield),
+                                             ('max_hold_max_days', max_hold_max_days)) if v is not None}
         self.initial_capital = settings.INITIAL_CAPITAL
         self.balance = self.initial_capital
         self.position = None # { 'price': float, 'qty': int, 'time': datetime, 'cost': float }
@@ -30,9 +44,13 @@ class BacktestEngine:
         self.fee_buy = 0.00015 # 0.015%
         self.fee_sell = 0.00015 + 0.0018 # 0.015% + 0.18% Tax
         
-    def run(self, df, code="UNKNOWN", save_results=True):
+    def run(self, df, code="UNKNOWN", save_results=True, time_unit="60", state_store=None):
         """
         Run backtest on the provided DataFrame.
+        time_unit is the bar size of df (e.g. "60", "30"), recorded with the results.
+        state_store: backtester.checkpoint.BacktestStateStore. The engine state at the
+            last bar (before the end-of-data close) is saved there, and a later run
+            on the same bars plus new ones resumes from it, walking only the new bars.
         """
         self.balance = self.initial_capital
         self.save_results = save_results
@@ -42,24 +60,40 @@ class BacktestEngine:
         self.start_date = None
         self.end_date = None
         self.code = code
+        self.time_unit = str(time_unit)
         self.result_dir = "backtest_results"
         self.last_exit = None # { 'time': datetime, 'reason': str }
-        self.cooldown_days = settings.STOP_LOSS_COOLDOWN_DAYS
         self.total_fees = 0.0
-        self.market_type = settings.MARKET_TYPE_MAP.get(code, "KOSPI")
+        self._resolve_profile(code)
         
         if not os.path.exists(self.result_dir):
             os.makedirs(self.result_dir)
         
         logger.info(f"Starting Backtest. Initial Capital: {self.balance}")
         
-        # Pre-calculate indicators
-        df_with_indicators = self.strategy.calculate_indicators(df.copy())
-        
-        last_row = None
-        last_time = None
-        
-        for index, row in df_with_indicators.iterrows():
+        state_key = self._state_key() if state_store is not None else None
+        state = self._resumable_state(state_store, state_key, df)
+        start = state['rows'] if state else 0
+        # Indicators only need a warm-up tail before the first bar to walk
+        offset = max(0, start - INDICATOR_TAIL) if state else 0
+        window = df.iloc[offset:]
+        
+        # Pre-calculate indicators and the strategy's entry/exit rules
+        indicators = self.strategy.indicators(window)
+        if state and not self._indicators_match(indicators, start - 1 - offset, state['indicators']):
+            logger.warning(f"{code}: indicator tail does not reproduce the saved state. Running in full.")
+            state, start, offset, window = None, 0, 0, df
+            indicators = self.strategy.indicators(df)
+        if state:
+            self._restore_state(state)
+            logger.info(f"Resuming {code} from bar {start} ({len(df) - start} new bars)")
+        self.entry_signal = self.strategy.entry_signals(indicators, self._entry_threshold())
+        self.exit_signal = self.strategy.exit_signals(indicators)
+        
+        last_row = df.iloc[start - 1] if start else None
+        last_time = self.end_date
+        
+        for pos, (index, row) in enumerate(window.iloc[start - offset:].iterrows(), start - offset):
             last_row = row
             current_time = row['time'] # assume string or datetime
             
@@ -79,11 +113,14 @@ class BacktestEngine:
             
             # 1. Manage Position
             if self.position:
-                self._check_exit_conditions(row, current_time)
+                self._check_exit_conditions(row, current_time, pos)
             
             # 2. Check Entry (if no position)
             if not self.position:
-                self._check_entry_conditions(row, index, df_with_indicators, current_time)
+                self._check_entry_conditions(row, pos, current_time)
+        
+        if state_store is not None and len(df):
+            state_store.save(state_key, self._snapshot_state(df, indicators, len(window) - 1))
                 
         # Finalize - Force Close
         if self.position and last_row is not None:
@@ -91,7 +128,188 @@ class BacktestEngine:
             
         return self._calculate_performance()
         
-    def _check_exit_conditions(self, row, current_time):
+    def _state_key(self):
+        # Everything the bar walk depends on besides the data
+        params = dict(self.get_params(), strategy=self.strategy.name,
+                      indicators=self.strategy.required_indicators(), market_type=self.market_type,
+                      cooldown_days=self.cooldown_days, initial_capital=self.initial_capital,
+                      fee_buy=self.fee_buy, fee_sell=self.fee_sell)
+        return BacktestStateStore.key(self.code, self.time_unit, params)
+    
+    def _resumable_state(self, store, key, df):
+        """Saved state whose bars are an unchanged prefix of df, else None."""
+        if store is None:
+            return None
+        state = store.load(key)
+        if state is None:
+            return None
+        rows = state['rows']
+        if rows > len(df) or rows == 0 or data_checksum(df, rows) != state['checksum']:
+            logger.info(f"{self.code}: stored bars changed since the saved state. Running in full.")
+            return None
+        return state
+    
+    def _indicators_match(self, indicators, i, saved):
+        current = indicators.values_at(i)
+        return current.keys() == saved.keys() and all(
+            np.allclose(current[k], saved[k], rtol=1e-9, atol=1e-9, equal_nan=True) for k in saved)
+    
+    def _snapshot_state(self, df, indicators, last):
+        return {
+            'rows': len(df),
+            'checksum': data_checksum(df),
+            'balance': self.balance,
+            'total_fees': self.total_fees,
+            'position': self.position,
+            'last_exit': self.last_exit,
+            'trades': self.trades,
+            'start_date': self.start_date,
+            'end_date': self.end_date,
+            'indicators': indicators.values_at(last),
+        }
+    
+    def _restore_state(self, state):
+        self.balance = state['balance']
+        self.total_fees = state['total_fees']
+        self.position = state['position']
+        self.last_exit = state['last_exit']
+        self.trades = state['trades']
+        self.start_date = state['start_date']
+        self.end_date = state['end_date']
+    
+    def prepare_scanner(self, df, code="UNKNOWN", indicators=None):
+        """
+        Build the ExitScanner for df once; pass it to run_fast() to reuse it
+        across an exit-parameter sweep (or across strategies, which then share
+        its IndicatorCache).
+        """
+        indicators = self.strategy.indicators(df, cache=indicators)
+        return ExitScanner(df, self._profile_for(code).market_type, indicators=indicators)
+
+    def run_fast(self, df, code="UNKNOWN", save_results=True, time_unit="60", scanner=None):
+        """
+        Same rules and results as run(), evaluated as a jump-table walk:
+        entry candidates and their first exits are precomputed with vectorized
+        forward scans, then only the trades themselves are walked in Python.
+        """
+        self.balance = self.initial_capital
+        self.save_results = save_results
+        self.position = None
+        self.df = df
+        self.trades = []
+        self.code = code
+        self.time_unit = str(time_unit)
+        self.result_dir = "backtest_results"
+        self.last_exit = None
+        self.total_fees = 0.0
+        self._resolve_profile(code)
+        
+        if not os.path.exists(self.result_dir):
+            os.makedirs(self.result_dir)
+        
+        if scanner is None:
+            scanner = self.prepare_scanner(df, code)
+        
+        self.start_date = scanner.times[0] if scanner.length else None
+        self.end_date = scanner.times[-1] if scanner.length else None
+        
+        candidates = scanner.entry_candidates(self.strategy, self._entry_threshold())
+        exit_idx, exit_reason = scanner.first_exits(candidates, self.stop_loss_pct, self.take_profit_pct,
+                                                    self.max_hold_days, self.max_hold_max_days, self.min_profit_yield,
+                                                    strategy_exits=scanner.exit_mask(self.strategy))
+        
+        k = 0
+        while k < len(candidates):
+            i = candidates[k]
+            self._buy_at(scanner, i)
+            if not self.position:
+                # Not enough balance for one share; try the next signal
+                k += 1
+                continue
+            
+            j = exit_idx[k]
+            reason = exit_reason_text(exit_reason[k], scanner.sell_price[j], self.position['price'])
+            self._sell_at(scanner, j, reason)
+            if exit_reason[k] == EXIT_NONE:
+                break
+            
+            # Next entry: first signal at or after the exit bar (same-bar re-entry is allowed),
+            # after the Stop Loss cooldown if the exit was a Stop Loss
+            k = np.searchsorted(candidates, j, side='left')
+            if reason == "Stop Loss":
+                resume_ord = scanner.day_ord[j] + self.cooldown_days
+                k = max(k, np.searchsorted(scanner.day_ord[candidates], resume_ord, side='left'))
+        
+        return self._calculate_performance()
+    
+    def _buy_at(self, scanner, i):
+        # Mirrors _buy() on precomputed arrays
+        buy_price = float(scanner.buy_price[i])
+        max_buy_amt = self.balance * 0.95
+        qty = int(max_buy_amt / (buy_price * (1 + self.fee_buy)))
+        if qty > 0:
+            cost = qty * buy_price
+            fee = cost * self.fee_buy
+            self.balance -= (cost + fee)
+            self.total_fees += fee
+            self.position = {
+                'price': buy_price,
+                'qty': qty,
+                'time': scanner.times[i],
+                'cost': cost,
+                'fee_entry': fee
+            }
+    
+    def _sell_at(self, scanner, j, reason):
+        # Mirrors _sell() on precomputed arrays
+        sell_price = float(scanner.sell_price[j])
+        current_time = scanner.times[j]
+        qty = self.position['qty']
+        
+        revenue = qty * sell_price
+        fee = revenue * self.fee_sell
+        net_revenue = revenue - fee
+        self.balance += net_revenue
+        self.total_fees += fee
+        
+        pnl = net_revenue - (self.position['cost'] + self.position['fee_entry'])
+        pnl_pct = (pnl / (self.position['cost'] + self.position['fee_entry'])) * 100
+        
+        self.trades.append({
+            'entry_time': self.position['time'],
+            'exit_time': current_time,
+            'entry_price': self.position['price'],
+            'exit_price': sell_price,
+            'qty': qty,
+            'pnl': int(pnl),
+            'pnl_pct': round(pnl_pct, 2),
+            'reason': reason
+        })
+        
+        self.last_exit = {
+            'time': current_time,
+            'reason': reason
+        }
+        self.position = None
+        
+    def _profile_for(self, code):
+        return (load_profiles() if self.profiles is None else self.profiles).get(code)
+
+    def _resolve_profile(self, code):
+        """Take the symbol's parameters from its profile, keeping explicit __init__ values."""
+        self.profile = self._profile_for(code)
+        for name in ('stop_loss_pct', 'take_profit_pct', 'max_hold_days', 'min_profit_yield', 'max_hold_max_days'):
+            setattr(self, name, self._overrides.get(name, getattr(self.profile, name)))
+        self.rsi_oversold = self.fixed_rsi if self.fixed_rsi is not None else self.profile.rsi_oversold
+        self.cooldown_days = self.profile.cooldown_days
+        self.market_type = self.profile.market_type
+
+    def _entry_threshold(self):
+        # Priority: 1. Fixed value passed to __init__ (Optimization)
+        #           2. Symbol profile (stock-specific setting or global default), see _resolve_profile
+        return self.rsi_oversold
+    
+    def _check_exit_conditions(self, row, current_time, pos):
         current_price = row['close']
         entry_price = self.position['price']
         
@@ -130,34 +348,14 @@ class BacktestEngine:
             else:
                 # Extending holding
                 logger.debug(f"Holding extended: {days_held} days, PnL {pnl_pct:.2f}% < {self.min_profit_yield}%")
-                return
-            
-    def _check_entry_conditions(self, row, index, df, current_time):
-        # We need to check if the Strategy signal fired.
-        # Strategy `generate_signal` logic:
-        # macd_bullish = (macd > signal) and (hist > 0)
-        # rsi_oversold = rsi < threshold
-        
-        rsi = row['rsi']
-        macd = row['macd']
-        signal = row['signal']
-        hist = row['histogram']
-        
-        # Check condition
-        macd_bullish = (macd > signal) and (hist > 0)
         
-        # Determine RSI Threshold
-        # Priority: 1. Fixed value passed to __init__ (Optimization)
-        #           2. Stock-specific setting in Map
-        #           3. Global Default
-        if self.fixed_rsi is not None:
-            threshold = self.fixed_rsi
-        else:
-            threshold = settings.RSI_OVERSOLD_MAP.get(self.code, settings.RSI_OVERSOLD)
+        # 4. Strategy exit rule (if the strategy defines one)
+        if self.exit_signal is not None and self.exit_signal[pos]:
+            self._sell(row, "Strategy Exit", current_time)
             
-        rsi_oversold = rsi < threshold
-        
-        if macd_bullish and rsi_oversold:
+    def _check_entry_conditions(self, row, pos, current_time):
+        # Entry rule is the strategy's own (entry_signals, precomputed in run())
+        if self.entry_signal[pos]:
             # Check Cooldown
             if self.last_exit and "Stop Loss" in self.last_exit['reason']:
                 days_diff = get_trading_days_diff(self.last_exit['time'], current_time)
@@ -253,7 +451,7 @@ class BacktestEngine:
         summary_file = os.path.join(self.result_dir, f"summary_{self.code}_{timestamp}.txt")
         
         # Get Stock Name
-        stock_name = settings.STOCK_NAMES.get(self.code, "Unknown")
+        stock_name = self.profile.name
         display_name = f"{stock_name}({self.code})"
         
         # Calculate Statistics
@@ -322,4 +520,29 @@ class BacktestEngine:
              with open(summary_file, 'a') as f:
                 f.write(f"Trend: {trend_result['trend'].value} (Slope: {trend_result['slope']:.6f})\n")
         
+        if self.save_results:
+            self._record_to_db(result, summary_file)
+        
         return result
+    
+    def get_params(self):
+        """Effective strategy/exit parameters of the last run."""
+        return {
+            'rsi_oversold': self._entry_threshold(),
+            'rsi_period': getattr(self.strategy, 'rsi_period', None),
+            'stop_loss_pct': self.stop_loss_pct,
+            'take_profit_pct': self.take_profit_pct,
+            'max_hold_days': self.max_hold_days,
+            'max_hold_max_days': self.max_hold_max_days,
+            'min_profit_yield': self.min_profit_yield
+        }
+    
+    def _record_to_db(self, result, summary_file):
+        # The results DB is an index on top of the text files; never fail a backtest over it
+        try:
+            with ResultsDB() as db:
+                db.record_run("backtest", self.code, self.time_unit, self.get_params(), result,
+                              trades=self.trades, period=(self.start_date, self.end_date),
+                              source=summary_file)
+        except Exception as e:
+            logger.error(f"Failed to record results to DB: {e}")
@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from strategy.registry import IndicatorCache
+from utils.market_time import trading_day_ordinals
+from utils.price_utils import get_tick_sizes
+
+# Exit reason codes produced by ExitScanner.first_exits
+EXIT_STOP_LOSS = 0
+EXIT_TAKE_PROFIT = 1
+EXIT_MAX_HOLD_LIMIT = 2
+EXIT_MAX_HOLD_PROFIT = 3
+EXIT_NONE = 4 # Still open at the last bar ("Backtest End")
+EXIT_STRATEGY = 5 # Strategy's own exit rule
+
+
+def exit_reason_text(code, sell_price, entry_price):
+    """Engine reason string for an exit reason code."""
+    if code == EXIT_STOP_LOSS:
+        return "Stop Loss"
+    if code == EXIT_TAKE_PROFIT:
+        return "Take Profit"
+    if code == EXIT_MAX_HOLD_LIMIT:
+        pnl_pct = (sell_price - entry_price) / entry_price * 100
+        status = "PROFIT" if pnl_pct >= 0 else "LOSS"
+        return f"Max Hold Limit Reached ({status})"
+    if code == EXIT_MAX_HOLD_PROFIT:
+        return "Max Hold (Profit Met)"
+    if code == EXIT_STRATEGY:
+        return "Strategy Exit"
+    return "Backtest End"
+
+
+def parse_times(values):
+    """
+    Vectorized version of the engine's per-row time parsing.
+    Returns a DatetimeIndex-like array; rows that fail to parse become NaT.
+    """
+    series = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return pd.to_datetime(series).values
+    if pd.api.types.is_numeric_dtype(series):
+        numeric = series.astype(np.float64)
+        strings = numeric.map(lambda v: str(int(v)) if np.isfinite(v) else "")
+    else:
+        strings = series.map(lambda v: v if isinstance(v, str) else (str(int(float(v))) if pd.notna(v) else ""))
+    return pd.to_datetime(strings, format="%Y%m%d%H%M%S", errors='coerce').values
+
+
+class ExitScanner:
+    """
+    Precomputes everything the engine's exit and cooldown rules need as arrays,
+    so a backtest becomes a walk over entry signals instead of every bar.
+
+    For each candidate entry bar, `first_exits` finds the first later bar that
+    triggers Stop Loss, Take Profit, the max-hold hard limit, the max-hold
+    exit with MIN_PROFIT_YIELD met, or the strategy's exit rule, using a vectorized forward scan bounded by
+    the hard limit (trading-day ordinals make the holding period an integer
+    difference).
+    """
+
+    CHUNK = 2048
+
+    def __init__(self, df, market_type="KOSPI", indicators=None):
+        """
+        df: OHLCV bars. indicators: IndicatorCache for df (built if omitted);
+        strategies evaluate their rules on it, so several strategies scanned
+        over the same data share their indicators.
+        """
+        times = parse_times(df['time'].values)
+        valid = ~pd.isna(times)
+        # Indicators cover every row (like the engine); rules are masked to parseable rows
+        self.valid = valid
+        self.indicators = indicators if indicators is not None else IndicatorCache(df)
+        df = df[valid]
+
+        self.times = pd.DatetimeIndex(times[valid])
+        self.length = len(df)
+        self.close = df['close'].to_numpy(dtype=np.float64)
+        self.buy_price = self.close + get_tick_sizes(self.close, market_type)
+        self.sell_price = self.close - get_tick_sizes(self.close, market_type)
+        self.day_ord = trading_day_ordinals(self.times.values)
+
+    def entry_mask(self, strategy, threshold=None):
+        """Bool array over bars where the strategy's entry rule fires."""
+        return np.asarray(strategy.entry_signals(self.indicators, threshold), dtype=bool)[self.valid]
+
+    def exit_mask(self, strategy):
+        """Bool array of the strategy's own exit rule, or None if it has none."""
+        mask = strategy.exit_signals(self.indicators)
+        return None if mask is None else np.asarray(mask, dtype=bool)[self.valid]
+
+    def entry_candidates(self, strategy, threshold=None):
+        """Bar indices where the strategy's entry rule fires."""
+        return np.flatnonzero(self.entry_mask(strategy, threshold))
+
+    def first_exits(self, entries, stop_loss_pct, take_profit_pct, max_hold_days, max_hold_max_days, min_profit_yield,
+                    strategy_exits=None):
+        """
+        For each entry bar index, return (exit bar index, reason code).
+        strategy_exits: optional exit_mask() of the strategy, checked after the engine rules.
+        Entries with no exit before the data ends get (last index, EXIT_NONE).
+        """
+        entries = np.asarray(entries, dtype=np.int64)
+        exit_idx = np.full(len(entries), self.length - 1, dtype=np.int64)
+        reasons = np.full(len(entries), EXIT_NONE, dtype=np.int8)
+        # Chunk entries to bound the (entries x window) scratch matrices
+        for start in range(0, len(entries), self.CHUNK):
+            chunk = slice(start, start + self.CHUNK)
+            exit_idx[chunk], reasons[chunk] = self._scan(entries[chunk], stop_loss_pct, take_profit_pct,
+                                                         max_hold_days, max_hold_max_days, min_profit_yield,
+                                                         strategy_exits)
+        return exit_idx, reasons
+
+    def _scan(self, entries, stop_loss_pct, take_profit_pct, max_hold_days, max_hold_max_days, min_profit_yield,
+              strategy_exits=None):
+        n = self.length
+        exit_idx = np.full(len(entries), n - 1, dtype=np.int64)
+        reasons = np.full(len(entries), EXIT_NONE, dtype=np.int8)
+        if len(entries) == 0 or n == 0:
+            return exit_idx, reasons
+
+        # The hard limit bounds the scan: first bar held >= max_hold_max_days trading days
+        limit = np.searchsorted(self.day_ord, self.day_ord[entries] + max_hold_max_days, side='left')
+        width = int(np.max(np.minimum(limit, n - 1) - entries))
+        if width <= 0:
+            return exit_idx, reasons
+
+        offsets = np.arange(1, width + 1)
+        idx = entries[:, None] + offsets[None, :]
+        in_range = (idx <= np.minimum(limit, n - 1)[:, None]) & (idx < n)
+        idx = np.minimum(idx, n - 1)
+
+        entry_price = self.buy_price[entries][:, None]
+        pnl_pct = (self.sell_price[idx] - entry_price) / entry_price * 100
+        days_held = self.day_ord[idx] - self.day_ord[entries][:, None]
+
+        stop = pnl_pct <= stop_loss_pct
+        take = pnl_pct >= take_profit_pct
+        hard = days_held >= max_hold_max_days
+        profit_met = (days_held >= max_hold_days) & (pnl_pct >= min_profit_yield)
+        fired = stop | take | hard | profit_met
+        if strategy_exits is not None:
+            fired = fired | strategy_exits[idx]
+        fired &= in_range
+
+        has_exit = fired.any(axis=1)
+        first = np.argmax(fired, axis=1)
+        rows = np.flatnonzero(has_exit)
+        cols = first[rows]
+
+        exit_idx[rows] = idx[rows, cols]
+        # Same priority as the engine: SL, TP, hard limit, profit met, strategy exit
+        reason = np.full(len(rows), EXIT_STRATEGY, dtype=np.int8)
+        reason[profit_met[rows, cols]] = EXIT_MAX_HOLD_PROFIT
+        reason[hard[rows, cols]] = EXIT_MAX_HOLD_LIMIT
+        reason[take[rows, cols]] = EXIT_TAKE_PROFIT
+        reason[stop[rows, cols]] = EXIT_STOP_LOSS
+        reasons[rows] = reason
+        return exit_idx, reasons
@@ -0,0 +1,189 @@
+import os
+import sqlite3
+from datetime import datetime, timedelta
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger("ResultsDB")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,              -- 'backtest' | 'optimize'
+    code TEXT NOT NULL,
+    timeframe TEXT NOT NULL,         -- '60', '30', ...
+    created_at TEXT NOT NULL,        -- 'YYYY-MM-DD HH:MM:SS'
+    period_start TEXT,
+    period_end TEXT,
+    optimizer_run_id TEXT,           -- checkpoint run ID for optimization sweeps
+    source TEXT                      -- file imported from, if any
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    name TEXT NOT NULL,
+    value REAL,
+    PRIMARY KEY (run_id, name)
+);
+CREATE TABLE IF NOT EXISTS trades (
+    run_id INTEGER NOT NULL REFERENCES runs(id),
+    code TEXT NOT NULL,
+    entry_time TEXT,
+    exit_time TEXT,
+    entry_price REAL,
+    exit_price REAL,
+    qty INTEGER,
+    pnl INTEGER,
+    pnl_pct REAL,
+    reason TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_runs_code_tf_date ON runs(code, timeframe, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_kind_date ON runs(kind, created_at);
+CREATE INDEX IF NOT EXISTS idx_runs_optimizer ON runs(optimizer_run_id);
+CREATE INDEX IF NOT EXISTS idx_metrics_name ON metrics(name, value);
+CREATE INDEX IF NOT EXISTS idx_trades_run ON trades(run_id);
+CREATE INDEX IF NOT EXISTS idx_trades_code_date ON trades(code, entry_time);
+"""
+
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+class ResultsDB:
+    """
+    SQLite store for backtest and optimization results.
+
+    Tables: runs (one row per engine run), params / metrics (name-value rows
+    per run) and trades. Runs are indexed by code, timeframe and date so
+    cross-run questions do not need the text files in backtest_results/.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or settings.RESULTS_DB_PATH
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def record_run(self, kind, code, timeframe, params, metrics, trades=None,
+                   period=(None, None), optimizer_run_id=None, created_at=None, source=None):
+        """Insert one run with its params, numeric metrics and trades. Returns the run id."""
+        created_at = created_at or datetime.now().strftime(DATE_FORMAT)
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO runs (kind, code, timeframe, created_at, period_start, period_end, optimizer_run_id, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind, code, str(timeframe), created_at,
+                 _to_text(period[0]), _to_text(period[1]), optimizer_run_id, source)
+            )
+            run_id = cur.lastrowid
+            self.conn.executemany(
+                "INSERT INTO params (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, k, float(v)) for k, v in params.items() if v is not None]
+            )
+            self.conn.executemany(
+                "INSERT INTO metrics (run_id, name, value) VALUES (?, ?, ?)",
+                [(run_id, k, float(v)) for k, v in metrics.items() if isinstance(v, (int, float))]
+            )
+            if trades:
+                self.conn.executemany(
+                    "INSERT INTO trades (run_id, code, entry_time, exit_time, entry_price, exit_price, qty, pnl, pnl_pct, reason) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, code, _to_text(t['entry_time']), _to_text(t['exit_time']),
+                      float(t['entry_price']), float(t['exit_price']), int(t['qty']),
+                      int(t['pnl']), float(t['pnl_pct']), t['reason']) for t in trades]
+                )
+        return run_id
+
+    def runs(self, code=None, timeframe=None, kind=None, since=None, limit=50):
+        """List runs (newest first) with their params and metrics merged in."""
+        sql = "SELECT * FROM runs WHERE 1=1"
+        args = []
+        if code:
+            sql += " AND code = ?"
+            args.append(code)
+        if timeframe:
+            sql += " AND timeframe = ?"
+            args.append(str(timeframe))
+        if kind:
+            sql += " AND kind = ?"
+            args.append(kind)
+        if since:
+            sql += " AND created_at >= ?"
+            args.append(since)
+        sql += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        args.append(limit)
+        return [self._with_details(dict(r)) for r in self.conn.execute(sql, args)]
+
+    def latest_run(self, code=None, kind="backtest"):
+        runs = self.runs(code=code, kind=kind, limit=1)
+        return runs[0] if runs else None
+
+    def trades(self, run_id):
+        rows = self.conn.execute("SELECT * FROM trades WHERE run_id = ? ORDER BY entry_time", (run_id,))
+        return [dict(r) for r in rows]
+
+    def best_runs(self, metric="return", kind=None, since=None, timeframe=None, codes=None):
+        """
+        Best run per code (highest `metric`) among runs matching the filters,
+        e.g. best SL/TP per symbol over the last month of optimization runs.
+        """
+        sql = """
+            SELECT * FROM (
+                SELECT r.*, m.value AS metric_value,
+                       ROW_NUMBER() OVER (PARTITION BY r.code ORDER BY m.value DESC, r.id DESC) AS rank
+                FROM runs r JOIN metrics m ON m.run_id = r.id AND m.name = ?
+                WHERE 1=1 {filters}
+            ) WHERE rank = 1 ORDER BY metric_value DESC
+        """
+        filters = ""
+        args = [metric]
+        if kind:
+            filters += " AND r.kind = ?"
+            args.append(kind)
+        if since:
+            filters += " AND r.created_at >= ?"
+            args.append(since)
+        if timeframe:
+            filters += " AND r.timeframe = ?"
+            args.append(str(timeframe))
+        if codes:
+            filters += f" AND r.code IN ({','.join('?' * len(codes))})"
+            args.extend(codes)
+        rows = self.conn.execute(sql.format(filters=filters), args)
+        return [self._with_details(dict(r)) for r in rows]
+
+    def _with_details(self, run):
+        run['params'] = {r['name']: r['value'] for r in
+                         self.conn.execute("SELECT name, value FROM params WHERE run_id = ?", (run['id'],))}
+        run['metrics'] = {r['name']: r['value'] for r in
+                          self.conn.execute("SELECT name, value FROM metrics WHERE run_id = ?", (run['id'],))}
+        return run
+
+
+def since_days(days):
+    """created_at lower bound for 'the last N days'."""
+    return (datetime.now() - timedelta(days=days)).strftime(DATE_FORMAT)
+
+
+def _to_text(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.strftime(DATE_FORMAT)
+    return str(value)
@@ -1,6 +1,8 @@
 
 from config import settings
+from config.profiles import load_profiles
 from backtester.engine import BacktestEngine
+from backtester.checkpoint import BacktestStateStore
 from strategy.rsi_macd import RsiMacdStrategy
 from data.data_manager import DataManager
 from utils.logger import setup_logger
@@ -13,27 +15,31 @@ def run_batch_backtest():
     dm = DataManager(use_api=False)
     strategy = RsiMacdStrategy()
     engine = BacktestEngine(strategy)
+    # Each symbol resumes from its last run's end state when only new bars were appended
+    state_store = BacktestStateStore()
+    profiles = load_profiles()
     
     results = []
     
     print(f"Starting Batch Backtest for {len(settings.TARGET_STOCKS)} stocks...")
     
     for c in settings.TARGET_STOCKS:
-        # Determine Timeframe
-        timeframe = settings.TIMEFRAME_MAP.get(c, "60")
+        # Determine Timeframe (calibrated profile, else TIMEFRAME_MAP)
+        profile = profiles.get(c)
+        timeframe = profile.timeframe
         
         # Load data
-        df = dm.load_data(c, time_unit=timeframe)
+        df = dm.load_data(c, time_unit=timeframe, prefer_legacy=True)
         if df is None:
             # Try reloading? Or just logging error
             logger.error(f"No data for {c}")
             continue
             
         # Run Backtest
-        res = engine.run(df, code=c, save_results=True)
+        res = engine.run(df, code=c, save_results=True, time_unit=timeframe, state_store=state_store)
         
         res['code'] = c
-        res['name'] = settings.STOCK_NAMES.get(c, c)
+        res['name'] = profile.name
         res['tf'] = "1H" if timeframe == "60" else f"{timeframe}M"
         results.append(res)
 
@@ -0,0 +1,53 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Imports of each CLI path, up to the point where work starts
+SCENARIOS = {
+    'backtest': "import main; from backtester.engine import BacktestEngine; "
+                "from backtester.batch_engine import run_strategies; from strategy.registry import get_strategy; "
+                "from data.data_manager import DataManager; DataManager(use_api=False)",
+    'optimizer worker': "from backtester.batch_engine import BatchBacktestEngine; from strategy.rsi_macd import RsiMacdStrategy; "
+                        "from data.data_manager import DataManager; from backtester.results_db import ResultsDB; "
+                        "DataManager(use_api=False)",
+    'broker (eager)': "from data.data_manager import DataManager; import api.kiwoom; api.kiwoom._library()",
+    'bot': "from bot.trader import TradingBot; import api.kiwoom; api.kiwoom._library()",
+}
+# Modules offline paths must not load
+BROKER_MODULES = ("kiwoom_rest_api", "httpx", "requests", "utils.telegram_bot")
+
+PROBE = """
+import sys, json
+{code}
+print(json.dumps(sorted({{m.split('.')[0] if not m.startswith('utils.') else m for m in sys.modules
+                         if m.startswith({modules!r})}})))
+"""
+
+
+def run_once(code):
+    start = time.perf_counter()
+    out = subprocess.run([sys.executable, "-c", PROBE.format(code=code, modules=BROKER_MODULES)],
+                         capture_output=True, text=True, check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    return time.perf_counter() - start, json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark interpreter start-up + imports of the CLI paths")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = min(run_once("pass")[0] for _ in range(args.repeat))
+    print(f"{'Path':<18} | {'Best (ms)':>9} | {'Imports (ms)':>12} | Broker/HTTP modules loaded")
+    print("-" * 80)
+    print(f"{'python -c pass':<18} | {baseline * 1000:9.1f} | {0:12.1f} |")
+    for name, code in SCENARIOS.items():
+        runs = [run_once(code) for _ in range(args.repeat)]
+        best = min(t for t, _ in runs)
+        print(f"{name:<18} | {best * 1000:9.1f} | {(best - baseline) * 1000:12.1f} | {', '.join(runs[0][1]) or '-'}")
+
+
+if __name__ == '__main__':
+    main()
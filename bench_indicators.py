@@ -0,0 +1,68 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from strategy import indicators
+from strategy.rsi_macd import RsiMacdStrategy
+
+BARS_PER_DAY_30M = 13 # 09:00 ~ 15:00 session
+TRADING_DAYS_PER_YEAR = 248
+
+
+def make_close(n_bars, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.round(10000 + np.cumsum(rng.normal(0, 25, n_bars)), -1).clip(min=100)
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pandas vs array indicator backends")
+    parser.add_argument("--years", type=int, default=10, help="Years of synthetic 30M bars")
+    parser.add_argument("--symbols", type=int, default=20, help="Symbols for the batch benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    n_bars = args.years * TRADING_DAYS_PER_YEAR * BARS_PER_DAY_30M
+    close = make_close(n_bars)
+    df = pd.DataFrame({'close': close})
+    print(f"{args.years} years of 30M bars: {n_bars} rows (array backend: {indicators.BACKEND})")
+
+    pandas_strategy = RsiMacdStrategy(backend="pandas")
+    array_strategy = RsiMacdStrategy(backend="array")
+
+    # Parity
+    expected = pandas_strategy.calculate_indicators(df.copy())
+    actual = array_strategy.calculate_indicators(df.copy())
+    for col in ['rsi', 'macd', 'signal', 'histogram']:
+        diff = np.nanmax(np.abs(expected[col].values - actual[col].values))
+        print(f"  max |diff| {col:<9}: {diff:.2e}")
+
+    t_pandas = best_of(lambda: pandas_strategy.calculate_indicators(df.copy()), args.repeat)
+    t_array = best_of(lambda: array_strategy.calculate_indicators(df.copy()), args.repeat)
+    print(f"Single symbol : pandas {t_pandas * 1000:8.2f} ms | array {t_array * 1000:8.2f} ms | x{t_pandas / t_array:.1f}")
+
+    # RSI period sweep (3..14) on one symbol
+    periods = list(range(3, 15))
+    t_pandas = best_of(lambda: [RsiMacdStrategy(rsi_period=p, backend="pandas").calculate_indicators(df.copy())
+                                for p in periods], args.repeat)
+    t_array = best_of(lambda: (indicators.rsi(close, periods), indicators.macd(close)), args.repeat)
+    print(f"RSI periods {periods[0]}-{periods[-1]}: pandas {t_pandas * 1000:8.2f} ms | array {t_array * 1000:8.2f} ms | x{t_pandas / t_array:.1f}")
+
+    # Many symbols in one (time x symbol) matrix
+    matrix = np.column_stack([make_close(n_bars, seed) for seed in range(args.symbols)])
+    frames = [pd.DataFrame({'close': matrix[:, i]}) for i in range(args.symbols)]
+    t_pandas = best_of(lambda: [pandas_strategy.calculate_indicators(f.copy()) for f in frames], args.repeat)
+    t_array = best_of(lambda: (indicators.rsi(matrix, 14), indicators.macd(matrix)), args.repeat)
+    print(f"{args.symbols} symbols batch: pandas {t_pandas * 1000:8.2f} ms | array {t_array * 1000:8.2f} ms | x{t_pandas / t_array:.1f}")
+
+
+if __name__ == "__main__":
+    main()
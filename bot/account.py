@@ -0,0 +1,151 @@
+"""
+Account snapshot shared by the trading cycle.
+
+One kt00018 request returns both the balance and the holdings, so the bot
+reads them from a single cached snapshot instead of querying once for the
+balance and again for the holdings. Orders update the snapshot optimistically
+(cash and quantities move by the order amount, fees included) so the next
+buy in the same cycle is sized on post-order cash; the broker's view is then
+fetched in the background by reconcile_async() and replaces the estimate.
+
+An order still open at the broker is a reservation keyed to its OrderManager
+record: it is applied on top of every fetched snapshot until the order is
+settled (filled) or released (rejected / cancelled), however long that takes.
+A settled fill is kept only until a fetch that started after it.
+"""
+import threading
+import time
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger("Account")
+
+FEE_RATE = 0.00015 # 0.015%
+SELL_TAX = 0.0018 # 0.18%
+
+
+class AccountService:
+    """
+    api: KiwoomAPI (get_account_snapshot()).
+    ttl: seconds a fetched snapshot is served from cache (default settings.ACCOUNT_SNAPSHOT_TTL).
+    background: reconcile in a thread; False reconciles inline (deterministic replays).
+    """
+
+    def __init__(self, api, ttl=None, background=True):
+        self.api = api
+        self.ttl = settings.ACCOUNT_SNAPSHOT_TTL if ttl is None else ttl
+        self.background = background
+        self.requests = 0 # kt00018 calls made
+        self.orders = 0 # Orders applied
+        self._snapshot = None
+        self._fetched = 0.0
+        self._pending = [] # Confirmed fills not yet seen by a fetch: (time, code, side, qty, price)
+        self._reserved = {} # id(order record) -> (order, code, side, qty, price) of open orders
+        self._lock = threading.Lock()
+        self._fetch_lock = threading.Lock()
+        self._reconciler = None
+
+    def _fetch(self):
+        with self._fetch_lock:
+            started = time.monotonic()
+            snapshot = self.api.get_account_snapshot()
+            self.requests += 1
+            if snapshot is None:
+                return None
+            with self._lock:
+                # Fills confirmed while the request was in flight may not be reflected yet
+                self._pending = [u for u in self._pending if u[0] >= started]
+                for _, code, side, qty, price in self._pending:
+                    self._apply(snapshot, code, side, qty, price)
+                for _, code, side, qty, price in self._reserved.values():
+                    self._apply(snapshot, code, side, qty, price)
+                self._snapshot, self._fetched = snapshot, time.monotonic()
+                return self._snapshot
+
+    def snapshot(self, max_age=None):
+        """
+        Current snapshot ({'balance', 'cash', 'holdings'}), fetched if older than
+        max_age seconds (default ttl). Returns the last known one if the fetch fails.
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            if self._snapshot is not None and time.monotonic() - self._fetched <= max_age:
+                return self._snapshot
+        return self._fetch() or self._snapshot
+
+    @property
+    def cash(self):
+        """Cash of the last snapshot, including our orders since (no request)."""
+        with self._lock:
+            return self._snapshot['cash'] if self._snapshot else None
+
+    @property
+    def holdings(self):
+        """Holdings of the last snapshot, including our orders since (no request)."""
+        with self._lock:
+            return dict(self._snapshot['holdings']) if self._snapshot else {}
+
+    @staticmethod
+    def _apply(snapshot, code, side, qty, price, sign=1):
+        amount = qty * price
+        holdings = snapshot['holdings']
+        if side == "BUY":
+            snapshot['cash'] -= sign * amount * (1 + FEE_RATE)
+            holdings[code] = holdings.get(code, 0) + sign * qty
+        else:
+            snapshot['cash'] += sign * amount * (1 - FEE_RATE - SELL_TAX)
+            holdings[code] = holdings.get(code, 0) - sign * qty
+        if holdings[code] <= 0:
+            del holdings[code]
+
+    def apply_order(self, code, side, qty, price, order=None):
+        """
+        Reflect an order in the cached snapshot until the broker's view includes it.
+        order: the OrderManager record of an order not filled yet; it is reserved
+        until settle_order() / release_order(). Without it the update is a
+        confirmed fill.
+        """
+        with self._lock:
+            self.orders += 1
+            if order is None:
+                self._pending.append((time.monotonic(), code, side, qty, price))
+            else:
+                self._reserved[id(order)] = (order, code, side, qty, price)
+            if self._snapshot is not None:
+                self._apply(self._snapshot, code, side, qty, price)
+
+    def release_order(self, order):
+        """Drop the reservation of an order that was rejected or cancelled unfilled."""
+        with self._lock:
+            reserved = self._reserved.pop(id(order), None)
+            if reserved is not None and self._snapshot is not None:
+                self._apply(self._snapshot, *reserved[1:], sign=-1)
+
+    def settle_order(self, order):
+        """Replace an order's reservation (if any) by its fill: the record's filled_qty at fill_price."""
+        fill = (order['code'], order['side'], order['filled_qty'], order['fill_price'])
+        with self._lock:
+            reserved = self._reserved.pop(id(order), None)
+            if self._snapshot is not None:
+                if reserved is not None:
+                    self._apply(self._snapshot, *reserved[1:], sign=-1)
+                self._apply(self._snapshot, *fill)
+            # The broker has it now: a fetch started from here on includes it
+            self._pending.append((time.monotonic(), *fill))
+
+    def reconcile_async(self):
+        """Refetch the snapshot in a background thread (one at a time)."""
+        if not self.background:
+            self._reconcile()
+            return None
+        if self._reconciler and self._reconciler.is_alive():
+            return self._reconciler
+        self._reconciler = threading.Thread(target=self._reconcile, name="AccountReconcile", daemon=True)
+        self._reconciler.start()
+        return self._reconciler
+
+    def _reconcile(self):
+        try:
+            self._fetch()
+        except Exception as e:
+            logger.error(f"Account reconcile failed: {e}")
@@ -0,0 +1,211 @@
+"""
+Non-blocking order pipeline for the trading bot.
+
+submit() returns at once: the order is sent from a small worker pool, so a
+cycle's later symbols don't wait on earlier order round-trips. Accepted
+orders (acknowledged with an order number) are polled for fills (ka10076)
+by a background thread; once an order is filled the `on_fill` callback gets
+the record with the broker's fill quantity and average price. Rejected
+orders go to `on_reject`. An order not (fully) filled within the timeout
+has its remainder cancelled (kt10003) and stays open, still polled, until
+the broker shows nothing left outstanding; a fill arriving meanwhile is
+kept. Only then is it finished with the final filled quantity: `on_fill`
+for a (partial) fill, `on_reject` when nothing filled.
+
+Every finished order is appended to settings.ORDER_LOG_FILE (JSONL) with
+its latencies from the signal: to the acknowledgement and to the fill.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger("OrderManager")
+
+OPEN_STATES = ("pending", "acked", "cancelling")
+LIVE_STATES = ("acked", "cancelling") # Polled for fills
+
+
+class OrderManager:
+    """
+    api: KiwoomAPI (place_order / cancel_order / get_order_fills).
+    on_submit(record): called by submit() before the order is sent.
+    on_fill(record), on_reject(record): called from background threads.
+    """
+
+    def __init__(self, api, on_fill=None, on_reject=None, workers=None, poll_interval=None,
+                 fill_timeout=None, log_file=None, on_submit=None):
+        self.api = api
+        self.on_submit = on_submit
+        self.on_fill = on_fill
+        self.on_reject = on_reject
+        self.poll_interval = settings.ORDER_POLL_INTERVAL if poll_interval is None else poll_interval
+        self.fill_timeout = settings.ORDER_FILL_TIMEOUT if fill_timeout is None else fill_timeout
+        self.log_file = settings.ORDER_LOG_FILE if log_file is None else log_file
+        self.orders = [] # All records of this session, in submission order
+        self._pool = ThreadPoolExecutor(max_workers=workers or settings.ORDER_WORKERS, thread_name_prefix="Order")
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._poller = None
+        self._active = 0 # Orders whose callback hasn't completed
+        self._stop = threading.Event()
+
+    def submit(self, code, side, qty, est_price, reason="", signal_time=None):
+        """
+        Queue a market order; returns its record (a dict updated in place).
+        signal_time: time.monotonic() of the signal, for the latency record (default now).
+        """
+        now = time.monotonic()
+        record = {
+            'code': code, 'side': side, 'qty': int(qty), 'est_price': float(est_price), 'reason': reason,
+            'status': "pending", 'ord_no': None, 'filled_qty': 0, 'fill_price': None, 'error': None,
+            'submitted': datetime.now().isoformat(),
+            't_signal': now if signal_time is None else signal_time, 't_ack': None, 't_fill': None,
+            't_cancel': None,
+        }
+        if self.on_submit:
+            self.on_submit(record)
+        with self._lock:
+            self.orders.append(record)
+            self._active += 1
+        self._pool.submit(self._send, record)
+        return record
+
+    def has_open(self, code):
+        with self._lock:
+            return any(r['code'] == code and r['status'] in OPEN_STATES for r in self.orders)
+
+    def open_orders(self):
+        with self._lock:
+            return [r for r in self.orders if r['status'] in OPEN_STATES]
+
+    def wait(self, timeout=None):
+        """Block until every order is finished and its callback has run; returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._changed:
+            while self._active:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._changed.wait(remaining)
+        return True
+
+    def shutdown(self):
+        """Send queued orders, wait for their fills or cancels (up to twice the fill timeout), then stop polling."""
+        self._pool.shutdown(wait=True)
+        if not self.wait(2 * self.fill_timeout + self.poll_interval):
+            for record in self.open_orders():
+                logger.warning(f"Order still open at shutdown: {record['side']} {record['code']} "
+                               f"{record['filled_qty']}/{record['qty']} ({record['status']}, #{record['ord_no']})")
+        self._stop.set()
+        poller = self._poller
+        if poller:
+            poller.join()
+
+    def _send(self, record):
+        try:
+            res = self.api.place_order(record['code'], record['qty'], record['side'], 0) # Market Order
+        except Exception as e:
+            res, record['error'] = None, str(e)
+        ord_no = res.get('ord_no') if res else None
+        if not ord_no:
+            self._finish(record, "rejected", error=record['error'] or f"Order not accepted: {res}")
+            return
+        with self._lock:
+            record['ord_no'] = str(ord_no)
+            record['t_ack'] = time.monotonic()
+            record['status'] = "acked"
+        logger.info(f"Order acked: {record['side']} {record['code']} {record['qty']} "
+                    f"(#{record['ord_no']}, {(record['t_ack'] - record['t_signal']) * 1000:.0f} ms)")
+        self._ensure_poller()
+
+    def _ensure_poller(self):
+        with self._lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll_loop, name="OrderFills", daemon=True)
+                self._poller.start()
+
+    def _poll_loop(self):
+        while not self._stop.is_set():
+            with self._lock:
+                live = [r for r in self.orders if r['status'] in LIVE_STATES]
+                if not live:
+                    # Exits under the lock, so an order acked from now on starts a new poller
+                    self._poller = None
+                    return
+            # One ka10076 request per symbol covers all of its open orders
+            for code in dict.fromkeys(r['code'] for r in live):
+                fills = self.api.get_order_fills(code)
+                if fills is None:
+                    continue
+                for record in (r for r in live if r['code'] == code):
+                    self._update(record, fills.get(record['ord_no']))
+            now = time.monotonic()
+            for record in live:
+                if record['status'] == "acked" and now - record['t_ack'] > self.fill_timeout:
+                    self._cancel(record)
+                elif record['status'] == "cancelling" and now - record['t_cancel'] > self.fill_timeout:
+                    # Still outstanding: the cancel failed or was lost, send it again
+                    self._cancel(record)
+            self._stop.wait(self.poll_interval)
+
+    def _cancel(self, record):
+        with self._lock:
+            record['status'] = "cancelling"
+            record['t_cancel'] = time.monotonic()
+        res = self.api.cancel_order(record['code'], record['ord_no'])
+        logger.warning(f"Order not filled within {self.fill_timeout}s: {record['side']} {record['code']} "
+                       f"{record['filled_qty']}/{record['qty']} (#{record['ord_no']}), "
+                       f"{'cancelling the rest' if res else 'cancel failed, will retry'}")
+
+    def _update(self, record, fill):
+        if not fill:
+            return
+        if fill['filled'] > 0:
+            record['filled_qty'] = fill['filled']
+            record['fill_price'] = fill['price']
+        closed = fill['remaining'] == 0 # Nothing outstanding at the broker
+        if fill['filled'] >= record['qty'] or (closed and fill['filled'] and record['status'] == "acked"):
+            self._finish(record, "filled")
+        elif closed and record['status'] == "cancelling":
+            # Cancel confirmed: the quantity filled by now is final
+            self._finish(record, "partial" if fill['filled'] else "cancelled",
+                         error=f"Not filled within {self.fill_timeout}s, rest cancelled")
+
+    def _finish(self, record, status, error=None):
+        with self._lock:
+            record['status'] = status
+            record['error'] = error
+            if status in ("filled", "partial"):
+                record['t_fill'] = time.monotonic()
+        self._log(record)
+        callback = self.on_fill if status in ("filled", "partial") else self.on_reject
+        if status in ("filled", "partial"):
+            logger.info(f"Order filled: {record['side']} {record['code']} {record['filled_qty']}/{record['qty']} "
+                        f"@ {record['fill_price']} (#{record['ord_no']})")
+        else:
+            logger.warning(f"Order {status}: {record['side']} {record['code']} {record['qty']} ({error})")
+        try:
+            if callback:
+                callback(record)
+        except Exception as e:
+            logger.error(f"Order callback failed for {record['code']}: {e}")
+        finally:
+            with self._changed:
+                self._active -= 1
+                self._changed.notify_all()
+
+    def _log(self, record):
+        def ms(t):
+            return None if t is None else round((t - record['t_signal']) * 1000, 1)
+        entry = {k: record[k] for k in ('code', 'side', 'qty', 'est_price', 'status', 'ord_no',
+                                         'filled_qty', 'fill_price', 'reason', 'error', 'submitted')}
+        entry.update({'ack_ms': ms(record['t_ack']), 'fill_ms': ms(record['t_fill']), 'cancel_ms': ms(record['t_cancel'])})
+        if not self.log_file:
+            return
+        with self._lock:
+            with open(self.log_file, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
@@ -0,0 +1,116 @@
+"""
+Stop-loss / take-profit monitoring of open positions between trading cycles.
+
+The hourly cycle downloads full chart histories to compute entry signals and
+only sees a position's price once an hour, so a stop can be blown far past
+in between. The monitor polls just the current price of the symbols held
+(one ka10001 request each; the broker's REST API has no streaming quotes in
+the client library) every settings.PRICE_MONITOR_INTERVAL seconds and sells
+through the bot as soon as TradingBot.price_exit() triggers. Holding-period
+exits stay with the cycle.
+
+Feeds only need get_prices(codes) -> {code: price}; LocalPriceFeed is an
+in-process stand-in for tests and replays.
+"""
+import threading
+import time
+from config import settings
+from utils.logger import setup_logger
+
+logger = setup_logger("PriceMonitor")
+
+
+class PollingPriceFeed:
+    """Current prices polled from the broker (KiwoomAPI.get_current_price)."""
+
+    def __init__(self, api):
+        self.api = api
+
+    def get_prices(self, codes):
+        prices = {}
+        for code in codes:
+            price = self.api.get_current_price(code)
+            if price:
+                prices[code] = price
+        return prices
+
+
+class LocalPriceFeed:
+    """Prices set by the caller (set()), for tests and offline runs."""
+
+    def __init__(self, prices=None):
+        self.prices = dict(prices or {})
+        self.requests = 0
+
+    def set(self, code, price):
+        self.prices[code] = price
+
+    def get_prices(self, codes):
+        self.requests += 1
+        return {code: self.prices[code] for code in codes if code in self.prices}
+
+
+class PriceMonitor:
+    """
+    bot: TradingBot (positions, price_exit, execute_sell, order_manager, is_market_open).
+    feed: price source (default PollingPriceFeed(bot.api)).
+    interval: seconds between checks (default settings.PRICE_MONITOR_INTERVAL).
+    """
+
+    def __init__(self, bot, feed=None, interval=None):
+        self.bot = bot
+        self.feed = PollingPriceFeed(bot.api) if feed is None else feed
+        self.interval = settings.PRICE_MONITOR_INTERVAL if interval is None else interval
+        self.checks = 0
+        self._thread = None
+        self._stop = threading.Event()
+
+    def check_once(self):
+        """Check every open position once; returns the codes a sell was submitted for."""
+        bot = self.bot
+        with bot._state_lock:
+            # A symbol with an order in flight is already being entered or exited
+            codes = [code for code in bot.positions if not bot.order_manager.has_open(code)]
+        if not codes:
+            return []
+        prices = self.feed.get_prices(codes)
+        signal_time = time.monotonic()
+        self.checks += 1
+
+        sold = []
+        for code, price in prices.items():
+            with bot._state_lock:
+                pos = bot.positions.get(code)
+                if pos is None: # Sold by the cycle meanwhile
+                    continue
+                pnl_pct, reason = bot.price_exit(code, price)
+                if reason is None:
+                    continue
+                logger.info(f"{code}: {reason} at {price} (PnL {pnl_pct:.2f}%)")
+                bot.execute_sell(code, pos['qty'], price, reason, signal_time=signal_time)
+                sold.append(code)
+        return sold
+
+    def start(self):
+        """Run check_once() every interval in a daemon thread while the market is open."""
+        if self.interval <= 0 or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="PriceMonitor", daemon=True)
+        self._thread.start()
+        logger.info(f"Price monitor started ({self.interval}s interval).")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            if not self.bot.is_market_open():
+                continue
+            try:
+                self.check_once()
+            except Exception as e:
+                logger.error(f"Price check failed: {e}")
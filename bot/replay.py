@@ -0,0 +1,354 @@
+"""
+Accelerated historical replay of the live TradingBot.
+
+Drives the real TradingBot code path (run_cycle -> process_stock ->
+check_exit / execute_buy / execute_sell -> fill callbacks -> _save_state)
+over stored bars, with the bot's outside world swapped for in-process
+stand-ins:
+
+    ReplayClock         the bot's datetime source, set to each step's time
+    ReplayBroker        in-memory market + account: serves the bars closed by
+                        the clock (get_ohlcv_frame), fills market orders at the
+                        last close +/- one tick with the backtest's fees
+    ReplayOrderManager  sends and fills orders synchronously (no threads)
+    NullNotifier        collects messages instead of sending them
+
+Schedules:
+    "bars"  a cycle at every bar close of the symbols' profile timeframes,
+            the backtest's evaluation points (used by parity_check)
+    "live"  a cycle at HH:01 of every trading hour, as TradingBot.start()
+
+The broker only has closed bars, while a live HH:01 cycle also sees the
+bar that just opened; months of market time replay in seconds.
+
+parity_check() replays one symbol and compares its trades with
+BacktestEngine.run() on the same bars.
+"""
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from config import settings
+from config.profiles import load_profiles
+from data.bar_store import parse_bar_times
+from bot.account import FEE_RATE, SELL_TAX
+from bot.trader import TradingBot
+from utils.logger import setup_logger
+from utils.market_time import is_trading_day
+from utils.price_utils import get_tick_size
+
+logger = setup_logger("Replay")
+
+SESSION_OPEN = 9 * 3600
+SESSION_CLOSE = 15 * 3600 + 30 * 60
+EPOCH = datetime(1970, 1, 1)
+
+
+def _to_datetime(seconds):
+    return EPOCH + timedelta(seconds=int(seconds))
+
+
+def _seconds(dt):
+    return int((dt - EPOCH).total_seconds())
+
+
+class ReplayClock:
+    """Callable datetime source for TradingBot(clock=...)."""
+
+    def __init__(self, now=None):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def set(self, now):
+        self.now = now
+
+
+class NullNotifier:
+    """send_message() sink; keeps the messages for inspection."""
+
+    def __init__(self):
+        self.messages = []
+
+    def send_message(self, message):
+        self.messages.append(message)
+
+
+class ReplayBroker:
+    """
+    KiwoomAPI stand-in over stored bars.
+    frames: {code: DataFrame of the code's profile timeframe (time, open, high, low, close, volume)}.
+    clock: ReplayClock; a bar is visible once its end time has passed.
+    lookback: bars served by get_ohlcv_frame (default all up to the clock, so
+        indicators match the backtest's full-history values).
+    """
+
+    def __init__(self, frames, clock, profiles=None, deposit=None, lookback=None):
+        self.clock = clock
+        self.profiles = load_profiles() if profiles is None else profiles
+        self.cash = float(settings.INITIAL_CAPITAL if deposit is None else deposit)
+        self.lookback = lookback
+        self.holdings = {}
+        self.orders = []
+        self.requests = 0 # get_ohlcv_frame calls
+        self._series = {}
+        for code, df in frames.items():
+            starts = parse_bar_times(df['time'].values)
+            order = np.argsort(starts, kind='stable')
+            frame = df.iloc[order].reset_index(drop=True)
+            frame['time'] = [_to_datetime(t).strftime("%Y%m%d%H%M%S") for t in starts[order]]
+            minutes = int(self.profiles.get(code).timeframe)
+            starts = starts[order]
+            day_close = starts - starts % 86400 + SESSION_CLOSE
+            self._series[code] = {
+                'frame': frame,
+                'ends': np.minimum(starts + minutes * 60, day_close),
+                'close': frame['close'].values.astype(float),
+            }
+
+    def bar_ends(self, code):
+        """End times (epoch seconds) of the code's bars, ascending."""
+        return self._series[code]['ends']
+
+    def _visible(self, code):
+        series = self._series.get(code)
+        if series is None:
+            return None, 0
+        return series, int(np.searchsorted(series['ends'], _seconds(self.clock()), side='right'))
+
+    def get_ohlcv_frame(self, code, time_unit="60", days=1095, strict=False):
+        self.requests += 1
+        series, n = self._visible(code)
+        if series is None:
+            return None
+        start = 0 if self.lookback is None else max(0, n - self.lookback)
+        return series['frame'].iloc[start:n]
+
+    def get_current_price(self, code):
+        series, n = self._visible(code)
+        return series['close'][n - 1] if n else None
+
+    def _fill_price(self, code, side, price):
+        tick = get_tick_size(price, self.profiles.get(code).market_type)
+        return price + tick if side == "BUY" else price - tick
+
+    def place_order(self, code, qty, order_type="BUY", price=0):
+        series, n = self._visible(code)
+        if not n or qty <= 0:
+            return None
+        fill = self._fill_price(code, order_type, series['close'][n - 1]) if price == 0 else price
+        amount = qty * fill
+        if order_type == "BUY":
+            if amount * (1 + FEE_RATE) > self.cash:
+                return None
+            self.cash -= amount * (1 + FEE_RATE)
+            self.holdings[code] = self.holdings.get(code, 0) + qty
+        else:
+            if self.holdings.get(code, 0) < qty:
+                return None
+            self.cash += amount * (1 - FEE_RATE - SELL_TAX)
+            self.holdings[code] -= qty
+            if not self.holdings[code]:
+                del self.holdings[code]
+        order = {'ord_no': f"{len(self.orders) + 1:07d}", 'code': code, 'side': order_type, 'qty': qty,
+                 'price': fill, 'bar_time': series['frame']['time'].iloc[n - 1], 'time': self.clock()}
+        self.orders.append(order)
+        return {'ord_no': order['ord_no'], 'return_code': 0}
+
+    def get_order_fills(self, code):
+        return {o['ord_no']: {'filled': o['qty'], 'remaining': 0, 'price': o['price']}
+                for o in self.orders if o['code'] == code}
+
+    def get_account_snapshot(self):
+        evaluation = sum(qty * (self.get_current_price(code) or 0) for code, qty in self.holdings.items())
+        return {'balance': self.cash + evaluation, 'cash': self.cash, 'holdings': dict(self.holdings)}
+
+
+class ReplayOrderManager:
+    """OrderManager stand-in: each order is sent and filled inside submit()."""
+
+    def __init__(self, api, on_fill=None, on_reject=None, on_submit=None, **kwargs):
+        self.api = api
+        self.on_submit = on_submit
+        self.on_fill = on_fill
+        self.on_reject = on_reject
+        self.orders = []
+
+    def submit(self, code, side, qty, est_price, reason="", signal_time=None):
+        record = {
+            'code': code, 'side': side, 'qty': int(qty), 'est_price': float(est_price), 'reason': reason,
+            'status': "pending", 'ord_no': None, 'filled_qty': 0, 'fill_price': None, 'error': None,
+            'submitted': None,
+        }
+        self.orders.append(record)
+        if self.on_submit:
+            self.on_submit(record)
+        res = self.api.place_order(code, record['qty'], side, 0)
+        if not res:
+            record.update(status="rejected", error="Order not accepted")
+            if self.on_reject:
+                self.on_reject(record)
+            return record
+        fill = self.api.get_order_fills(code)[res['ord_no']]
+        record.update(status="filled", ord_no=res['ord_no'], filled_qty=fill['filled'], fill_price=fill['price'])
+        if self.on_fill:
+            self.on_fill(record)
+        return record
+
+    def has_open(self, code):
+        return False
+
+    def open_orders(self):
+        return []
+
+    def wait(self, timeout=None):
+        return True
+
+    def shutdown(self):
+        pass
+
+
+def _schedule_times(broker, codes, schedule):
+    """Step times (epoch seconds) and, for "bars", the codes whose bar closes at each."""
+    if schedule == "bars":
+        steps = {}
+        for code in codes:
+            for end in broker.bar_ends(code):
+                steps.setdefault(int(end), []).append(code)
+        return sorted(steps.items())
+    if schedule == "live":
+        ends = np.concatenate([broker.bar_ends(code) for code in codes])
+        days = np.unique(ends - ends % 86400)
+        days = days[is_trading_day(days.astype('datetime64[s]'))]
+        hours = np.arange(9, 16) * 3600 + 60 # HH:01, 09:01 ~ 15:01
+        return [(int(t), list(codes)) for t in (days[:, None] + hours[None, :]).ravel()]
+    raise ValueError(f"Unknown schedule '{schedule}' (use 'bars' or 'live')")
+
+
+def replay(frames, profiles=None, schedule="bars", start=None, end=None, deposit=None, lookback=None):
+    """
+    Run TradingBot over `frames` ({code: bars of the code's profile timeframe}).
+    start / end: datetimes limiting the replayed steps (bars before `start` still serve as history).
+    Returns {'trades', 'orders', 'open_positions', 'final_balance', 'return', 'steps', 'elapsed', 'messages'}.
+    """
+    profiles = load_profiles() if profiles is None else profiles
+    clock = ReplayClock()
+    broker = ReplayBroker(frames, clock, profiles, deposit, lookback)
+    notifier = NullNotifier()
+    state_dir = tempfile.mkdtemp(prefix="replay_")
+    try:
+        bot = TradingBot(profiles=profiles, api=broker, clock=clock, notifier=notifier,
+                         order_manager_cls=ReplayOrderManager,
+                         state_file=os.path.join(state_dir, "bot_state.json"))
+        # Fills reconcile the account inline, so every cycle sizes on the broker's cash
+        bot.account.background = False
+
+        steps = _schedule_times(broker, list(frames), schedule)
+        lo = None if start is None else _seconds(start)
+        hi = None if end is None else _seconds(end)
+        began = time.perf_counter()
+        count = 0
+        for t, codes in steps:
+            if (lo is not None and t < lo) or (hi is not None and t > hi):
+                continue
+            clock.set(_to_datetime(t))
+            bot.target_stocks = codes
+            bot.run_cycle()
+            count += 1
+        elapsed = time.perf_counter() - began
+        open_positions = dict(bot.positions)
+    finally:
+        shutil.rmtree(state_dir, ignore_errors=True)
+
+    snapshot = broker.get_account_snapshot()
+    initial = float(settings.INITIAL_CAPITAL if deposit is None else deposit)
+    logger.info(f"Replayed {count} cycles ({schedule}) in {elapsed:.2f}s: {len(broker.orders)} orders, "
+                f"balance {snapshot['balance']:.0f}")
+    return {
+        'trades': _pair_trades(broker.orders, bot.order_manager.orders),
+        'orders': broker.orders,
+        'open_positions': open_positions,
+        'final_balance': snapshot['balance'],
+        'return': (snapshot['balance'] - initial) / initial * 100,
+        'steps': count,
+        'elapsed': elapsed,
+        'messages': notifier.messages,
+    }
+
+
+def _pair_trades(fills, records):
+    """Closed round trips from the broker's fills, with the bot's exit reasons."""
+    reasons = {r['ord_no']: r['reason'] for r in records if r['ord_no']}
+    entries = {}
+    trades = []
+    for fill in fills:
+        if fill['side'] == "BUY":
+            entries[fill['code']] = fill
+            continue
+        entry = entries.pop(fill['code'], None)
+        if entry is None:
+            continue
+        trades.append({
+            'code': fill['code'],
+            'entry_time': entry['bar_time'],
+            'exit_time': fill['bar_time'],
+            'entry_price': entry['price'],
+            'exit_price': fill['price'],
+            'qty': fill['qty'],
+            'reason': reasons.get(fill['ord_no'], ""),
+        })
+    return trades
+
+
+def _reason_kind(reason):
+    # "Max Hold (Profit Met 3.10%)" (bot) and "Max Hold (Profit Met)" (backtest) are the same exit
+    return reason.split(" (")[0]
+
+
+def compare_trades(expected, got):
+    """
+    Align two lists of closed trades (entry_time/exit_time as YYYYMMDDHHMMSS
+    strings) by entry bar. A trade matches when the other side entered on the
+    same bar and agrees on exit bar, prices and exit reason; quantities are
+    compared up to the first mismatch only, since one missed or extra trade
+    changes the capital every later trade is sized on.
+    Returns (matched, [(entry_time, expected trade, got trade)]), the missing side None.
+    """
+    fields = ('exit_time', 'entry_price', 'exit_price')
+    by_entry = ({t['entry_time']: t for t in expected}, {t['entry_time']: t for t in got})
+    matched = 0
+    mismatches = []
+    for entry_time in sorted(set(by_entry[0]) | set(by_entry[1])):
+        a, b = by_entry[0].get(entry_time), by_entry[1].get(entry_time)
+        same = (a is not None and b is not None and all(a[f] == b[f] for f in fields)
+                and _reason_kind(a['reason']) == _reason_kind(b['reason'])
+                and (mismatches or a['qty'] == b['qty']))
+        if same:
+            matched += 1
+        else:
+            mismatches.append((entry_time, a, b))
+    return matched, mismatches
+
+
+def parity_check(code, df, profiles=None, strategy=None):
+    """
+    Replay `code` on `df` (bars of its profile timeframe) and run BacktestEngine
+    on the same bars; compare the closed trades by entry bar (compare_trades).
+    Returns {'backtest': n, 'replay': n, 'matched': n, 'mismatches': [(entry_time, backtest trade, replay trade)]}.
+    """
+    from backtester.engine import BacktestEngine
+    from strategy.rsi_macd import RsiMacdStrategy
+
+    profiles = load_profiles() if profiles is None else profiles
+    engine = BacktestEngine(strategy or RsiMacdStrategy(), profiles=profiles)
+    engine.run(df, code=code, save_results=False, time_unit=profiles.get(code).timeframe)
+    expected = [dict(t, entry_time=t['entry_time'].strftime("%Y%m%d%H%M%S"),
+                     exit_time=t['exit_time'].strftime("%Y%m%d%H%M%S"))
+                for t in engine.trades if t['reason'] != "Backtest End"]
+    got = replay({code: df}, profiles)['trades']
+
+    matched, mismatches = compare_trades(expected, got)
+    return {'backtest': len(expected), 'replay': len(got), 'matched': matched, 'mismatches': mismatches}
@@ -1,11 +1,16 @@
 import time
 import json
+import threading
 import os
 import pandas as pd
 from datetime import datetime, timedelta
 from api.kiwoom import KiwoomAPI
 from strategy.rsi_macd import RsiMacdStrategy
 from config import settings
+from config.profiles import load_profiles
+from bot.account import AccountService
+from bot.order_manager import OrderManager
+from bot.price_monitor import PriceMonitor
 from utils.logger import setup_logger
 from utils.telegram_bot import TelegramBot
 from config.holidays import MARKET_HOLIDAYS
@@ -15,22 +20,46 @@ from utils.price_utils import get_tick_size
 logger = setup_logger("TradingBot")
 
 class TradingBot:
-    def __init__(self):
-        self.api = KiwoomAPI()
+    def __init__(self, profiles=None, bars=None, api=None, clock=None, notifier=None,
+                 order_manager_cls=None, state_file="bot_state.json"):
+        """
+        profiles: config.profiles.ProfileRegistry (default load_profiles()).
+        bars: data.bar_aggregator.BarAggregator fed by a tick stream; when set, signals
+            are computed on its bars (on_bar_close) instead of REST chart downloads.
+        api, clock, notifier, order_manager_cls: broker client (default KiwoomAPI()),
+            datetime source (default datetime.now), message sink with send_message()
+            (default TelegramBot) and order pipeline class (default OrderManager);
+            bot/replay.py swaps them for a simulated market.
+        """
+        self.api = KiwoomAPI() if api is None else api
+        self.clock = datetime.now if clock is None else clock
+        # Balance + holdings from one kt00018 request, updated by our own orders
+        self.account = AccountService(self.api)
+        # Orders are sent and confirmed in the background; fills update the positions
+        self.order_manager = (order_manager_cls or OrderManager)(self.api, on_submit=self._on_submit,
+                                                                 on_fill=self._on_fill, on_reject=self._on_reject)
+        self._state_lock = threading.RLock() # positions / last_exits are also updated from fill callbacks
         self.strategy = RsiMacdStrategy()
-        self.telegram = TelegramBot(settings.TELEGRAM_BOT_TOKEN, settings.TELEGRAM_CHAT_ID)
+        if notifier is None:
+            notifier = TelegramBot(settings.TELEGRAM_BOT_TOKEN, settings.TELEGRAM_CHAT_ID)
+        self.telegram = notifier
+        # Per-symbol timeframe / thresholds / exit parameters (config.profiles)
+        self.profiles = load_profiles() if profiles is None else profiles
+        self.bars = bars
         
-        self.target_stocks = settings.TARGET_STOCKS
-        self.state_file = "bot_state.json"
+        self.target_stocks = list(self.profiles.targets)
+        self.state_file = state_file
         
         # Load state: { code: { 'qty': int, 'price': float, 'time': str } }
         self.positions = self._load_state()
+        # Stop-loss / take-profit checks on current prices between the hourly cycles
+        self.price_monitor = PriceMonitor(self)
 
     def _get_msg_prefix(self, code):
         mode_str = "모의거래" if settings.MODE == "PAPER" else "실거래"
         broker = "키움증권"
         # Get Stock Name
-        stock_name = settings.STOCK_NAMES.get(code, code)
+        stock_name = self.profiles.get(code).name
         stock_display = f"{stock_name}({code})"
         return f"[{mode_str}/{broker}/{stock_display}]"
 
@@ -53,12 +82,13 @@ class TradingBot:
         return {}
 
     def _save_state(self):
-        state = {
-            'positions': self.positions,
-            'last_exits': self.last_exits
-        }
-        with open(self.state_file, 'w') as f:
-            json.dump(state, f, indent=4)
+        with self._state_lock:
+            state = {
+                'positions': self.positions,
+                'last_exits': self.last_exits
+            }
+            with open(self.state_file, 'w') as f:
+                json.dump(state, f, indent=4)
 
     def sync_state_with_account(self):
         """
@@ -67,7 +97,11 @@ class TradingBot:
         """
         logger.info("Synchronizing Bot State with Real Account...")
         
-        real_holdings = self.api.get_holdings()
+        snapshot = self.account.snapshot()
+        if snapshot is None:
+            # Don't drop positions because the account query failed
+            raise RuntimeError("Account snapshot unavailable")
+        real_holdings = snapshot['holdings']
         
         # Check for locally tracked positions that are no longer in account
         to_remove = []
@@ -98,7 +132,7 @@ class TradingBot:
         logger.info("State Synchronization Complete.")
 
     def is_market_open(self):
-        now = datetime.now()
+        now = self.clock()
         # Weekends
         if now.weekday() >= 5:
             return False
@@ -117,42 +151,55 @@ class TradingBot:
     def run_cycle(self):
         logger.info("Running trading cycle...")
         
-        # Check Balance
-        balance = self.api.get_balance()
-        if balance is not None:
-            logger.info(f"Current Deposit: {balance}")
+        # Check Balance (one account query per cycle)
+        snapshot = self.account.snapshot(max_age=0)
+        if snapshot is not None:
+            logger.info(f"Current Deposit: {snapshot['balance']} (Cash: {snapshot['cash']})")
         
+        orders = self.account.orders
         for code in self.target_stocks:
             try:
-                self.process_stock(code, balance)
+                # Cash after the orders placed earlier in this cycle (no further query)
+                self.process_stock(code, self.account.cash)
             except Exception as e:
                 logger.error(f"Error processing {code}: {e}")
                 self.telegram.send_message(f"Error processing {code}: {e}")
+        
+        if self.account.orders != orders:
+            # Replace the optimistic estimate with the broker's view in the background
+            self.account.reconcile_async()
 
     def process_stock(self, code, balance):
+        if self.order_manager.has_open(code):
+            logger.info(f"{code}: Order in progress, skipping")
+            return
+        profile = self.profiles.get(code)
         # Fetch Data
         # Determine Timeframe
-        timeframe = settings.TIMEFRAME_MAP.get(code, "60") # Default to 60 (1H)
+        timeframe = profile.timeframe
         
         # We need enough history for indicators (at least ~50-100 bars)
         # get_ohlcv implementation in api might need to return enough rows.
         # Assuming get_ohlcv returns latest 100 rows or so.
-        data = self.api.get_ohlcv(code, timeframe)
+        if self.bars is not None:
+            df = self.bars.frame(code, timeframe)
+        else:
+            df = self.api.get_ohlcv_frame(code, timeframe)
         
-        if not data:
+        if df is None or df.empty:
             logger.warning(f"No data for {code} ({timeframe}M)")
             return
             
-        df = pd.DataFrame(data)
         df = df.sort_values('time')
         # Get specific RSI for this stock
-        rsi_oversold = settings.RSI_OVERSOLD_MAP.get(code, settings.RSI_OVERSOLD)
+        rsi_oversold = profile.rsi_oversold
         
         # Check Strategy Signal
         signal_result = self.strategy.generate_signal(df, rsi_oversold=rsi_oversold)
+        signal_time = time.monotonic() # Start of the order latency record
         last_row = df.iloc[-1]
         current_price = last_row['close']
-        current_time = datetime.now() # OR use API time
+        current_time = self.clock() # OR use API time
         
         # Check Position
         if code in self.positions:
@@ -165,20 +212,48 @@ class TradingBot:
                     last_exit = self.last_exits[code]
                     if "Stop Loss" in last_exit['reason']:
                         last_exit_time = datetime.fromisoformat(last_exit['time'])
-                        current_time_dt = datetime.now() # Use current time for check
+                        current_time_dt = self.clock() # Use current time for check
                         days_diff = get_trading_days_diff(last_exit_time, current_time_dt)
-                        if days_diff < settings.STOP_LOSS_COOLDOWN_DAYS:
-                            logger.info(f"Skipping Entry for {code} (Cooldown: {days_diff}/{settings.STOP_LOSS_COOLDOWN_DAYS} days)")
+                        if days_diff < profile.cooldown_days:
+                            logger.info(f"Skipping Entry for {code} (Cooldown: {days_diff}/{profile.cooldown_days} days)")
                             skipped = True
                 
                 if not skipped:
-                    self.execute_buy(code, current_price, balance, signal_result['reason'])
+                    self.execute_buy(code, current_price, balance, signal_result['reason'], signal_time=signal_time)
             else:
                 logger.info(f"{code}: No Signal ({signal_result['reason']})")
 
+    def on_bar_close(self, code, timeframe, bar):
+        """BarAggregator on_bar callback: evaluate a symbol when a bar of its timeframe closes."""
+        if code not in self.target_stocks or str(timeframe) != self.profiles.get(code).timeframe:
+            return
+        try:
+            self.account.snapshot() # Cached for ACCOUNT_SNAPSHOT_TTL across the symbols closing together
+            self.process_stock(code, self.account.cash)
+        except Exception as e:
+            logger.error(f"Error processing {code}: {e}")
+
+    def price_exit(self, code, current_price):
+        """
+        (PnL %, "Stop Loss" / "Take Profit" / None) of the open position at current_price.
+        Cheap enough to run on every price update (bot/price_monitor.py).
+        """
+        profile = self.profiles.get(code)
+        entry_price = self.positions[code]['price']
+        # Slippage: Sell at -Tick Size
+        tick = get_tick_size(current_price, profile.market_type)
+        sell_price = current_price - tick
+        pnl_pct = (sell_price - entry_price) / entry_price * 100
+        
+        if pnl_pct <= profile.stop_loss_pct:
+            return pnl_pct, "Stop Loss"
+        if pnl_pct >= profile.take_profit_pct:
+            return pnl_pct, "Take Profit"
+        return pnl_pct, None
+
     def check_exit(self, code, current_price, current_time):
+        profile = self.profiles.get(code)
         pos = self.positions[code]
-        entry_price = pos['price']
         entry_time_str = pos['time']
         # Parse Entry Time format depends on how we saved it. 
         # API returns YYYYMMDDHHMMSS usually.
@@ -190,35 +265,26 @@ class TradingBot:
         except:
             # Fallback or assume YYYYMMDDHHMMSS
             # Simpler: just calculate days diff if we can parse.
-            entry_time = datetime.now() # Fallback if parsing fails to avoid crash
-        
-        # Slippage: Sell at -Tick Size
-        market_type = settings.MARKET_TYPE_MAP.get(code, "KOSPI")
-        tick = get_tick_size(current_price, market_type)
-        sell_price = current_price - tick
-        pnl_pct = (sell_price - entry_price) / entry_price * 100
+            entry_time = self.clock() # Fallback if parsing fails to avoid crash
         
-        reason = None
+        pnl_pct, reason = self.price_exit(code, current_price)
         days_held = get_trading_days_diff(entry_time, current_time)
         
-        if pnl_pct <= settings.STOP_LOSS_PCT:
-            reason = "Stop Loss"
-        elif pnl_pct >= settings.TAKE_PROFIT_PCT:
-            reason = "Take Profit"
-        elif days_held >= settings.MAX_HOLD_MAX_DAYS:
-            reason = f"Max Hold Limit Reached ({days_held} days)"
-        elif days_held >= settings.MAX_HOLD_DAYS:
-            if pnl_pct >= settings.MIN_PROFIT_YIELD:
-                reason = f"Max Hold (Profit Met {pnl_pct:.2f}%)"
-            else:
-                # Extending holding
-                logger.debug(f"{code} holding extended: {days_held} days, PnL {pnl_pct:.2f}% < {settings.MIN_PROFIT_YIELD}%")
+        if reason is None:
+            if days_held >= profile.max_hold_max_days:
+                reason = f"Max Hold Limit Reached ({days_held} days)"
+            elif days_held >= profile.max_hold_days:
+                if pnl_pct >= profile.min_profit_yield:
+                    reason = f"Max Hold (Profit Met {pnl_pct:.2f}%)"
+                else:
+                    # Extending holding
+                    logger.debug(f"{code} holding extended: {days_held} days, PnL {pnl_pct:.2f}% < {profile.min_profit_yield}%")
 
             
         if reason:
             self.execute_sell(code, pos['qty'], current_price, reason)
 
-    def execute_buy(self, code, price, balance, reason):
+    def execute_buy(self, code, price, balance, reason, signal_time=None):
         # Calculate Qty
         # Allocate portion of capital? Or all in?
         # "초기 거래 시작 금액은 100만원... 수익과 손실이 발생하면 계속 누적"
@@ -244,51 +310,79 @@ class TradingBot:
             
         fee_rate = 0.00015
         # Slippage: Buy at +Tick Size
-        market_type = settings.MARKET_TYPE_MAP.get(code, "KOSPI")
+        market_type = self.profiles.get(code).market_type
         tick = get_tick_size(price, market_type)
         buy_price = price + tick
         qty = int(invest_amount / (buy_price * (1 + fee_rate)))
         
         if qty > 0:
-            res = self.api.place_order(code, qty, "BUY", 0) # Market Order
-            if res:
+            # The cash is reserved on submit (_on_submit), so later buys of this cycle are sized without it;
+            # the position is recorded when the fill is confirmed (_on_fill)
+            self.order_manager.submit(code, "BUY", qty, buy_price, reason, signal_time=signal_time)
+
+    def execute_sell(self, code, qty, price, reason, signal_time=None):
+        market_type = self.profiles.get(code).market_type
+        tick = get_tick_size(price, market_type)
+        sell_price = price - tick
+        # The hourly cycle and the price monitor may both decide to exit
+        with self._state_lock:
+            if self.order_manager.has_open(code):
+                return
+            self.order_manager.submit(code, "SELL", qty, sell_price, reason, signal_time=signal_time)
+
+    def _on_submit(self, order):
+        """OrderManager callback: reserve a buy's cash until the order is filled or rejected."""
+        if order['side'] == "BUY":
+            self.account.apply_order(order['code'], "BUY", order['qty'], order['est_price'], order=order)
+
+    def _on_fill(self, order):
+        """OrderManager callback: record the confirmed fill (real price and quantity)."""
+        code, qty, price = order['code'], order['filled_qty'], order['fill_price']
+        prefix = self._get_msg_prefix(code)
+        with self._state_lock:
+            # The reservation (buys) becomes the actual fill
+            self.account.settle_order(order)
+            if order['side'] == "BUY":
                 self.positions[code] = {
-                    'price': buy_price,
+                    'price': price,
                     'qty': qty,
-                    'time': datetime.now().isoformat()
+                    'time': self.clock().isoformat()
                 }
-                self._save_state()
-                import locale
-                prefix = self._get_msg_prefix(code)
-                msg = f"{prefix} BUY: {qty}주 @ {price} ({reason})"
-                logger.info(msg)
-                self.telegram.send_message(msg)
-
-    def execute_sell(self, code, qty, price, reason):
-        res = self.api.place_order(code, qty, "SELL", 0) # Market Order
-        if res:
-            market_type = settings.MARKET_TYPE_MAP.get(code, "KOSPI")
-            tick = get_tick_size(price, market_type)
-            sell_price = price - tick
-            pnl_pct = (sell_price - self.positions[code]['price']) / self.positions[code]['price'] * 100
-            prefix = self._get_msg_prefix(code)
-            msg = f"{prefix} SELL: {qty}주 @ {price} ({reason}) PnL: {pnl_pct:.2f}%"
-            logger.info(msg)
-            self.telegram.send_message(msg)
-            
-            # Record Exit for Cooldown
-            self.last_exits[code] = {
-                'time': datetime.now().isoformat(),
-                'reason': reason
-            }
-            
-            del self.positions[code]
+                msg = f"{prefix} BUY: {qty}주 @ {price} ({order['reason']})"
+            else:
+                pos = self.positions.get(code)
+                pnl_pct = (price - pos['price']) / pos['price'] * 100 if pos else 0.0
+                msg = f"{prefix} SELL: {qty}주 @ {price} ({order['reason']}) PnL: {pnl_pct:.2f}%"
+                
+                # Record Exit for Cooldown
+                self.last_exits[code] = {
+                    'time': self.clock().isoformat(),
+                    'reason': order['reason']
+                }
+                if pos and qty < pos['qty']:
+                    pos['qty'] -= qty # Partial fill: the rest is still held
+                else:
+                    self.positions.pop(code, None)
             self._save_state()
+        logger.info(msg)
+        self.telegram.send_message(msg)
+        # Replace the estimates with the broker's figures
+        self.account.reconcile_async()
+
+    def _on_reject(self, order):
+        """OrderManager callback: order rejected, or cancelled without a fill."""
+        self.account.release_order(order)
+        msg = f"{self._get_msg_prefix(order['code'])} {order['side']} 주문 실패: {order['error']}"
+        logger.error(msg)
+        self.telegram.send_message(msg)
 
     def start(self):
         logger.info("Bot Started.")
         self.telegram.send_message("KOSPI Trading Bot Started.")
         
+        # Keep the access token fresh so cycles never wait on re-authentication
+        self.api.token_manager.start_auto_refresh()
+        
         # Synchronize State
         try:
             self.sync_state_with_account()
@@ -296,11 +390,13 @@ class TradingBot:
             logger.error(f"State Sync Failed: {e}")
             self.telegram.send_message(f"⚠️ State Sync Failed: {e}")
         
+        self.price_monitor.start()
+        
         last_run_hour = -1
         
         while True:
             try:
-                now = datetime.now()
+                now = self.clock()
                 
                 # Check Market Open (Day/Time)
                 if self.is_market_open():
@@ -330,3 +426,7 @@ class TradingBot:
             except Exception as e:
                 logger.error(f"Loop Error: {e}")
                 time.sleep(60)
+        
+        self.price_monitor.stop()
+        # Let in-flight orders finish and record their fills
+        self.order_manager.shutdown()
@@ -0,0 +1,91 @@
+"""
+Calibrate per-symbol profiles (entry threshold, timeframe, exit parameters)
+for the whole universe and publish them as a new profile version.
+
+    python calibrate.py                     # TARGET_STOCKS, stored bars only
+    python calibrate.py --fetch-days 30     # refresh bars first (nightly job)
+    python calibrate.py --codes 005930,000660 --workers 4
+
+The result is CALIBRATION_DIR/profiles_vNNNN.toml, copied to
+CALIBRATION_DIR/profiles.toml which the bot and the engines load through
+settings.PROFILE_FILE. See backtester/calibration.py for the method.
+Exit status is 0 on success, 1 on failure (or when another run holds the lock).
+"""
+import argparse
+import logging
+import os
+import sys
+from config import settings
+from backtester.calibration import run_calibration
+from utils.logger import setup_logger
+
+logger = setup_logger("Calibrate")
+
+# One result line per symbol is enough; the engines log every batch walk
+logging.getLogger("BatchBacktester").setLevel(logging.WARNING)
+logging.getLogger("DataManager").setLevel(logging.WARNING)
+
+
+def acquire_lock(path):
+    """Create the run lock; a lock left by a process that no longer exists is taken over."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        try:
+            with open(path) as f:
+                pid = int(f.read().strip() or 0)
+            os.kill(pid, 0)
+            return False
+        except (ValueError, ProcessLookupError, OSError):
+            logger.warning(f"Removing stale calibration lock {path}")
+            os.remove(path)
+            return acquire_lock(path)
+    with os.fdopen(fd, "w") as f:
+        f.write(str(os.getpid()))
+    return True
+
+
+def notify(summary):
+    from utils.telegram_bot import TelegramBot
+    telegram = TelegramBot(settings.TELEGRAM_BOT_TOKEN, settings.TELEGRAM_CHAT_ID)
+    state = "new" if summary['changed'] else "unchanged"
+    telegram.send_message(f"[Calibration] profile v{summary['version']} ({state}): {len(summary['calibrated'])} calibrated, "
+                          f"{len(summary['kept'])} kept, {len(summary['missing'])} without data "
+                          f"({summary['elapsed']:.0f}s)")
+
+
+def run_nightly(codes=None, fetch_days=None, workers=None, use_cache=True, send_notice=False):
+    lock = os.path.join(settings.CALIBRATION_DIR, ".lock")
+    if not acquire_lock(lock):
+        logger.error(f"Another calibration is running ({lock}); exiting")
+        return 1
+    try:
+        if fetch_days:
+            from main import run_data
+            run_data(None, fetch_days)
+        summary = run_calibration(codes, workers=workers, use_cache=use_cache)
+        if send_notice:
+            notify(summary)
+        return 0
+    except Exception as e:
+        logger.exception(f"Calibration failed: {e}")
+        if send_notice:
+            from utils.telegram_bot import TelegramBot
+            TelegramBot(settings.TELEGRAM_BOT_TOKEN, settings.TELEGRAM_CHAT_ID).send_message(f"[Calibration] failed: {e}")
+        return 1
+    finally:
+        os.remove(lock)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate per-symbol profiles and write a new versioned profile file")
+    parser.add_argument("--codes", help="Comma separated codes or names (default: TARGET_STOCKS)")
+    parser.add_argument("--workers", type=int, default=settings.CALIBRATION_WORKERS, help="Worker processes (default: CPU count)")
+    parser.add_argument("--fetch-days", type=int, help="Download the latest bars (this many days) for TARGET_STOCKS first")
+    parser.add_argument("--no-cache", action="store_true", help="Re-run every grid even if the bars are unchanged")
+    parser.add_argument("--notify", action="store_true", help="Send the summary (or failure) to Telegram")
+    args = parser.parse_args()
+
+    codes = [settings.NAME_TO_CODE.get(c, c) for c in args.codes.split(",")] if args.codes else None
+    sys.exit(run_nightly(codes, args.fetch_days, args.workers, not args.no_cache, args.notify))
@@ -1,8 +1,11 @@
 import sys
 import os
+import argparse
 import pandas as pd
 import logging
+from concurrent.futures import ProcessPoolExecutor
 from config import settings
+from config.profiles import ProfileRegistry
 from data.data_manager import DataManager
 from backtester.engine import BacktestEngine
 from strategy.rsi_macd import RsiMacdStrategy
@@ -13,67 +16,123 @@ logging.getLogger("DataManager").setLevel(logging.WARNING)
 logging.getLogger("KiwoomAPI").setLevel(logging.WARNING)
 logging.getLogger("Strategy").setLevel(logging.WARNING)
 
-# 1. Override Settings to Scenario 2 (Minimum Profit Guarantee)
-settings.STOP_LOSS_PCT = -5.0
-settings.TAKE_PROFIT_PCT = 12.0
-settings.MAX_HOLD_DAYS = 5
-settings.MAX_HOLD_MAX_DAYS = 10
-settings.MIN_PROFIT_YIELD = 3.0
-settings.STOP_LOSS_COOLDOWN_DAYS = 3
-settings.INITIAL_CAPITAL = 1000000
+# 1. Scenario 2 (Minimum Profit Guarantee), applied through the engine's profiles
+# so a calibrated profile file (settings.PROFILE_FILE) cannot replace it
+SCENARIO = {
+    'stop_loss_pct': -5.0,
+    'take_profit_pct': 12.0,
+    'max_hold_days': 5,
+    'max_hold_max_days': 10,
+    'min_profit_yield': 3.0,
+    'cooldown_days': 3,
+}
+SCENARIO_CAPITAL = 1000000
 
 # 2. Define Stocks (Top Winners + Others from User List)
 target_stocks = settings.TARGET_STOCKS
 
-def run_comparison():
-    # 3. Initialize
-    # use_api=True to allow fetching 30M data
+# Only the 30M bars are stored; 60M bars are resampled from them locally
+BASE_TIMEFRAME = "30"
+TIMEFRAMES = ["60", "30"]
+
+
+def load_timeframe(code, timeframe):
+    # DataManager resamples (and caches) 60M from the stored 30M bars
+    df = DataManager(use_api=False).load_data(code, time_unit=timeframe)
+    if df is None or df.empty:
+        return None
+    return df
+
+
+def backtest_pair(code, timeframe):
+    """Backtest one (symbol, timeframe) pair; runs in a worker process."""
+    df = load_timeframe(code, timeframe)
+    if df is None:
+        return code, timeframe, None
+    engine = BacktestEngine(RsiMacdStrategy(), profiles=ProfileRegistry.from_settings(overrides=SCENARIO))
+    engine.initial_capital = SCENARIO_CAPITAL
+    return code, timeframe, engine.run_fast(df, code, save_results=False, time_unit=timeframe)
+
+
+def fetch_missing_base(codes):
+    """Download the 30M base series for symbols that have none stored (one download per symbol)."""
     dm = DataManager(use_api=True)
-    strategy = RsiMacdStrategy()
-    engine = BacktestEngine(strategy)
+    for code in codes:
+        if dm.load_data(code, time_unit=BASE_TIMEFRAME) is None:
+            dm.fetch_and_save_data(code, time_unit=BASE_TIMEFRAME)
+
+
+def recommend_timeframes(results):
+    """Pick the better-returning timeframe per symbol."""
+    recommended = {}
+    for code, by_tf in results.items():
+        if by_tf.get("60") is None or by_tf.get("30") is None:
+            continue
+        recommended[code] = "30" if by_tf["30"]['return'] > by_tf["60"]['return'] else "60"
+    return recommended
+
+
+def run_comparison(codes=None, workers=None, fetch_missing=False):
+    codes = codes or target_stocks
+    if fetch_missing:
+        fetch_missing_base(codes)
+
+    # 3. Backtest every (symbol, timeframe) pair in parallel
+    results = {code: {} for code in codes}
+    pairs = [(code, tf) for code in codes for tf in TIMEFRAMES]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for code, tf, res in pool.map(backtest_pair, *zip(*pairs)):
+            results[code][tf] = res
 
     print(f"{'Code':<8} | {'Name':<12} | {'1H Ret':<8} | {'30M Ret':<8} | {'1H Trd':<6} | {'30M Trd':<6} | {'Diff':<7} | {'Diff(Trd)':<10}")
     print("-" * 100)
 
-    for code in target_stocks:
+    for code in codes:
         stock_name = settings.STOCK_NAMES.get(code, code)
-        
-        # --- 1H Backtest ---
-        df_1h = dm.load_data(code, time_unit="60")
-        if df_1h is None:
-            # Fallback fetch
-             df_1h = dm.fetch_and_save_data(code, time_unit="60")
-             
-        res_1h = engine.run(df_1h, code, save_results=False)
-        
-        # --- 30M Backtest ---
-        # Try load first
-        df_30m = dm.load_data(code, time_unit="30")
-        if df_30m is None:
-            # Fetch
-            df_30m = dm.fetch_and_save_data(code, time_unit="30")
-
-        if df_30m is None or df_30m.empty:
-             print(f"{code:<8} | {stock_name:<12} | {res_1h['return']:>7.2f}% | {'N/A':>8} | {res_1h['total_trades']:<6} | {'N/A':<6}")
-             continue
-
-        res_30m = engine.run(df_30m, code, save_results=False)
-        
+        res_1h = results[code].get("60")
+        res_30m = results[code].get("30")
+
+        if res_30m is None:
+            print(f"{code:<8} | {stock_name:<12} | {'N/A':>8} | {'N/A':>8} | {'N/A':<6} | {'N/A':<6}")
+            continue
+
+        if res_1h is None:
+            print(f"{code:<8} | {stock_name:<12} | {'N/A':>8} | {res_30m['return']:>7.2f}% | {'N/A':<6} | {res_30m['total_trades']:<6}")
+            continue
+
         # Metrics
         ret_1h = res_1h['return']
         ret_30m = res_30m['return']
         diff = ret_30m - ret_1h
-        
+
         trd_1h = res_1h['total_trades']
         trd_30m = res_30m['total_trades']
         diff_trd = trd_30m - trd_1h
-        
+
         print(f"{code:<8} | {stock_name:<12} | {ret_1h:>7.2f}% | {ret_30m:>7.2f}% | {trd_1h:<6} | {trd_30m:<6} | {diff:>6.2f}% | {diff_trd:>+4}")
-        
-        import time
-        time.sleep(1.0) # Avoid Rate Limit
 
     print("-" * 100)
 
+    # 4. Recommended TIMEFRAME_MAP
+    recommended = recommend_timeframes(results)
+    changes = [c for c, tf in recommended.items() if settings.TIMEFRAME_MAP.get(c, "60") != tf]
+    print(f"\nRecommended TIMEFRAME_MAP ({len(changes)} changes vs config/settings.py):")
+    print("TIMEFRAME_MAP = {")
+    for code, tf in recommended.items():
+        name = settings.STOCK_NAMES.get(code, code)
+        ret_1h, ret_30m = results[code]["60"]['return'], results[code]["30"]['return']
+        mark = " *" if code in changes else ""
+        print(f'    "{code}": "{tf}", # {name} (1H: {ret_1h:.0f}% -> 30M: {ret_30m:.0f}%){mark}')
+    print("}")
+    return results, recommended
+
+
 if __name__ == "__main__":
-    run_comparison()
+    parser = argparse.ArgumentParser(description="Compare 1H vs 30M backtests (1H resampled locally from stored 30M bars)")
+    parser.add_argument("--codes", help="Comma separated codes (default: TARGET_STOCKS)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--fetch-missing", action="store_true", help="Download the 30M base series for symbols without stored data")
+    args = parser.parse_args()
+
+    codes = [settings.NAME_TO_CODE.get(c, c) for c in args.codes.split(",")] if args.codes else None
+    run_comparison(codes, workers=args.workers, fetch_missing=args.fetch_missing)
@@ -0,0 +1,195 @@
+"""
+Per-symbol profiles compiled from settings (optionally overlaid with a TOML file).
+
+The scattered lookups in settings.py (STOCK_NAMES, TARGET_STOCKS,
+TIMEFRAME_MAP, RSI_OVERSOLD_MAP, MARKET_TYPE_MAP and the global exit
+parameters) are merged once into an immutable SymbolProfile per symbol and
+validated together. Engines and the bot resolve a symbol's profile once per
+run instead of consulting the dicts per bar.
+
+TOML layout (settings.PROFILE_FILE / SYMBOL_PROFILES env var), every key optional:
+
+    [defaults]                 # overrides the global parameters in settings.py
+    stop_loss_pct = -5.0
+
+    [symbols."005930"]
+    name = "삼성전자"
+    target = true              # include in TARGET_STOCKS
+    timeframe = "30"
+    market_type = "KOSPI"
+    rsi_oversold = 70
+"""
+import re
+import tomllib
+from collections import namedtuple
+from config import settings
+
+SymbolProfile = namedtuple("SymbolProfile", [
+    "code", "name", "target", "timeframe", "market_type", "rsi_oversold",
+    "stop_loss_pct", "take_profit_pct", "max_hold_days", "max_hold_max_days",
+    "min_profit_yield", "cooldown_days",
+])
+
+# Parameters a profile may override (everything but identity fields)
+PARAMETER_FIELDS = SymbolProfile._fields[3:]
+MARKET_TYPES = ("KOSPI", "KOSDAQ")
+DEFAULT_TIMEFRAME = "60"
+DEFAULT_MARKET_TYPE = "KOSPI"
+
+_CASTS = {'timeframe': str, 'market_type': str, 'rsi_oversold': float, 'stop_loss_pct': float,
+          'take_profit_pct': float, 'max_hold_days': int, 'max_hold_max_days': int,
+          'min_profit_yield': float, 'cooldown_days': int}
+
+
+def settings_defaults(source=settings):
+    """Global parameters from settings.py, as profile fields."""
+    return {
+        'timeframe': DEFAULT_TIMEFRAME,
+        'market_type': DEFAULT_MARKET_TYPE,
+        'rsi_oversold': source.RSI_OVERSOLD,
+        'stop_loss_pct': source.STOP_LOSS_PCT,
+        'take_profit_pct': source.TAKE_PROFIT_PCT,
+        'max_hold_days': source.MAX_HOLD_DAYS,
+        'max_hold_max_days': source.MAX_HOLD_MAX_DAYS,
+        'min_profit_yield': source.MIN_PROFIT_YIELD,
+        'cooldown_days': source.STOP_LOSS_COOLDOWN_DAYS,
+    }
+
+
+def settings_symbols(source=settings):
+    """Per-symbol overrides from the settings.py maps: {code: {field: value}}."""
+    # Targets first, so ProfileRegistry.targets keeps the TARGET_STOCKS order
+    symbols = {code: {'target': True} for code in source.TARGET_STOCKS}
+    for code, name in source.STOCK_NAMES.items():
+        symbols.setdefault(code, {})['name'] = name
+    for field, mapping in (('timeframe', source.TIMEFRAME_MAP), ('rsi_oversold', source.RSI_OVERSOLD_MAP),
+                           ('market_type', source.MARKET_TYPE_MAP)):
+        for code, value in mapping.items():
+            symbols.setdefault(code, {})[field] = value
+    return symbols
+
+
+class ProfileRegistry:
+    """Validated, immutable profiles; unknown codes get the default profile."""
+
+    def __init__(self, defaults, symbols, overrides=None):
+        """
+        defaults: {field: value} for every PARAMETER_FIELDS entry.
+        symbols: {code: {field: value}} per-symbol overrides (name, target, parameters).
+        overrides: {field: value} applied on top of everything (e.g. a scenario run).
+        """
+        overrides = overrides or {}
+        errors = _validate_fields("defaults", defaults, required=True)
+        errors += _validate_fields("overrides", overrides)
+        if errors:
+            raise ValueError("Invalid symbol profiles:\n  " + "\n  ".join(errors))
+        self._defaults = {**defaults, **overrides}
+
+        self._profiles = {}
+        for code, fields in symbols.items():
+            field_errors = _validate_fields(code, fields)
+            if field_errors:
+                errors += field_errors
+                continue
+            if not re.fullmatch(r"\d{6}", str(code)):
+                errors.append(f"{code}: code must be 6 digits")
+            if not fields.get('name'):
+                errors.append(f"{code}: missing name")
+            params = {**self._defaults, **{k: v for k, v in fields.items() if k in PARAMETER_FIELDS}, **overrides}
+            profile = SymbolProfile(code=code, name=fields.get('name', code), target=bool(fields.get('target', False)),
+                                    **{k: _coerce(k, v) for k, v in params.items()})
+            errors += _validate_profile(profile)
+            self._profiles[code] = profile
+        if errors:
+            raise ValueError("Invalid symbol profiles:\n  " + "\n  ".join(errors))
+
+        self._default = SymbolProfile(code="", name="", target=False,
+                                      **{k: _coerce(k, v) for k, v in self._defaults.items()})
+        self.targets = tuple(code for code, profile in self._profiles.items() if profile.target)
+
+    @classmethod
+    def from_settings(cls, source=settings, overrides=None):
+        return cls(settings_defaults(source), settings_symbols(source), overrides)
+
+    @classmethod
+    def from_toml(cls, path, source=settings, overrides=None):
+        """settings.py profiles overlaid with the TOML file's [defaults] and [symbols.<code>] tables."""
+        with open(path, "rb") as f:
+            data = tomllib.load(f)
+        defaults = {**settings_defaults(source), **data.get('defaults', {})}
+        symbols = settings_symbols(source)
+        for code, fields in data.get('symbols', {}).items():
+            symbols[code] = {**symbols.get(code, {}), **fields}
+        return cls(defaults, symbols, overrides)
+
+    def get(self, code):
+        """Profile for code (the default parameters for symbols without one)."""
+        profile = self._profiles.get(code)
+        if profile is None:
+            return self._default._replace(code=code, name=code)
+        return profile
+
+    def __contains__(self, code):
+        return code in self._profiles
+
+    def __iter__(self):
+        return iter(self._profiles.values())
+
+    def __len__(self):
+        return len(self._profiles)
+
+
+def _coerce(key, value):
+    # Numbers keep their type (RSI 68 stays 68 in results); strings from files are converted
+    if isinstance(value, (int, float)) and not isinstance(value, bool) and _CASTS[key] is not str:
+        return value
+    return _CASTS[key](value)
+
+
+def _validate_fields(label, fields, required=False):
+    errors = [f"{label}: unknown field '{k}'" for k in fields if k not in PARAMETER_FIELDS + ('name', 'target')]
+    if required:
+        errors += [f"{label}: missing '{k}'" for k in PARAMETER_FIELDS if k not in fields]
+    for key, cast in _CASTS.items():
+        if key in fields:
+            try:
+                cast(fields[key])
+            except (TypeError, ValueError):
+                errors.append(f"{label}: {key}={fields[key]!r} is not a valid {cast.__name__}")
+    return errors
+
+
+def _validate_profile(p):
+    errors = []
+    base = int(settings.BASE_TIMEFRAME)
+    if p.timeframe != "D" and not (p.timeframe.isdigit() and int(p.timeframe) % base == 0):
+        errors.append(f"{p.code}: timeframe '{p.timeframe}' is not 'D' or a multiple of the {base}M base bars")
+    if p.market_type not in MARKET_TYPES:
+        errors.append(f"{p.code}: market_type '{p.market_type}' not in {MARKET_TYPES}")
+    if not 0 < p.rsi_oversold < 100:
+        errors.append(f"{p.code}: rsi_oversold {p.rsi_oversold} outside (0, 100)")
+    if not p.stop_loss_pct < 0 < p.take_profit_pct:
+        errors.append(f"{p.code}: need stop_loss_pct < 0 < take_profit_pct ({p.stop_loss_pct}, {p.take_profit_pct})")
+    if not 0 <= p.max_hold_days <= p.max_hold_max_days:
+        errors.append(f"{p.code}: need 0 <= max_hold_days <= max_hold_max_days ({p.max_hold_days}, {p.max_hold_max_days})")
+    if p.cooldown_days < 0:
+        errors.append(f"{p.code}: cooldown_days {p.cooldown_days} < 0")
+    return errors
+
+
+_registry = None
+
+
+def load_profiles(path=None, reload=False):
+    """
+    Process-wide registry, compiled on first use from settings (plus
+    settings.PROFILE_FILE if set). Pass reload=True after changing settings at runtime.
+    """
+    global _registry
+    if _registry is None or reload or path:
+        path = path or settings.PROFILE_FILE
+        if path:
+            _registry = ProfileRegistry.from_toml(path)
+        else:
+            _registry = ProfileRegistry.from_settings()
+    return _registry
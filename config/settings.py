@@ -31,6 +31,30 @@ URL_PAPER = "https://mockapi.kiwoom.com"
 
 BASE_URL = URL_PAPER if MODE == "PAPER" else URL_REAL
 
+# Point KiwoomAPI at another server (e.g. api/mock_server.py for load tests). Empty = Kiwoom
+BASE_URL_OVERRIDE = os.getenv("KIWOOM_BASE_URL", "")
+
+# Access tokens shared across processes (api/token_cache.py). Empty = per-process only
+TOKEN_CACHE_FILE = os.getenv("KIWOOM_TOKEN_CACHE", ".cache/kiwoom_token.json")
+TOKEN_REFRESH_MARGIN = 300 # Seconds before expiry at which a token is replaced
+
+# Bot account snapshot (kt00018) reuse window; orders update it optimistically in between
+ACCOUNT_SNAPSHOT_TTL = 30 # Seconds
+
+# Bot order pipeline (bot/order_manager.py)
+ORDER_WORKERS = 4 # Orders in flight at once
+ORDER_POLL_INTERVAL = 1.0 # Seconds between ka10076 fill checks
+ORDER_FILL_TIMEOUT = 120 # Seconds an accepted order may stay unfilled before its rest is cancelled
+ORDER_LOG_FILE = "order_log.jsonl" # Per-order latency records
+
+# Bot price monitor (bot/price_monitor.py): SL/TP checks of open positions between cycles
+PRICE_MONITOR_INTERVAL = 5.0 # Seconds between ka10001 price polls (0 = off)
+
+# Bulk data download (main.py data): workers share one request quota
+API_RATE_LIMIT = 5 # Kiwoom REST requests per second
+DATA_DOWNLOAD_WORKERS = 4
+DATA_DOWNLOAD_RETRIES = 2 # Extra rounds for symbols that failed
+
 # Trading Strategy Parameters
 RSI_OVERSOLD = 50
 
@@ -57,7 +81,16 @@ MAX_HOLD_MAX_DAYS = 10 # Hard Limit
 MIN_PROFIT_YIELD = 3.0 # Minimum profit % required to exit at MAX_HOLD_DAYS
 STOP_LOSS_COOLDOWN_DAYS = 3
 INITIAL_CAPITAL = 1000000  # 1 Million KRW
+INDICATOR_BACKEND = "pandas" # "pandas" or "array" (NumPy/Numba kernels in strategy/indicators.py)
+
+# Universe screener (strategy/screener.py, main.py screen)
+SCREENER_HISTORY_BARS = 1000 # Recent bars over which per-symbol signal frequency is counted
+SCREENER_LOAD_WORKERS = 8 # Threads reading stored bar files
  
+# Parameter sets per batch walk in rsi_optimize / min_profit_optimize; each batch
+# is checkpointed when its walk finishes, so an interrupt loses at most one batch
+OPTIMIZE_BATCH_SIZE = 8
+
 # RSI Optimization Defaults
 RSI_OPTIMIZE_MIN = 30
 RSI_OPTIMIZE_MAX = 70
@@ -88,6 +121,9 @@ MIN_PROFIT_OPT_MIN = 0.0
 MIN_PROFIT_OPT_MAX = 4.0
 MIN_PROFIT_OPT_STEP = 0.5
 
+# Results Database (SQLite, all backtest/optimization runs)
+RESULTS_DB_PATH = "backtest_results/results.db"
+
 # Target Stocks
 # Sajo Seafood, Eugene Tech, Eugene Robot
 TARGET_STOCKS = [
@@ -235,6 +271,10 @@ NAME_TO_CODE = {v: k for k, v in STOCK_NAMES.items()}
 # Timeframes
 TIMEFRAME = "1H" # 1 Hour
 
+# Finest stored bar size. Only this timeframe is downloaded; coarser ones
+# (60M, 120M, daily) are resampled from it locally (data/resample.py).
+BASE_TIMEFRAME = "30"
+
 # Stock-Specific Timeframe Settings (Hybrid Strategy)
 # Default is TIMEFRAME (1H). Specific stocks use shorter timeframes.
 TIMEFRAME_MAP = {
@@ -267,6 +307,24 @@ MARKET_TYPE_MAP = {
     "211270": "KOSDAQ"
 }
 
+# Universe calibration (calibrate.py): per-symbol grid search published as a versioned profile file
+CALIBRATION_DIR = "calibration" # profiles_v0001.toml, ... plus profiles.toml (the latest) and cache/
+CALIBRATION_TIMEFRAMES = ["30", "60"]
+CALIBRATION_RSI_GRID = [30, 34, 38, 42, 46, 50, 54, 58, 62, 66, 70]
+CALIBRATION_STOP_LOSS_GRID = [-5.0, -4.0, -3.0, -2.0]
+CALIBRATION_TAKE_PROFIT_GRID = [6.0, 9.0, 12.0, 15.0]
+CALIBRATION_MAX_HOLD_GRID = [3, 5, 7]
+CALIBRATION_SPLIT = 0.7 # Share of bars used to pick parameters; trades after it validate them
+CALIBRATION_MIN_TRADES = 5 # In-sample trades a parameter set needs
+CALIBRATION_MIN_OOS_TRADES = 2 # Out-of-sample trades a parameter set needs
+CALIBRATION_WORKERS = None # Worker processes (None = CPU count)
+
+# Optional TOML overlay for the per-symbol profiles compiled from the maps above
+# (config/profiles.py). Defaults to the latest calibration output when there is one;
+# empty = settings.py only
+_CALIBRATED_PROFILES = os.path.join(CALIBRATION_DIR, "profiles.toml")
+PROFILE_FILE = os.getenv("SYMBOL_PROFILES", _CALIBRATED_PROFILES if os.path.exists(_CALIBRATED_PROFILES) else "")
+
 # Telegram
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN", "")
 TELEGRAM_CHAT_ID = os.getenv("TELEGRAM_CHAT_ID", "")
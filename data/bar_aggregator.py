@@ -0,0 +1,212 @@
+"""
+Incremental OHLCV bars from a stream of trades or quotes.
+
+Instead of re-downloading minute-chart history every cycle, ticks
+(code, time, price, volume) are folded into the open bar of each symbol
+and timeframe as they arrive. Bars follow the same alignment as
+data/resample.py: labelled by their start time, aligned to the 09:00 KRX
+open (ticks before the open fold into the first bar), the last bar of a
+session ends at 15:30 (the closing auction print at 15:30 is part of it),
+and ticks on weekends / MARKET_HOLIDAYS or after the close are ignored.
+
+A bar is closed when the first tick of a later bar of the same symbol
+arrives, or by advance(now) once its end time (plus `close_delay` for late
+prints) has passed, so quiet symbols still close on time. Each closed bar
+is passed to on_bar(code, timeframe, bar) and kept in a short history that
+frame() returns in the get_ohlcv_frame() layout; seed() preloads that
+history from stored bars so indicators have their warm-up without a REST
+fetch. Ticks older than a symbol's open bar are dropped (stats['late']).
+
+Times are naive KST wall-clock datetimes or epoch seconds of them (as
+data.bar_store.parse_bar_times returns). Per tick the work is a few integer
+operations per timeframe, so one core keeps up with hundreds of symbols.
+
+Replay files are CSVs with code,time,price,volume columns (time as
+YYYYMMDDHHMMSS); see read_ticks() and BarAggregator.replay().
+"""
+import calendar
+from collections import Counter, deque, namedtuple
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+from data.bar_store import parse_bar_times
+from data.resample import resample_bars, can_resample
+from utils.market_time import is_trading_day
+
+SESSION_OPEN = 9 * 3600 # Seconds after midnight
+SESSION_CLOSE = 15 * 3600 + 30 * 60
+DAY = 86400
+EPOCH = datetime(1970, 1, 1)
+
+Tick = namedtuple("Tick", ["code", "time", "price", "volume"])
+
+
+def _seconds(t):
+    if isinstance(t, datetime):
+        return calendar.timegm(t.timetuple())
+    return int(t)
+
+
+def _label(start):
+    return (EPOCH + timedelta(seconds=int(start))).strftime("%Y%m%d%H%M%S")
+
+
+def read_ticks(path, chunksize=100000):
+    """Ticks of a replay CSV (code,time,price,volume), in file order."""
+    for chunk in pd.read_csv(path, dtype={'code': str, 'time': str}, chunksize=chunksize):
+        times = parse_bar_times(chunk['time'].values)
+        volumes = chunk['volume'].values if 'volume' in chunk else np.zeros(len(chunk), dtype=np.int64)
+        for code, t, price, volume in zip(chunk['code'].values, times, chunk['price'].values, volumes):
+            yield Tick(code, int(t), float(price), int(volume))
+
+
+def write_ticks(path, ticks):
+    """Save ticks as a replay CSV."""
+    df = pd.DataFrame(list(ticks), columns=Tick._fields)
+    df['time'] = [_label(_seconds(t)) for t in df['time']]
+    df.to_csv(path, index=False)
+
+
+class BarAggregator:
+    """
+    timeframes: minute timeframes to maintain per symbol ("30", "60", ...).
+    on_bar(code, timeframe, bar): called with each closed bar (a dict with
+        time, open, high, low, close, volume; time as YYYYMMDDHHMMSS str).
+    history: closed bars kept per symbol and timeframe for frame().
+    close_delay: seconds after a bar's end that advance() waits for late prints.
+    """
+
+    def __init__(self, timeframes=("30", "60"), on_bar=None, history=500, close_delay=2.0):
+        self.timeframes = [str(tf) for tf in timeframes]
+        self._lengths = [int(tf) * 60 for tf in self.timeframes]
+        self.on_bar = on_bar
+        self.history = history
+        self.close_delay = close_delay
+        self.stats = Counter()
+        # code -> per-timeframe [start, end, open, high, low, close, volume]; end is None once closed
+        self._open = {}
+        self._bars = {} # (code, timeframe) -> deque of closed bar dicts
+        self._trading = {} # day start -> trading day?
+        self._due = None # Earliest end of an open bar: advance() is a no-op before it
+
+    def _is_trading(self, day):
+        trading = self._trading.get(day)
+        if trading is None:
+            trading = self._trading[day] = bool(is_trading_day(np.datetime64(day, 's')))
+        return trading
+
+    def update(self, code, time, price, volume=0):
+        """Fold one trade (or quote, volume 0) into the symbol's open bars."""
+        t = _seconds(time)
+        day = t - t % DAY
+        offset = t - day
+        if offset > SESSION_CLOSE or not self._is_trading(day):
+            self.stats['off_session'] += 1
+            return
+        self.stats['ticks'] += 1
+        since_open = max(offset - SESSION_OPEN, 0)
+        last = SESSION_CLOSE - SESSION_OPEN - 1 # The 15:30 print belongs to the last bar
+
+        bars = self._open.get(code)
+        if bars is None:
+            bars = self._open[code] = [None] * len(self.timeframes)
+        for i, length in enumerate(self._lengths):
+            start = day + SESSION_OPEN + min(since_open, last) // length * length
+            bar = bars[i]
+            if bar is not None:
+                if start == bar[0] and bar[1] is not None:
+                    if price > bar[3]:
+                        bar[3] = price
+                    elif price < bar[4]:
+                        bar[4] = price
+                    bar[5] = price
+                    bar[6] += volume
+                    continue
+                if start <= bar[0]:
+                    self.stats['late'] += 1
+                    continue
+                if bar[1] is not None:
+                    self._close(code, i, bar)
+            end = min(start + length, day + SESSION_CLOSE)
+            bars[i] = [start, end, price, price, price, price, volume]
+            if self._due is None or end < self._due:
+                self._due = end
+
+    def advance(self, now):
+        """Close every open bar that ended (plus close_delay) before `now`; returns how many closed."""
+        now = _seconds(now)
+        if self._due is None or self._due + self.close_delay > now:
+            return 0
+        closed = 0
+        due = None
+        for code, bars in self._open.items():
+            for i, bar in enumerate(bars):
+                if bar is None or bar[1] is None:
+                    continue
+                if bar[1] + self.close_delay <= now:
+                    self._close(code, i, bar)
+                    closed += 1
+                elif due is None or bar[1] < due:
+                    due = bar[1]
+        self._due = due
+        return closed
+
+    def _close(self, code, i, bar):
+        bar[1] = None
+        timeframe = self.timeframes[i]
+        record = {'time': _label(bar[0]), 'open': bar[2], 'high': bar[3], 'low': bar[4],
+                  'close': bar[5], 'volume': bar[6]}
+        key = (code, timeframe)
+        if key not in self._bars:
+            self._bars[key] = deque(maxlen=self.history)
+        self._bars[key].append(record)
+        self.stats['bars'] += 1
+        if self.on_bar:
+            self.on_bar(code, timeframe, record)
+
+    def replay(self, ticks, clock=True):
+        """
+        Feed an iterable of Tick (e.g. read_ticks(path)) in order.
+        clock: also advance to each tick's time, so bars close as they would live.
+        """
+        for tick in ticks:
+            if clock:
+                self.advance(tick.time)
+            self.update(tick.code, tick.time, tick.price, tick.volume)
+
+    def seed(self, code, df, time_unit):
+        """
+        Preload closed-bar history of `code` from stored `time_unit` bars
+        (get_ohlcv_frame layout), resampled to each timeframe they can build.
+        """
+        if df is None or df.empty:
+            return
+        for timeframe in self.timeframes:
+            if str(time_unit) == timeframe:
+                bars = df
+            elif can_resample(time_unit, timeframe):
+                bars = resample_bars(df, timeframe)
+            else:
+                continue
+            frame = bars[['time', 'open', 'high', 'low', 'close', 'volume']].tail(self.history)
+            times = [_label(t) for t in parse_bar_times(frame['time'].values)]
+            history = deque(maxlen=self.history)
+            for label, row in zip(times, frame.itertuples(index=False)):
+                history.append({'time': label, 'open': row.open, 'high': row.high, 'low': row.low,
+                                'close': row.close, 'volume': row.volume})
+            self._bars[(code, timeframe)] = history
+
+    def frame(self, code, timeframe):
+        """Closed bars of a symbol as a DataFrame (time, open, high, low, close, volume), ascending."""
+        bars = self._bars.get((code, str(timeframe)), ())
+        return pd.DataFrame(list(bars), columns=['time', 'open', 'high', 'low', 'close', 'volume'])
+
+    def current(self, code, timeframe):
+        """The still-open bar of a symbol (same dict layout), or None."""
+        bars = self._open.get(code)
+        bar = bars[self.timeframes.index(str(timeframe))] if bars else None
+        if bar is None or bar[1] is None:
+            return None
+        return {'time': _label(bar[0]), 'open': bar[2], 'high': bar[3], 'low': bar[4],
+                'close': bar[5], 'volume': bar[6]}
+
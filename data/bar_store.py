@@ -0,0 +1,191 @@
+from collections import namedtuple
+from multiprocessing import resource_tracker, shared_memory
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+INDICATOR_COLUMNS = ('rsi', 'macd', 'signal', 'histogram')
+
+# Lightweight, picklable description of a store living in shared memory
+# (shm_name) or in a memory-mapped file (path).
+# layout: tuple of (column, dtype str, offset) entries inside the block.
+BarStoreHandle = namedtuple("BarStoreHandle", ["code", "length", "shm_name", "layout", "nbytes", "path"],
+                            defaults=[None])
+
+
+def parse_bar_times(values):
+    """
+    Convert a 'time' column (YYYYMMDDHHMMSS as str/int/float, or datetimes)
+    to int64 epoch seconds. Times are kept as naive KST wall-clock values.
+    """
+    series = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        times = series
+    else:
+        if pd.api.types.is_numeric_dtype(series):
+            series = series.astype('int64').astype(str)
+        times = pd.to_datetime(series.astype(str), format="%Y%m%d%H%M%S")
+    return times.values.astype('datetime64[s]').astype(np.int64)
+
+
+def attach_shared_memory(name):
+    """
+    Open an existing shared memory block without registering it with the
+    resource tracker, so a reader never unlinks a block it does not own.
+    """
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13 has no track flag
+        register = resource_tracker.register
+        resource_tracker.register = lambda *args, **kwargs: None
+        try:
+            return shared_memory.SharedMemory(name=name)
+        finally:
+            resource_tracker.register = register
+
+
+def _build_layout(columns, length):
+    """Place each column at an 8-byte aligned offset of one contiguous block."""
+    layout = []
+    offset = 0
+    for name, dtype in columns:
+        layout.append((name, np.dtype(dtype).str, offset))
+        size = np.dtype(dtype).itemsize * length
+        offset += (size + 7) // 8 * 8
+    return tuple(layout), max(offset, 1)
+
+
+class BarStore:
+    """
+    Compact columnar bar storage for one symbol.
+
+    All columns share one contiguous buffer:
+    - time: int64 epoch seconds
+    - open/high/low/close: int32 (KRW prices are whole numbers)
+    - volume: int64
+    - rsi/macd/signal/histogram: float32 (only if present in the source)
+
+    The buffer can be moved into shared memory with `to_shared()` and
+    re-attached from another process with `BarStore.attach(handle)`.
+    Use `to_frame()` when a pandas DataFrame is really needed.
+    """
+
+    def __init__(self, code, length, layout, buffer, shm=None):
+        self.code = code
+        self.length = length
+        self.layout = layout
+        self._bind(buffer, shm)
+
+    def _bind(self, buffer, shm):
+        self._buffer = buffer
+        self._shm = shm
+        self.columns = {}
+        for name, dtype, offset in self.layout:
+            self.columns[name] = np.ndarray((self.length,), dtype=np.dtype(dtype), buffer=buffer, offset=offset)
+
+    @classmethod
+    def from_frame(cls, df, code="UNKNOWN"):
+        length = len(df)
+        columns = [('time', np.int64)]
+        columns += [(c, np.int32) for c in PRICE_COLUMNS]
+        columns.append(('volume', np.int64))
+        columns += [(c, np.float32) for c in INDICATOR_COLUMNS if c in df.columns]
+
+        layout, nbytes = _build_layout(columns, length)
+        store = cls(code, length, layout, np.zeros(nbytes, dtype=np.uint8))
+
+        store.columns['time'][:] = parse_bar_times(df['time'].values)
+        for c in PRICE_COLUMNS:
+            prices = df[c].to_numpy(dtype=np.float64)
+            rounded = np.rint(prices)
+            if not np.array_equal(prices, rounded):
+                raise ValueError(f"{code}: '{c}' has fractional prices, cannot store as int32")
+            store.columns[c][:] = rounded
+        store.columns['volume'][:] = df['volume'].to_numpy(dtype=np.int64) if 'volume' in df.columns else 0
+        for c in INDICATOR_COLUMNS:
+            if c in store.columns:
+                store.columns[c][:] = df[c].to_numpy(dtype=np.float64)
+        return store
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    @property
+    def nbytes(self):
+        return sum(arr.nbytes for arr in self.columns.values())
+
+    @property
+    def is_shared(self):
+        return self._shm is not None
+
+    def memory_report(self, df=None):
+        """
+        Bytes used by this store, compared against a DataFrame if given.
+        """
+        report = {'code': self.code, 'bars': self.length, 'store_bytes': self.nbytes}
+        if df is not None:
+            frame_bytes = int(df.memory_usage(deep=True).sum())
+            report['frame_bytes'] = frame_bytes
+            report['ratio'] = frame_bytes / self.nbytes if self.nbytes else 0.0
+        return report
+
+    def to_frame(self):
+        """Materialize a pandas DataFrame (float64 indicators, datetime times)."""
+        data = {'time': self.columns['time'].astype('datetime64[s]').astype('datetime64[ns]')}
+        for c in PRICE_COLUMNS:
+            data[c] = self.columns[c].astype(np.int64)
+        data['volume'] = self.columns['volume'].copy()
+        for c in INDICATOR_COLUMNS:
+            if c in self.columns:
+                data[c] = self.columns[c].astype(np.float64)
+        return pd.DataFrame(data)
+
+    def to_shared(self):
+        """
+        Move the buffer into a new shared memory block and return a handle
+        that other processes can pass to `BarStore.attach`.
+        The creating process owns the block and should call `unlink()` when done.
+        """
+        if self._shm is None:
+            nbytes = max(self._buffer.nbytes, 1)
+            shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            shared = np.ndarray((nbytes,), dtype=np.uint8, buffer=shm.buf)
+            shared[:self._buffer.nbytes] = self._buffer
+            self._bind(shm.buf, shm)
+        return BarStoreHandle(self.code, self.length, self._shm.name, self.layout, self._shm.size)
+
+    def to_mmap(self, path):
+        """
+        Write the buffer to `path` and return a handle other processes can
+        map read-only with `BarStore.attach`.
+        """
+        buffer = np.frombuffer(self._buffer, dtype=np.uint8)
+        with open(path, 'wb') as f:
+            f.write(buffer.tobytes())
+        return BarStoreHandle(self.code, self.length, None, self.layout, buffer.nbytes, path)
+
+    @classmethod
+    def attach(cls, handle):
+        """Map an existing shared block or file (zero-copy) described by `handle`."""
+        if handle.path:
+            buffer = np.memmap(handle.path, dtype=np.uint8, mode='r', shape=(handle.nbytes,))
+            return cls(handle.code, handle.length, handle.layout, buffer)
+        shm = attach_shared_memory(handle.shm_name)
+        return cls(handle.code, handle.length, handle.layout, shm.buf, shm=shm)
+
+    def close(self):
+        if self._shm is not None:
+            self.columns = {}
+            self._buffer = None
+            self._shm.close()
+
+    def unlink(self):
+        if self._shm is not None:
+            shm = self._shm
+            self.close()
+            shm.unlink()
+            self._shm = None
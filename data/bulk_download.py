@@ -0,0 +1,169 @@
+"""
+Multi-symbol bulk download for `main.py data`.
+
+Symbols are fetched by a bounded thread pool. All workers share one
+DataManager (one token) and one RateLimiter, so total time is bounded by
+the API request quota rather than by per-request latency.
+
+Progress is kept in an append-only JSONL manifest, one line per finished
+attempt ({"code", "status", "rows", "attempts", "error", "elapsed"}), so a
+rerun with resume skips symbols that are already done. Failed symbols are
+retried in further rounds.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from config import settings
+from utils.logger import setup_logger
+from utils.rate_limiter import RateLimiter
+
+logger = setup_logger("BulkDownload")
+
+MANIFEST_DIR = "data_storage/manifests"
+
+
+class DownloadManifest:
+    """Per-symbol progress of one bulk download; the latest line per code wins."""
+
+    def __init__(self, run_id, directory=MANIFEST_DIR):
+        self.run_id = run_id
+        self.path = os.path.join(directory, f"{run_id}.jsonl")
+        self.entries = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(directory, exist_ok=True)
+        if os.path.exists(self.path):
+            self._load()
+
+    @staticmethod
+    def key(time_unit, period_days):
+        return f"download_{time_unit}M_{period_days}d"
+
+    @classmethod
+    def new(cls, key, directory=MANIFEST_DIR):
+        return cls(f"{key}_{datetime.now().strftime('%Y%m%d_%H%M%S')}", directory)
+
+    @classmethod
+    def find_latest(cls, key, directory=MANIFEST_DIR):
+        paths = sorted(glob.glob(os.path.join(directory, f"{key}_*.jsonl")))
+        if not paths:
+            return None
+        return cls(os.path.splitext(os.path.basename(paths[-1]))[0], directory)
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A crash mid-write can leave a truncated last line
+                    continue
+                self.entries[entry['code']] = entry
+        logger.info(f"Loaded {len(self.done())} completed symbols from {self.path}")
+
+    def record(self, code, status, rows=0, attempts=1, error=None, elapsed=0.0):
+        entry = {'code': code, 'status': status, 'rows': rows, 'attempts': attempts,
+                 'error': error, 'elapsed': round(elapsed, 3), 'time': datetime.now().isoformat()}
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self.entries[code] = entry
+
+    def is_done(self, code):
+        return self.entries.get(code, {}).get('status') == "done"
+
+    def done(self):
+        return [code for code, entry in self.entries.items() if entry['status'] == "done"]
+
+    def attempts(self, code):
+        return self.entries.get(code, {}).get('attempts', 0)
+
+
+class BulkDownloader:
+    """
+    data_manager: DataManager(use_api=True), shared by the workers.
+    rate_limit: requests per second for all workers together (default settings.API_RATE_LIMIT).
+    retries: extra rounds for the symbols that failed.
+    """
+
+    def __init__(self, data_manager, workers=None, rate_limit=None, retries=None, retry_delay=2.0):
+        self.dm = data_manager
+        self.workers = workers or settings.DATA_DOWNLOAD_WORKERS
+        self.retries = settings.DATA_DOWNLOAD_RETRIES if retries is None else retries
+        self.retry_delay = retry_delay
+        self.dm.api.rate_limiter = RateLimiter(rate_limit or settings.API_RATE_LIMIT)
+
+    def _fetch(self, code, period_days, time_unit, manifest):
+        attempts = manifest.attempts(code) + 1
+        start = time.perf_counter()
+        try:
+            df = self.dm.fetch_and_save_data(code, period_days=period_days, time_unit=time_unit, strict=True)
+            error = None if df is not None else "No data fetched"
+        except Exception as e:
+            df, error = None, str(e)
+        elapsed = time.perf_counter() - start
+        if error:
+            manifest.record(code, "failed", attempts=attempts, error=error, elapsed=elapsed)
+            return False
+        manifest.record(code, "done", rows=len(df), attempts=attempts, elapsed=elapsed)
+        return True
+
+    def run(self, codes, period_days=365, time_unit=None, resume=False):
+        """Download `codes`; returns a summary dict (see print_summary)."""
+        time_unit = str(time_unit or settings.BASE_TIMEFRAME)
+        key = DownloadManifest.key(time_unit, period_days)
+        manifest = (DownloadManifest.find_latest(key) if resume else None) or DownloadManifest.new(key)
+
+        skipped = [code for code in codes if manifest.is_done(code)]
+        pending = [code for code in codes if not manifest.is_done(code)]
+        if skipped:
+            logger.info(f"Resuming {manifest.run_id}: {len(skipped)} symbols already done")
+
+        # Issue the token once before the workers start requesting concurrently
+        self.dm.api.token_manager.get_token()
+
+        start = time.perf_counter()
+        for round_no in range(self.retries + 1):
+            if not pending:
+                break
+            if round_no:
+                logger.warning(f"Retry round {round_no}: {len(pending)} failed symbols")
+                time.sleep(self.retry_delay * round_no)
+
+            failed = []
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                futures = {pool.submit(self._fetch, code, period_days, time_unit, manifest): code for code in pending}
+                for i, future in enumerate(as_completed(futures), 1):
+                    code = futures[future]
+                    entry = manifest.entries[code]
+                    if not future.result():
+                        failed.append(code)
+                    logger.info(f"[{i}/{len(pending)}] {code} {entry['status']} ({entry['rows']} rows, {entry['elapsed']:.1f}s)")
+            # Keep the universe order for the next round
+            pending = [code for code in pending if code in failed]
+
+        entries = [manifest.entries[code] for code in codes if code in manifest.entries]
+        return {
+            'run_id': manifest.run_id,
+            'total': len(codes),
+            'done': sum(1 for e in entries if e['status'] == "done"),
+            'skipped': len(skipped),
+            'rows': sum(e['rows'] for e in entries if e['status'] == "done" and e['code'] not in skipped),
+            'failed': {code: manifest.entries[code]['error'] for code in pending},
+            'elapsed': time.perf_counter() - start,
+        }
+
+
+def print_summary(summary):
+    print(f"\nBulk download {summary['run_id']}: {summary['done']}/{summary['total']} symbols done "
+          f"({summary['skipped']} resumed), {summary['rows']} rows fetched in {summary['elapsed']:.1f}s")
+    if summary['failed']:
+        print(f"Failed ({len(summary['failed'])}), rerun with --resume to retry:")
+        for code, error in summary['failed'].items():
+            print(f"  {code} ({settings.STOCK_NAMES.get(code, code)}): {error}")
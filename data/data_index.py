@@ -0,0 +1,199 @@
+"""
+Integrity index of stored bar files.
+
+data_storage/index.json holds one entry per stored CSV (keyed by file name)
+with its time range, row count, per-session completeness against the KRX
+trading calendar, detected gaps and a content checksum:
+
+    "005930_30M.csv": {
+        "code": "005930", "time_unit": "30", "checksum": "<sha1>", "size": ..., "mtime": ...,
+        "rows": 3211, "start": "20250304090000", "end": "20260316150000",
+        "bad_times": 0, "duplicates": 0, "off_session": 0, "non_trading_days": 0,
+        "sessions": 247, "expected_bars": 3211, "actual_bars": 3209, "missing_bars": 2,
+        "gap_sessions": 1, "gaps": [{"date": "2025-11-13", "expected": 13, "actual": 11}],
+        "updated": "..."
+    }
+
+DataManager updates the entry of each file it writes, so validation and
+"what needs refetching" are answered from the index alone. A file whose
+size or mtime no longer matches its entry was changed outside DataManager
+and is reported as unindexed until `rebuild()` rescans it.
+
+Sessions run 09:00 ~ 15:30; the last stored session only has to be complete
+up to its last bar (a download taken mid-session). Late-opening sessions
+(first trading day of the year, CSAT day) show up as short sessions.
+"""
+import json
+import math
+import os
+import threading
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from data.resample import file_checksum
+from utils.market_time import is_trading_day
+
+SESSION_OPEN_MINUTES = 9 * 60
+SESSION_MINUTES = 390 # 09:00 ~ 15:30
+MAX_LISTED_GAPS = 200
+
+
+def _parse_times(values):
+    """Bar times as datetimes; unparseable values become NaT."""
+    series = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series
+    if pd.api.types.is_numeric_dtype(series):
+        series = pd.to_numeric(series, errors='coerce').astype('Int64')
+    return pd.to_datetime(series.astype(str), format="%Y%m%d%H%M%S", errors='coerce')
+
+
+def bars_per_session(time_unit):
+    return 1 if str(time_unit) == "D" else math.ceil(SESSION_MINUTES / int(time_unit))
+
+
+def scan_bars(df, time_unit):
+    """Completeness metadata of one bar series (see module docstring)."""
+    times = _parse_times(df['time'].values)
+    valid = times.dropna()
+    unique = valid.drop_duplicates()
+    entry = {
+        'rows': len(df),
+        'bad_times': int(times.isna().sum()),
+        'duplicates': int(len(valid) - len(unique)),
+        'start': valid.min().strftime("%Y%m%d%H%M%S") if len(valid) else None,
+        'end': valid.max().strftime("%Y%m%d%H%M%S") if len(valid) else None,
+    }
+
+    days = unique.dt.normalize()
+    if str(time_unit) == "D":
+        in_session = np.ones(len(unique), dtype=bool)
+        slots = np.zeros(len(unique), dtype=np.int64)
+    else:
+        minutes = (unique - days).dt.total_seconds().to_numpy() // 60 - SESSION_OPEN_MINUTES
+        in_session = (minutes >= 0) & (minutes < SESSION_MINUTES)
+        slots = (minutes // int(time_unit)).astype(np.int64)
+    trading = is_trading_day(days.values)
+    entry['off_session'] = int((~in_session).sum())
+    entry['non_trading_days'] = int(days[~trading].nunique())
+
+    keep = in_session & trading
+    per_day = pd.DataFrame({'day': days.values[keep], 'slot': slots[keep]}).groupby('day')['slot']
+    actual = per_day.nunique()
+    expected_full = bars_per_session(time_unit)
+
+    if len(actual):
+        calendar = np.arange(actual.index.min().to_datetime64().astype('datetime64[D]'),
+                             actual.index.max().to_datetime64().astype('datetime64[D]') + 1)
+        sessions = pd.DatetimeIndex(calendar[is_trading_day(calendar)])
+        actual = actual.reindex(sessions, fill_value=0)
+        expected = pd.Series(expected_full, index=sessions)
+        # The last session may be a mid-session download
+        expected.iloc[-1] = min(expected_full, int(per_day.max().iloc[-1]) + 1)
+    else:
+        actual = expected = pd.Series(dtype=np.int64)
+
+    short = actual < expected
+    entry.update({
+        'sessions': len(actual),
+        'expected_bars': int(expected.sum()),
+        'actual_bars': int(actual.sum()),
+        'missing_bars': int((expected - actual).clip(lower=0).sum()),
+        'gap_sessions': int(short.sum()),
+        'gaps': [{'date': day.strftime("%Y-%m-%d"), 'expected': int(expected[day]), 'actual': int(actual[day])}
+                 for day in actual.index[short][:MAX_LISTED_GAPS]],
+    })
+    return entry
+
+
+class DataIndex:
+    """
+    Index file under `data_dir`; safe to update from several threads sharing
+    the instance (bulk downloads).
+    """
+
+    def __init__(self, data_dir="data_storage"):
+        self.data_dir = data_dir
+        self.path = os.path.join(data_dir, "index.json")
+        self.entries = {}
+        self._lock = threading.Lock()
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                self.entries = json.load(f)
+
+    def _save(self):
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp, self.path)
+
+    def update(self, code, time_unit, filename, df=None):
+        """(Re)index one stored file; pass the frame just written to avoid reading it back."""
+        if df is None:
+            df = pd.read_csv(filename)
+        entry = {'code': code, 'time_unit': str(time_unit)}
+        entry.update(scan_bars(df, time_unit))
+        stat = os.stat(filename)
+        entry.update({'checksum': file_checksum(filename), 'size': stat.st_size, 'mtime': stat.st_mtime,
+                      'updated': datetime.now().isoformat(timespec='seconds')})
+        with self._lock:
+            self.entries[os.path.basename(filename)] = entry
+            self._save()
+        return entry
+
+    def get(self, filename):
+        return self.entries.get(os.path.basename(filename))
+
+    def is_current(self, filename):
+        """True if the file is indexed and unchanged since (size/mtime, no read)."""
+        entry = self.get(filename)
+        if entry is None or not os.path.exists(filename):
+            return False
+        stat = os.stat(filename)
+        return entry['size'] == stat.st_size and entry['mtime'] == stat.st_mtime
+
+    def rebuild(self, files, force=False):
+        """
+        Index {filename: (code, time_unit)} files that are new or changed on disk
+        (all of them with force=True). Returns the number rescanned.
+        """
+        rescanned = 0
+        for filename, (code, time_unit) in files.items():
+            if os.path.exists(filename) and (force or not self.is_current(filename)):
+                self.update(code, time_unit, filename)
+                rescanned += 1
+        return rescanned
+
+    def problems(self, filename, as_of=None):
+        """
+        Reasons a stored file needs attention, from the index only:
+        missing / unindexed / bad rows / duplicates / gaps / stale (ends before
+        the last trading day up to `as_of`, default today).
+        """
+        if not os.path.exists(filename):
+            return ["missing"]
+        if not self.is_current(filename):
+            return ["unindexed (changed since last write, run validate --rebuild)"]
+        entry = self.get(filename)
+        reasons = []
+        if entry['bad_times']:
+            reasons.append(f"{entry['bad_times']} unparseable times")
+        if entry['duplicates']:
+            reasons.append(f"{entry['duplicates']} duplicate bars")
+        if entry['gap_sessions']:
+            reasons.append(f"{entry['missing_bars']} missing bars in {entry['gap_sessions']} sessions")
+        if entry['end']:
+            last_day = last_trading_day(as_of)
+            if entry['end'][:8] < last_day.strftime("%Y%m%d"):
+                reasons.append(f"stale (ends {entry['end'][:8]}, last session {last_day:%Y%m%d})")
+        else:
+            reasons.append("no valid bars")
+        return reasons
+
+
+def last_trading_day(as_of=None):
+    """Most recent trading day on or before `as_of` (default today)."""
+    day = np.datetime64(pd.Timestamp(as_of or datetime.now()).date(), 'D')
+    while not is_trading_day(day):
+        day -= 1
+    return pd.Timestamp(day)
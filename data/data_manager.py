@@ -1,10 +1,14 @@
 import pandas as pd
 import time
 import os
-from api.kiwoom import KiwoomAPI
+import json
+import threading
 from config import settings
 from utils.logger import setup_logger
 from strategy.rsi_macd import RsiMacdStrategy
+from data.bar_store import BarStore
+from data.resample import resample_bars, can_resample, file_checksum
+from data.data_index import DataIndex
 
 logger = setup_logger("DataManager")
 
@@ -12,21 +16,44 @@ class DataManager:
     def __init__(self, use_api=True):
         # User requested to use REAL server for data fetching.
         # "PROD" mode uses real server.
-        self.api = KiwoomAPI(mode="PROD") if use_api else None
+        # The broker client (and its HTTP stack) is created on first use, see api
+        self.use_api = use_api
+        self._api = None
+        self._api_lock = threading.Lock()
         self.strategy = RsiMacdStrategy()
         self.data_dir = "data_storage"
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
+        self.index = DataIndex(self.data_dir)
+        self._legacy_logged = set()
+
+    @property
+    def api(self):
+        """KiwoomAPI (PROD server) created on first access; None with use_api=False."""
+        if self.use_api and self._api is None:
+            with self._api_lock:
+                if self._api is None:
+                    from api.kiwoom import KiwoomAPI
+                    self._api = KiwoomAPI(mode="PROD")
+        return self._api
 
     def _get_filename(self, code, time_unit):
         # Map 60 to 1H for backward compatibility
         suffix = "1H" if str(time_unit) == "60" else f"{time_unit}M"
         return f"{self.data_dir}/{code}_{suffix}.csv"
 
-    def fetch_and_save_data(self, code, period_days=365, time_unit="60"):
+    def _get_derived_filename(self, code, time_unit):
+        suffix = "D" if str(time_unit) == "D" else f"{time_unit}M"
+        return f"{self.data_dir}/derived/{code}_{suffix}.csv"
+
+    def fetch_and_save_data(self, code, period_days=365, time_unit=None, strict=False):
         """
         Fetch data for 'period_days' and save to CSV.
+        Only the finest bar size (settings.BASE_TIMEFRAME) needs downloading;
+        coarser ones are resampled from it by load_data().
+        strict: treat a download cut short by a failed page as a failure (returns None, nothing saved).
         """
+        time_unit = str(time_unit or settings.BASE_TIMEFRAME)
         logger.info(f"Fetching {time_unit}M data for {code}...")
         
         if not self.api:
@@ -34,13 +61,12 @@ class DataManager:
             return
             
         # time_unit is passed directly (e.g., "60" or "30")
-        data = self.api.get_ohlcv(code, time_unit=str(time_unit), days=period_days)
+        df = self.api.get_ohlcv_frame(code, time_unit=str(time_unit), days=period_days, strict=strict)
         
-        if not data:
+        if df is None or df.empty:
             logger.error("No data fetched.")
             return
             
-        df = pd.DataFrame(data)
         # Sort by time
         df = df.sort_values('time')
         
@@ -54,11 +80,118 @@ class DataManager:
         
         filename = self._get_filename(code, time_unit)
         df.to_csv(filename, index=False)
-        logger.info(f"Saved to {filename}")
+        entry = self.index.update(code, time_unit, filename, df)
+        logger.info(f"Saved to {filename} ({entry['missing_bars']} missing bars in {entry['gap_sessions']} sessions)")
         return df
 
-    def load_data(self, code, time_unit="60"):
+    def stored_files(self):
+        """{filename: (code, time_unit)} of the downloaded bar files (derived caches excluded)."""
+        files = {}
+        for name in sorted(os.listdir(self.data_dir)):
+            stem, ext = os.path.splitext(name)
+            if ext != ".csv" or "_" not in stem:
+                continue
+            code, suffix = stem.rsplit("_", 1)
+            if suffix == "1H":
+                files[f"{self.data_dir}/{name}"] = (code, "60")
+            elif suffix.endswith("M") and suffix[:-1].isdigit():
+                files[f"{self.data_dir}/{name}"] = (code, suffix[:-1])
+        return files
+
+    def needs_refetch(self, codes, time_unit=None, as_of=None):
+        """
+        {code: [reasons]} for symbols whose stored base series is missing,
+        incomplete or stale, answered from the index without loading the data.
+        """
+        time_unit = str(time_unit or settings.BASE_TIMEFRAME)
+        result = {}
+        for code in codes:
+            reasons = self.index.problems(self._get_filename(code, time_unit), as_of)
+            if reasons:
+                result[code] = reasons
+        return result
+
+    def load_data(self, code, time_unit="60", prefer_legacy=False):
+        """
+        Load bars for code. Timeframes coarser than settings.BASE_TIMEFRAME are
+        resampled from the stored base bars (cached under data_storage/derived/);
+        without base bars, a stored file for the timeframe itself is used.
+        prefer_legacy=True (single-timeframe backtests) keeps a stored file for
+        the timeframe that covers a longer period than the base bars (a legacy
+        _1H.csv with years of history next to a recent 30M download) until the
+        base download reaches as far. Callers comparing timeframes leave it off
+        so every timeframe covers the same period.
+        """
+        time_unit = str(time_unit)
+        base = settings.BASE_TIMEFRAME
+        base_file = self._get_filename(code, base)
         filename = self._get_filename(code, time_unit)
+        if time_unit != base and can_resample(base, time_unit) and os.path.exists(base_file):
+            if not (prefer_legacy and os.path.exists(filename) and self._covers_longer(code, time_unit, filename, base_file)):
+                return self._load_derived(code, time_unit, base_file)
+        
         if os.path.exists(filename):
             return pd.read_csv(filename)
         return None
+
+    def _coverage(self, code, time_unit, filename):
+        """(start, end) of a stored file from the index, indexing it first when new or changed."""
+        entry = self.index.get(filename) if self.index.is_current(filename) else None
+        if entry is None:
+            entry = self.index.update(code, time_unit, filename)
+        if not entry['start']:
+            return None
+        return pd.Timestamp(entry['start']), pd.Timestamp(entry['end'])
+
+    def _covers_longer(self, code, time_unit, filename, base_file):
+        stored = self._coverage(code, time_unit, filename)
+        base = self._coverage(code, settings.BASE_TIMEFRAME, base_file)
+        if stored is None or (base is not None and stored[1] - stored[0] <= base[1] - base[0]):
+            return False
+        if (code, time_unit) not in self._legacy_logged:
+            self._legacy_logged.add((code, time_unit))
+            logger.info(f"{code}: using {filename} ({stored[0]:%Y-%m-%d} ~ {stored[1]:%Y-%m-%d}) over bars resampled "
+                        f"from {base_file}, which covers a shorter period. Download the base timeframe for as many "
+                        f"years to switch.")
+        return True
+
+    def _load_derived(self, code, time_unit, base_file):
+        """Resampled series, cached until the base file's checksum changes."""
+        filename = self._get_derived_filename(code, time_unit)
+        meta_file = filename + ".json"
+        checksum = file_checksum(base_file)
+        
+        if os.path.exists(filename) and os.path.exists(meta_file):
+            with open(meta_file, "r") as f:
+                meta = json.load(f)
+            if meta.get('base_checksum') == checksum:
+                return pd.read_csv(filename)
+        
+        df = resample_bars(pd.read_csv(base_file), time_unit)
+        os.makedirs(os.path.dirname(filename), exist_ok=True)
+        df.to_csv(filename, index=False)
+        with open(meta_file, "w") as f:
+            json.dump({'base_file': base_file, 'base_checksum': checksum, 'time_unit': time_unit}, f)
+        logger.info(f"Resampled {code} {settings.BASE_TIMEFRAME}M -> {time_unit}: {len(df)} bars (cached to {filename})")
+        return df
+
+    def load_bars(self, code, time_unit="60", shared=False):
+        """
+        Load stored bars as a compact BarStore instead of a DataFrame.
+        shared=True moves the arrays into shared memory (caller must unlink).
+        Logs the per-symbol memory footprint against the equivalent DataFrame.
+        """
+        df = self.load_data(code, time_unit)
+        if df is None:
+            return None
+
+        store = BarStore.from_frame(df, code=code)
+        report = store.memory_report(df)
+        del df
+        if shared:
+            store.to_shared()
+
+        logger.info(f"Loaded {code} ({time_unit}M): {report['bars']} bars, "
+                    f"{report['store_bytes'] / 1024:.1f} KB compact vs "
+                    f"{report['frame_bytes'] / 1024:.1f} KB DataFrame (x{report['ratio']:.1f})")
+        return store
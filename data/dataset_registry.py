@@ -0,0 +1,107 @@
+import os
+import shutil
+import tempfile
+from data.bar_store import BarStore
+from utils.logger import setup_logger
+
+logger = setup_logger("DatasetRegistry")
+
+# Stores attached inside this process, keyed by block name / file path.
+# A worker maps each dataset once and reuses it for every task it runs.
+_attached = {}
+# DataFrames built from those stores, for workers whose engine takes a frame
+_frames = {}
+
+
+def open_dataset(handle):
+    """
+    Worker side: return the BarStore for `handle`, attaching on first use.
+    Attaching only maps memory, so the cost does not depend on history length.
+    """
+    key = handle.path or handle.shm_name
+    store = _attached.get(key)
+    if store is None:
+        store = BarStore.attach(handle)
+        _attached[key] = store
+    return store
+
+
+def open_frame(handle):
+    """
+    Worker side: the DataFrame view of `handle`, built once per process.
+    Callers must treat it as read-only; every task in the worker shares it.
+    """
+    key = handle.path or handle.shm_name
+    df = _frames.get(key)
+    if df is None:
+        df = open_dataset(handle).to_frame()
+        _frames[key] = df
+    return df
+
+
+class DatasetRegistry:
+    """
+    Publishes each symbol's bars once so worker processes can share one copy.
+
+    backend="shm" places the arrays in multiprocessing.shared_memory,
+    backend="mmap" writes them to files under a temporary directory.
+    Workers receive small picklable handles (see `handle()`) and call
+    `open_dataset(handle)` instead of unpickling a DataFrame per task.
+
+    Use as a context manager so the published blocks are released:
+
+        with DatasetRegistry() as registry:
+            handle = registry.publish(code, df)
+            pool.map(work, [(handle, p) for p in params])
+    """
+
+    def __init__(self, backend="shm", mmap_dir=None):
+        if backend not in ("shm", "mmap"):
+            raise ValueError(f"Unknown dataset backend: {backend}")
+        self.backend = backend
+        self._own_dir = backend == "mmap" and mmap_dir is None
+        self.mmap_dir = mmap_dir or (tempfile.mkdtemp(prefix="kospi_datasets_") if backend == "mmap" else None)
+        self._stores = {}
+        self._handles = {}
+
+    def publish(self, code, data, time_unit="60"):
+        """
+        Publish a DataFrame (or an existing BarStore) and return its handle.
+        Publishing the same (code, time_unit) again returns the existing handle.
+        """
+        key = (code, str(time_unit))
+        if key in self._handles:
+            return self._handles[key]
+
+        store = data if isinstance(data, BarStore) else BarStore.from_frame(data, code=code)
+        if self.backend == "shm":
+            handle = store.to_shared()
+        else:
+            path = os.path.join(self.mmap_dir, f"{code}_{time_unit}.bin")
+            handle = store.to_mmap(path)
+
+        self._stores[key] = store
+        self._handles[key] = handle
+        logger.info(f"Published {code} ({time_unit}M): {len(store)} bars, {handle.nbytes / 1024:.1f} KB via {self.backend}")
+        return handle
+
+    def handle(self, code, time_unit="60"):
+        return self._handles.get((code, str(time_unit)))
+
+    def handles(self):
+        return dict(self._handles)
+
+    def close(self):
+        for store in self._stores.values():
+            if store.is_shared:
+                store.unlink()
+        self._stores = {}
+        self._handles = {}
+        if self._own_dir and self.mmap_dir and os.path.exists(self.mmap_dir):
+            shutil.rmtree(self.mmap_dir, ignore_errors=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,78 @@
+"""
+Local OHLCV resampling from finer stored bars.
+
+Bars are labelled by their start time (a 60M bar at 09:00 covers
+09:00 ~ 09:59), as returned by Kiwoom minute charts. Coarser bars are
+aligned to the KRX session open (09:00), so 60M bars start at 09:00,
+10:00, ... and the last 15:00 bar only holds the 15:00 ~ 15:30 period.
+Daily bars ("D") are labelled 09:00 of their session. Bars dated on
+weekends or MARKET_HOLIDAYS are dropped.
+"""
+import hashlib
+import numpy as np
+import pandas as pd
+from data.bar_store import parse_bar_times
+from utils.market_time import is_trading_day
+
+SESSION_OPEN_MINUTES = 9 * 60 # 09:00
+OHLCV_AGG = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+
+
+def can_resample(base, timeframe):
+    """True if `timeframe` bars can be built from `base` bars ("30" -> "60", "120", "D")."""
+    base, timeframe = str(base), str(timeframe)
+    if timeframe == "D":
+        return base != "D"
+    if base == "D":
+        return False
+    return int(timeframe) > int(base) and int(timeframe) % int(base) == 0
+
+
+def resample_bars(df, timeframe):
+    """
+    Aggregate minute bars into `timeframe` bars: minutes ("60", "120", 60, ...)
+    aligned to the session open, or "D" for one bar per session.
+    Only OHLCV columns are kept (indicators must be recomputed on the new bars).
+    The 'time' column keeps the input format (YYYYMMDDHHMMSS int or str, or datetimes).
+    """
+    if df is None or df.empty:
+        return df
+
+    times = pd.to_datetime(parse_bar_times(df['time'].values), unit='s')
+    day = times.normalize()
+    if str(timeframe) == "D":
+        starts = day + pd.Timedelta(minutes=SESSION_OPEN_MINUTES)
+    else:
+        minutes = int(timeframe)
+        since_open = (times - day).total_seconds() // 60 - SESSION_OPEN_MINUTES
+        # Bars before the open (if any) fold into the first session bar
+        bucket = np.maximum(since_open // minutes, 0)
+        starts = day + pd.to_timedelta(SESSION_OPEN_MINUTES + bucket * minutes, unit='m')
+
+    trading = is_trading_day(day.values)
+    frame = df.loc[trading, list(OHLCV_AGG)].copy()
+    times, starts = times[trading], starts[trading]
+    frame['_start'] = np.asarray(starts)
+    frame['_order'] = np.asarray(times)
+    frame = frame.sort_values('_order')
+    out = frame.groupby('_start', sort=True).agg(OHLCV_AGG).reset_index()
+    out.insert(0, 'time', _format_like(df['time'], out.pop('_start')))
+    return out
+
+
+def _format_like(original, starts):
+    if pd.api.types.is_datetime64_any_dtype(original):
+        return starts.values
+    labels = starts.dt.strftime("%Y%m%d%H%M%S")
+    if pd.api.types.is_numeric_dtype(original):
+        return labels.astype(np.int64).values
+    return labels.values
+
+
+def file_checksum(path):
+    """sha1 of a stored bar file, used to invalidate series derived from it."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
@@ -1,6 +1,7 @@
 from config import settings
 import os
 from data.data_manager import DataManager
+from data.bulk_download import BulkDownloader, print_summary
 from utils.logger import setup_logger
 
 logger = setup_logger("BatchDownload")
@@ -16,15 +17,9 @@ if __name__ == "__main__":
     
     dm = DataManager(use_api=True)
     
-    total = len(settings.TARGET_STOCKS)
-    for i, code in enumerate(settings.TARGET_STOCKS):
-        name = settings.STOCK_NAMES.get(code, "Unknown")
-        print(f"[{i+1}/{total}] Processing {code} ({name})...")
-        
-        # 1. Download 1H (60m)
-        dm.fetch_and_save_data(code, period_days=365, time_unit="60")
-        
-        # 2. Download 30M
-        dm.fetch_and_save_data(code, period_days=365, time_unit="30")
+    # Download only the base timeframe (30M); 1H is resampled from it locally.
+    # Workers share one rate limit; rerun `python main.py data --resume` to retry failures.
+    summary = BulkDownloader(dm).run(settings.TARGET_STOCKS, period_days=365)
+    print_summary(summary)
         
     print("All downloads completed.")
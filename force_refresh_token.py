@@ -1,22 +1,16 @@
-from config import settings
-import kiwoom_rest_api.config
-import os
+from api.kiwoom import KiwoomAPI
 
-# Inject settings
-kiwoom_rest_api.config.API_KEY = settings.APP_KEY
-kiwoom_rest_api.config.API_SECRET = settings.APP_SECRET
-kiwoom_rest_api.config.USE_SANDBOX = True if settings.MODE == "PAPER" else False
-
-from kiwoom_rest_api.auth.token import TokenManager
+# Replaces the token in the shared cache (settings.TOKEN_CACHE_FILE), so every process picks it up
+api = KiwoomAPI()
+tm = api.token_manager
 
 print("Initializing TokenManager...")
-tm = TokenManager()
 if tm.access_token:
     print(f"Current Token (Masked): {tm.access_token[:10]}...")
 else:
     print("Current Token: None")
 
 print("Forcing New Token Request...")
-tm._request_new_token()
+tm.refresh(force=True)
 print(f"New Token (Masked): {tm.access_token[:10]}...")
 print("Done.")
@@ -0,0 +1,140 @@
+"""
+Offline load test of the Kiwoom client paths against api/mock_server.py.
+
+Drives KiwoomAPI.get_ohlcv, DataManager.fetch_and_save_data and
+TradingBot.run_cycle against a local mock server with configurable latency,
+rate limit and error injection, and reports throughput and latency percentiles.
+
+    python load_test.py --codes 005930,000660 --latency 0.03 --jitter 0.02 --rate-limit 20
+    python load_test.py --recorded       # serve stored data_storage bars instead of synthetic ones
+"""
+import argparse
+import logging
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from config import settings
+from api.mock_server import MockKiwoomServer
+from api.kiwoom import KiwoomAPI
+from data.data_manager import DataManager
+from bot.trader import TradingBot
+from utils.telegram_bot import TelegramBot
+
+for name in ("KiwoomAPI", "DataManager", "TradingBot", "TelegramBot", "Strategy"):
+    logging.getLogger(name).setLevel(logging.WARNING)
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def report(label, timings, units=None, unit_name=None, server=None, requests_before=0):
+    timings = np.asarray(timings)
+    total = timings.sum()
+    p50, p90, p99 = np.percentile(timings, [50, 90, 99]) * 1000
+    line = f"{label:<22} n={len(timings):<3} p50 {p50:8.1f} ms | p90 {p90:8.1f} ms | p99 {p99:8.1f} ms"
+    if units is not None:
+        line += f" | {units / total:9.1f} {unit_name}/s"
+    if server is not None:
+        line += f" | {(server.stats['requests'] - requests_before) / total:6.1f} req/s"
+    print(line)
+
+
+def load_recorded(server, codes):
+    dm = DataManager(use_api=False)
+    for code in codes:
+        for time_unit in ("30", "60"):
+            df = dm.load_data(code, time_unit)
+            if df is not None and not df.empty:
+                server.add_bars(code, time_unit, df)
+
+
+def bench_get_ohlcv(server, codes, repeat, time_unit, days):
+    api = KiwoomAPI()
+    timings, bars, failed = [], 0, 0
+    before = server.stats['requests']
+    for _ in range(repeat):
+        for code in codes:
+            data, elapsed = timed(api.get_ohlcv, code, time_unit, days)
+            timings.append(elapsed)
+            if data:
+                bars += len(data)
+            else:
+                failed += 1
+    report("KiwoomAPI.get_ohlcv", timings, bars, "bars", server, before)
+    return failed
+
+
+def bench_data_manager(server, codes, days):
+    dm = DataManager(use_api=True)
+    timings = []
+    before = server.stats['requests']
+    for code in codes:
+        _, elapsed = timed(dm.fetch_and_save_data, code, days)
+        timings.append(elapsed)
+    report("DataManager.fetch", timings, len(codes), "symbols", server, before)
+
+
+def bench_run_cycle(server, codes, cycles):
+    bot = TradingBot()
+    bot.target_stocks = codes
+    bot.telegram = TelegramBot(None, None) # Never message the real chat from a load test
+    timings = []
+    before = server.stats['requests']
+    for _ in range(cycles):
+        _, elapsed = timed(bot.run_cycle)
+        timings.append(elapsed)
+    report("TradingBot.run_cycle", timings, len(codes) * cycles, "symbols", server, before)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test KiwoomAPI / DataManager / TradingBot against a local mock server")
+    parser.add_argument("--codes", help="Comma separated codes (default: first 3 TARGET_STOCKS)")
+    parser.add_argument("--time-unit", default=settings.BASE_TIMEFRAME, help="Minute bars for get_ohlcv")
+    parser.add_argument("--days", type=int, default=365, help="History requested per symbol")
+    parser.add_argument("--repeat", type=int, default=2, help="get_ohlcv rounds over all codes")
+    parser.add_argument("--cycles", type=int, default=2, help="TradingBot.run_cycle iterations")
+    parser.add_argument("--latency", type=float, default=0.02, help="Server latency per request (s)")
+    parser.add_argument("--jitter", type=float, default=0.01, help="Extra uniform latency (s)")
+    parser.add_argument("--rate-limit", type=int, default=None, help="Server requests per second")
+    parser.add_argument("--rate-limit-status", type=int, default=429, help="HTTP status when limited (200 = broker-style return_code 5)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of an injected HTTP 500")
+    parser.add_argument("--recorded", action="store_true", help="Replay stored data_storage bars instead of synthetic ones")
+    args = parser.parse_args()
+
+    codes = [settings.NAME_TO_CODE.get(c, c) for c in args.codes.split(",")] if args.codes else settings.TARGET_STOCKS[:3]
+    server = MockKiwoomServer(latency=args.latency, jitter=args.jitter, rate_limit=args.rate_limit,
+                              rate_limit_status=args.rate_limit_status, error_rate=args.error_rate)
+    if args.recorded:
+        load_recorded(server, codes)
+
+    cwd = os.getcwd()
+    work_dir = tempfile.mkdtemp(prefix="load_test_")
+    override = settings.BASE_URL_OVERRIDE
+    settings.BASE_URL_OVERRIDE = server.base_url
+    try:
+        server.start()
+        # DataManager files and bot_state.json go to a scratch directory
+        os.chdir(work_dir)
+        print(f"Mock server {server.base_url} | latency {args.latency * 1000:.0f}+{args.jitter * 1000:.0f} ms"
+              f" | rate limit {args.rate_limit or '-'} req/s | error rate {args.error_rate:.0%} | {len(codes)} symbols")
+        failed = bench_get_ohlcv(server, codes, args.repeat, args.time_unit, args.days)
+        bench_data_manager(server, codes, args.days)
+        bench_run_cycle(server, codes, args.cycles)
+    finally:
+        os.chdir(cwd)
+        settings.BASE_URL_OVERRIDE = override
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    stats = server.stats
+    print(f"Server: {stats['requests']} requests, {stats['bars_served']} bars, {stats['rate_limited']} rate limited, "
+          f"{stats['errors']} injected errors, {stats['orders']} orders | failed get_ohlcv calls: {failed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ from utils.logger import setup_logger
 
 logger = setup_logger("Main")
 
-def run_data(code, days):
+def run_data(code, days, workers=None, resume=False):
     # Force REAL Mode for Data Download
     import os
     settings.MODE = "REAL"
@@ -19,71 +19,134 @@ def run_data(code, days):
     logger.info(f"Forced Real Mode for Data Download. MODE={settings.MODE}")
 
     from data.data_manager import DataManager
+    from data.bulk_download import BulkDownloader, print_summary
     dm = DataManager(use_api=True)
     if code:
         dm.fetch_and_save_data(code, period_days=days)
     else:
-        for c in settings.TARGET_STOCKS:
-            dm.fetch_and_save_data(c, period_days=days)
+        summary = BulkDownloader(dm, workers=workers).run(settings.TARGET_STOCKS, period_days=days, resume=resume)
+        print_summary(summary)
 
-def run_backtest(code):
+def run_backtest(code, strategy_names="rsi_macd", full=False):
     from backtester.engine import BacktestEngine
-    from strategy.rsi_macd import RsiMacdStrategy
+    from backtester.checkpoint import BacktestStateStore
+    from backtester.batch_engine import run_strategies
+    from strategy.registry import get_strategy
+    from config.profiles import load_profiles
     from data.data_manager import DataManager
     
     # Backtest does not need API
     dm = DataManager(use_api=False)
-    strategy = RsiMacdStrategy()
-    engine = BacktestEngine(strategy)
+    strategies = [get_strategy(name) for name in strategy_names.split(",")]
+    engine = BacktestEngine(strategies[0])
+    # Resume from the state saved at the end of the previous run's data (only new bars are walked)
+    state_store = None if full else BacktestStateStore()
+    profiles = load_profiles()
     
     codes = [code] if code else settings.TARGET_STOCKS
     
     for c in codes:
-        logger.info(f"Running Backtest for {c}")
-        df = dm.load_data(c)
+        # Same bars as the bot trades: the symbol's (calibrated) profile timeframe
+        timeframe = profiles.get(c).timeframe
+        logger.info(f"Running Backtest for {c} ({timeframe}M)")
+        df = dm.load_data(c, time_unit=timeframe, prefer_legacy=True)
         if df is None:
             logger.error(f"No data found for {c}. Run 'data' mode first.")
             continue
             
-        engine.run(df, code=c)
+        if len(strategies) == 1:
+            engine.run(df, code=c, time_unit=timeframe, state_store=state_store)
+            continue
         
+        # Several strategies: one run over shared indicators, compared side by side
+        results = run_strategies(df, strategies, code=c, time_unit=timeframe)
+        logger.info(f"{'Strategy':<12} | {'Return':<10} | {'Trades':<8} | {'Win':<5} | {'SL':<4} | {'TP':<4}")
+        logger.info("-" * 60)
+        for name, (res, _) in results.items():
+            logger.info(f"{name:<12} | {res['return']:>7.2f}%  | {res['total_trades']:<8} | {res['win_trades']:<5} | {res['count_sl']:<4} | {res['count_tp']:<4}")
+        
+def open_checkpoint(mode, code, grid, df, args, strategy):
+    """
+    Open the checkpoint for an optimization sweep.
+    --run-id continues that exact run, otherwise the latest run with the same
+    grid, strategy, symbol profile and data is continued (--resume makes that
+    explicit and warns when there is none); --new-run starts over.
+    """
+    from backtester.checkpoint import OptimizationCheckpoint, data_checksum
+    from config.profiles import PARAMETER_FIELDS, load_profiles
+
+    if args.run_id:
+        checkpoint = OptimizationCheckpoint(args.run_id)
+    else:
+        # Points recorded under other fixed parameters or other bars are not reusable
+        profile = load_profiles().get(code)
+        params = {'strategy': strategy.name, 'rsi_period': getattr(strategy, 'rsi_period', None),
+                  'profile': {name: getattr(profile, name) for name in PARAMETER_FIELDS}}
+        key = OptimizationCheckpoint.grid_key(mode, code, grid, data_checksum(df), params)
+        checkpoint = None if args.new_run else OptimizationCheckpoint.find_latest(key)
+        if checkpoint is None and args.resume:
+            logger.warning("No earlier run with the same ranges, parameters and data to resume; starting a new one")
+        if checkpoint is None:
+            checkpoint = OptimizationCheckpoint.new(key)
+
+    logger.info(f"Optimization Run ID: {checkpoint.run_id} ({len(checkpoint)} points already done)")
+    return checkpoint
+
+def record_optimize_run(db, engine, res, checkpoint, params=None):
+    # Index every optimization point in the results DB for cross-run queries
+    params = params if params is not None else engine.get_params()
+    db.record_run("optimize", engine.code, engine.time_unit, params, res,
+                  period=(engine.start_date, engine.end_date), optimizer_run_id=checkpoint.run_id)
+
 def run_rsi_optimize(code, args):
     if not code:
         logger.error("RSI Optimization requires a specific --code argument.")
         return
 
     from backtester.engine import BacktestEngine
+    from backtester.batch_engine import BatchBacktestEngine
     from strategy.rsi_macd import RsiMacdStrategy
+    from config.profiles import load_profiles
     from data.data_manager import DataManager
+    from backtester.results_db import ResultsDB
     import pandas as pd
 
     dm = DataManager(use_api=False)
-    df = dm.load_data(code)
+    # Tune on the bars the backtest and the bot use: the symbol's profile timeframe
+    timeframe = load_profiles().get(code).timeframe
+    df = dm.load_data(code, time_unit=timeframe, prefer_legacy=True)
     
     if df is None:
         logger.error(f"No data found for {code}. Run 'data' mode first.")
         return
         
-    results = [] # Initialize results list
-    
     # RSI Optimization
     min_val, max_val, step_val = args.min_rsi, args.max_rsi, args.step_rsi
-    logger.info(f"Starting RSI Optimization for {code} (Range: {min_val}-{max_val}, Step: {step_val})")
-    
-    for val in range(min_val, max_val + 1, step_val):
-        strategy = RsiMacdStrategy()
-        engine = BacktestEngine(strategy, rsi_oversold=val)
-        res = engine.run(df, code=code, save_results=False)
-        results.append({
-            'param': val, 
-            'return': res['return'], 
-            'trades': res['total_trades'], 
-            'win': res['win_trades'],
-            'sl': res['count_sl'],
-            'tp': res['count_tp'],
-            'mh_win': res['count_mh_win'],
-            'mh_loss': res['count_mh_loss']
-        })
+    logger.info(f"Starting RSI Optimization for {code} ({timeframe}M, Range: {min_val}-{max_val}, Step: {step_val})")
+    
+    checkpoint = open_checkpoint("rsi", code, {'min': min_val, 'max': max_val, 'step': step_val}, df, args, RsiMacdStrategy())
+    with ResultsDB() as db:
+        # Pending thresholds are walked OPTIMIZE_BATCH_SIZE at a time over shared
+        # indicators; each batch is checkpointed as soon as its walk finishes
+        pending = [val for val in range(min_val, max_val + 1, step_val) if not checkpoint.is_done({'rsi': val})]
+        scanner = BacktestEngine(RsiMacdStrategy()).prepare_scanner(df, code) if pending else None
+        for start in range(0, len(pending), settings.OPTIMIZE_BATCH_SIZE):
+            chunk = pending[start:start + settings.OPTIMIZE_BATCH_SIZE]
+            batch = BatchBacktestEngine(RsiMacdStrategy(), [{'rsi_oversold': val} for val in chunk])
+            for k, res in enumerate(batch.run(df, code=code, time_unit=timeframe, scanner=scanner)):
+                record_optimize_run(db, batch, res, checkpoint, params=batch.get_params(k))
+                row = {
+                    'param': chunk[k], 
+                    'return': res['return'], 
+                    'trades': res['total_trades'], 
+                    'win': res['win_trades'],
+                    'sl': res['count_sl'],
+                    'tp': res['count_tp'],
+                    'mh_win': res['count_mh_win'],
+                    'mh_loss': res['count_mh_loss']
+                }
+                checkpoint.record({'rsi': chunk[k]}, row)
+    results = [checkpoint.get({'rsi': val}) for val in range(min_val, max_val + 1, step_val)]
 
     # Sort by success (Return)
     results.sort(key=lambda x: x['return'], reverse=True)
@@ -128,17 +191,21 @@ def run_pnl_maxhold_optimize(code, args):
 
     from backtester.engine import BacktestEngine
     from strategy.rsi_macd import RsiMacdStrategy
+    from config.profiles import load_profiles
     from data.data_manager import DataManager
+    from backtester.results_db import ResultsDB
     import numpy as np
 
     dm = DataManager(use_api=False)
-    df = dm.load_data(code)
+    # Tune on the bars the backtest and the bot use: the symbol's profile timeframe
+    timeframe = load_profiles().get(code).timeframe
+    df = dm.load_data(code, time_unit=timeframe, prefer_legacy=True)
     
     if df is None:
         logger.error(f"No data found for {code}. Run 'data' mode first.")
         return
         
-    logger.info(f"Starting PnL & MaxHold Optimization for {code}")
+    logger.info(f"Starting PnL & MaxHold Optimization for {code} ({timeframe}M)")
     
     # Ranges
     sl_vals = np.arange(args.min_sl, args.max_sl + (args.step_sl/1000), args.step_sl)
@@ -149,31 +216,48 @@ def run_pnl_maxhold_optimize(code, args):
     logger.info(f"Total Combinations to test: {total_combinations}")
     
     results = []
+    grid = {
+        'sl': [args.min_sl, args.max_sl, args.step_sl],
+        'tp': [args.min_tp, args.max_tp, args.step_tp],
+        'hold': [args.min_hold, args.max_hold, args.step_hold]
+    }
+    checkpoint = open_checkpoint("pnl", code, grid, df, args, RsiMacdStrategy())
+    with ResultsDB() as db:
+        # Indicators, entry signals and trading-day ordinals are shared by every combination
+        scanner = BacktestEngine(RsiMacdStrategy()).prepare_scanner(df, code)
     
-    count = 0
-    for sl in sl_vals:
-        for tp in tp_vals:
-            for hold in hold_vals:
-                sl = round(sl, 2)
-                tp = round(tp, 2)
+        count = 0
+        for sl in sl_vals:
+            for tp in tp_vals:
+                for hold in hold_vals:
+                    sl = round(sl, 2)
+                    tp = round(tp, 2)
+                    count += 1
                 
-                strategy = RsiMacdStrategy()
-                engine = BacktestEngine(strategy, stop_loss_pct=sl, take_profit_pct=tp, max_hold_days=hold)
-                res = engine.run(df, code=code, save_results=False)
+                    params = {'sl': sl, 'tp': tp, 'hold': hold}
+                    if checkpoint.is_done(params):
+                        results.append(checkpoint.get(params))
+                        continue
                 
-                results.append({
-                    'sl': sl, 'tp': tp, 'hold': hold,
-                    'return': res['return'],
-                    'trades': res['total_trades'],
-                    'win': res['win_trades'],
-                    'count_sl': res['count_sl'],
-                    'count_tp': res['count_tp'],
-                    'mh_win': res['count_mh_win'],
-                    'mh_loss': res['count_mh_loss']
-                })
-                count += 1
-                if count % 100 == 0:
-                    logger.debug(f"Progress: {count}/{total_combinations}")
+                    strategy = RsiMacdStrategy()
+                    engine = BacktestEngine(strategy, stop_loss_pct=sl, take_profit_pct=tp, max_hold_days=hold)
+                    res = engine.run_fast(df, code=code, save_results=False, time_unit=timeframe, scanner=scanner)
+                    record_optimize_run(db, engine, res, checkpoint)
+                
+                    row = {
+                        'sl': sl, 'tp': tp, 'hold': hold,
+                        'return': res['return'],
+                        'trades': res['total_trades'],
+                        'win': res['win_trades'],
+                        'count_sl': res['count_sl'],
+                        'count_tp': res['count_tp'],
+                        'mh_win': res['count_mh_win'],
+                        'mh_loss': res['count_mh_loss']
+                    }
+                    checkpoint.record(params, row)
+                    results.append(row)
+                    if count % 100 == 0:
+                        logger.debug(f"Progress: {count}/{total_combinations}")
                     
     # Sort by success (Return)
     results.sort(key=lambda x: x['return'], reverse=True)
@@ -217,42 +301,52 @@ def run_min_profit_optimize(code, args):
         return
 
     from backtester.engine import BacktestEngine
+    from backtester.batch_engine import BatchBacktestEngine
     from strategy.rsi_macd import RsiMacdStrategy
+    from config.profiles import load_profiles
     from data.data_manager import DataManager
+    from backtester.results_db import ResultsDB
     import numpy as np
 
     dm = DataManager(use_api=False)
-    df = dm.load_data(code)
+    # Tune on the bars the backtest and the bot use: the symbol's profile timeframe
+    timeframe = load_profiles().get(code).timeframe
+    df = dm.load_data(code, time_unit=timeframe, prefer_legacy=True)
     
     if df is None:
         logger.error(f"No data found for {code}. Run 'data' mode first.")
         return
         
-    logger.info(f"Starting Min Profit Optimization for {code}")
+    logger.info(f"Starting Min Profit Optimization for {code} ({timeframe}M)")
     
     # Range
     # Use numpy for float range
     profit_vals = np.arange(args.min_profit, args.max_profit + (args.step_profit/1000), args.step_profit)
     
-    results = []
-    
-    for val in profit_vals:
-        val = round(val, 2)
-        strategy = RsiMacdStrategy()
-        # Use default max_hold_days (5) and max_hold_max_days (10) for this optimization, or should we expose them?
-        # Let's keep others default to isolate Min Profit impact.
-        engine = BacktestEngine(strategy, min_profit_yield=val)
-        res = engine.run(df, code=code, save_results=False)
-        
-        results.append({
-            'min_profit': val,
-            'return': res['return'],
-            'trades': res['total_trades'],
-            'win': res['win_trades'],
-            'loss': res['loss_trades'],
-            'mh_win': res['count_mh_win'],
-            'mh_loss': res['count_mh_loss']
-        })
+    grid = {'min_profit': [args.min_profit, args.max_profit, args.step_profit]}
+    checkpoint = open_checkpoint("minprofit", code, grid, df, args, RsiMacdStrategy())
+    with ResultsDB() as db:
+        # Pending values are walked OPTIMIZE_BATCH_SIZE at a time over shared
+        # indicators; each batch is checkpointed as soon as its walk finishes
+        pending = [round(val, 2) for val in profit_vals if not checkpoint.is_done({'min_profit': round(val, 2)})]
+        scanner = BacktestEngine(RsiMacdStrategy()).prepare_scanner(df, code) if pending else None
+        for start in range(0, len(pending), settings.OPTIMIZE_BATCH_SIZE):
+            chunk = pending[start:start + settings.OPTIMIZE_BATCH_SIZE]
+            # Use default max_hold_days (5) and max_hold_max_days (10) to isolate Min Profit impact
+            batch = BatchBacktestEngine(RsiMacdStrategy(), [{'min_profit_yield': val} for val in chunk])
+            for k, res in enumerate(batch.run(df, code=code, time_unit=timeframe, scanner=scanner)):
+                record_optimize_run(db, batch, res, checkpoint, params=batch.get_params(k))
+                row = {
+                    'min_profit': chunk[k],
+                    'return': res['return'],
+                    'trades': res['total_trades'],
+                    'win': res['win_trades'],
+                    'loss': res['loss_trades'],
+                    'mh_win': res['count_mh_win'],
+                    'mh_loss': res['count_mh_loss']
+                }
+                checkpoint.record({'min_profit': chunk[k]}, row)
+    results = [checkpoint.get({'min_profit': round(val, 2)}) for val in profit_vals]
         
     # Sort by success (Return)
     results.sort(key=lambda x: x['return'], reverse=True)
@@ -289,6 +383,95 @@ def run_min_profit_optimize(code, args):
             
         logger.info(f"Results saved to {result_path}")
 
+def run_validate(code, rebuild=False):
+    from data.data_manager import DataManager
+    
+    # Answered from data_storage/index.json; only new or changed files are rescanned on --rebuild
+    dm = DataManager(use_api=False)
+    if rebuild:
+        rescanned = dm.index.rebuild(dm.stored_files())
+        logger.info(f"Rescanned {rescanned} new or changed files")
+    
+    codes = [code] if code else settings.TARGET_STOCKS
+    base = settings.BASE_TIMEFRAME
+    problems = dm.needs_refetch(codes)
+    
+    print(f"{'Code':<8} | {'Name':<12} | {'Range':<19} | {'Rows':>6} | {'Sessions':>8} | {'Missing':>7} | Status")
+    print("-" * 100)
+    for c in codes:
+        name = settings.STOCK_NAMES.get(c, c)
+        entry = dm.index.get(dm._get_filename(c, base))
+        if entry is None:
+            print(f"{c:<8} | {name:<12} | {'-':<19} | {'-':>6} | {'-':>8} | {'-':>7} | {', '.join(problems.get(c, []))}")
+            continue
+        date_range = f"{(entry['start'] or '')[:8]}~{(entry['end'] or '')[:8]}"
+        status = ", ".join(problems.get(c, [])) or "OK"
+        print(f"{c:<8} | {name:<12} | {date_range:<19} | {entry['rows']:>6} | {entry['sessions']:>8} | {entry['missing_bars']:>7} | {status}")
+        for gap in entry['gaps'][:5]:
+            print(f"{'':<8}   gap {gap['date']}: {gap['actual']}/{gap['expected']} bars")
+    print("-" * 100)
+    
+    if problems:
+        print(f"\nNeeds refetch ({len(problems)}): {', '.join(problems)}")
+        print("Refetch with: python main.py data --code <code>  (or python main.py data for all targets)")
+    else:
+        print("\nAll stored series are complete and current.")
+    return problems
+
+def run_replay(code, schedule="bars", parity=False):
+    from bot.replay import replay, parity_check
+    from config.profiles import load_profiles
+    from data.data_manager import DataManager
+    
+    # Stored bars only: no API, no real clock
+    dm = DataManager(use_api=False)
+    profiles = load_profiles()
+    codes = [code] if code else settings.TARGET_STOCKS
+    frames = {}
+    for c in codes:
+        df = dm.load_data(c, profiles.get(c).timeframe)
+        if df is None:
+            logger.error(f"No data found for {c}. Run 'data' mode first.")
+            continue
+        frames[c] = df
+    if not frames:
+        return
+    
+    if parity:
+        for c, df in frames.items():
+            res = parity_check(c, df, profiles)
+            logger.info(f"{c}: backtest {res['backtest']} trades, replay {res['replay']}, matched {res['matched']}")
+            for entry_time, expected, got in res['mismatches'][:5]:
+                logger.info(f"  entry {entry_time}: backtest={expected} replay={got}")
+        return
+    
+    res = replay(frames, profiles, schedule=schedule)
+    logger.info(f"Replay ({schedule}): {res['steps']} cycles in {res['elapsed']:.1f}s, "
+                f"{len(res['trades'])} closed trades, return {res['return']:.2f}%, open {list(res['open_positions'])}")
+
+def run_screen(code, timeframe=None, strategy_name="rsi_macd"):
+    import time
+    from data.data_manager import DataManager
+    from strategy.registry import get_strategy
+    from strategy.screener import screen_universe
+    
+    # Every stored symbol (or --code) in one (time x symbol) matrix per timeframe
+    dm = DataManager(use_api=False)
+    began = time.perf_counter()
+    results = screen_universe(dm, [code] if code else None, timeframe, strategy=get_strategy(strategy_name))
+    elapsed = time.perf_counter() - began
+    
+    for res in results:
+        print(f"\n[{res.timeframe}M] {len(res.codes)} symbols, {len(res.times)} bars, {len(res.current)} firing on the last bar")
+        for item in res.current:
+            print(f"  {item['code']} {item['name']:<12} {item['time']} close {item['close']:,.0f} (threshold {item['threshold']:g})")
+        top = res.frequency.sort_values('rate', ascending=False).head(20)
+        print(f"{'Code':<8} | {'Name':<12} | {'Bars':>5} | {'Signals':>7} | {'Rate %':>6} | Last signal")
+        for row in top.itertuples(index=False):
+            print(f"{row.code:<8} | {row.name:<12} | {row.bars:>5} | {row.signals:>7} | {row.rate:>6.2f} | {row.last_signal or '-'}")
+    logger.info(f"Screened {sum(len(r.codes) for r in results)} symbols in {elapsed:.1f}s")
+    return results
+
 def run_bot():
     from bot.trader import TradingBot
     bot = TradingBot()
@@ -296,10 +479,17 @@ def run_bot():
 
 def main():
     parser = argparse.ArgumentParser(description="KOSPI Trading Bot")
-    parser.add_argument("mode", choices=["bot", "backtest", "data", "rsi_optimize", "pnl_maxhold_optimize", "min_profit_optimize"], help="Operation mode")
-    parser.add_argument("--code", help="Stock code or Name (optional for data/backtest)")
+    parser.add_argument("mode", choices=["bot", "replay", "screen", "backtest", "data", "validate", "rsi_optimize", "pnl_maxhold_optimize", "min_profit_optimize"], help="Operation mode")
+    parser.add_argument("--code", help="Stock code or Name (optional for data/backtest/validate)")
     parser.add_argument("--name", help="Stock Code or Name (Available for backward compatibility)", dest="code_arg")
     parser.add_argument("--years", type=int, default=1, help="Number of years to fetch data for (default 1)")
+    parser.add_argument("--workers", type=int, default=settings.DATA_DOWNLOAD_WORKERS, help=f"Parallel download workers for data mode, sharing one rate limit (default {settings.DATA_DOWNLOAD_WORKERS})")
+    parser.add_argument("--rebuild", action="store_true", help="validate: rescan stored files that are new or changed since they were indexed")
+    parser.add_argument("--full", action="store_true", help="backtest: ignore saved end-of-data states and walk every bar")
+    parser.add_argument("--schedule", choices=["bars", "live"], default="bars", help="replay: a cycle at every bar close (bars) or at HH:01 like the bot (live)")
+    parser.add_argument("--parity", action="store_true", help="replay: compare the bot's trades with the backtest's, per symbol")
+    parser.add_argument("--timeframe", help="screen: evaluate every symbol on this timeframe (default: each symbol's profile timeframe)")
+    parser.add_argument("--strategy", default="rsi_macd", help="Registered strategy for backtest (and screen); comma separated to compare several (e.g. rsi_macd,ema_trend)")
     
     # RSI Optimization
     parser.add_argument("--min-rsi", type=int, default=settings.RSI_OPTIMIZE_MIN, help=f"Min RSI (default {settings.RSI_OPTIMIZE_MIN})")
@@ -324,7 +514,14 @@ def main():
     parser.add_argument("--max-profit", type=float, default=settings.MIN_PROFIT_OPT_MAX, help=f"Max Profit Yield (default {settings.MIN_PROFIT_OPT_MAX})")
     parser.add_argument("--step-profit", type=float, default=settings.MIN_PROFIT_OPT_STEP, help=f"Step Profit Yield (default {settings.MIN_PROFIT_OPT_STEP})")
     
+    # Resuming (data: bulk download, optimization modes: checkpoints)
+    parser.add_argument("--resume", action="store_true", help="data: continue the latest bulk download; optimization modes: continue the interrupted sweep (the default, warns when there is none)")
+    parser.add_argument("--new-run", action="store_true", help="Start a new optimization run instead of continuing the latest one with the same ranges, parameters and data")
+    parser.add_argument("--run-id", help="Continue a specific optimization run ID")
+    
     args = parser.parse_args()
+    if args.resume and args.new_run:
+        parser.error("--resume and --new-run are mutually exclusive")
     
     # Handle --code or the new argument logic. 
     # User might pass name in --code argument too.
@@ -340,17 +537,27 @@ def main():
             
     if args.mode == "data":
         days = args.years * 365
-        run_data(target_code, days)
+        run_data(target_code, days, args.workers, args.resume)
+    elif args.mode == "validate":
+        run_validate(target_code, args.rebuild)
     elif args.mode == "backtest":
-        run_backtest(target_code)
+        run_backtest(target_code, args.strategy, args.full)
     elif args.mode == "bot":
         run_bot()
-    elif args.mode == "rsi_optimize":
-        run_rsi_optimize(target_code, args)
-    elif args.mode == "pnl_maxhold_optimize":
-        run_pnl_maxhold_optimize(target_code, args)
-    elif args.mode == "min_profit_optimize":
-        run_min_profit_optimize(target_code, args)
+    elif args.mode == "replay":
+        run_replay(target_code, args.schedule, args.parity)
+    elif args.mode == "screen":
+        run_screen(target_code, args.timeframe, args.strategy)
+    elif args.mode in ("rsi_optimize", "pnl_maxhold_optimize", "min_profit_optimize"):
+        optimizers = {
+            "rsi_optimize": run_rsi_optimize,
+            "pnl_maxhold_optimize": run_pnl_maxhold_optimize,
+            "min_profit_optimize": run_min_profit_optimize
+        }
+        try:
+            optimizers[args.mode](target_code, args)
+        except KeyboardInterrupt:
+            logger.warning("Optimization interrupted. Completed points are checkpointed; rerun the same command to continue.")
 
 if __name__ == "__main__":
     main()
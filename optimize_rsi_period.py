@@ -3,51 +3,72 @@ import os
 import argparse
 import pandas as pd
 from config import settings
+from config.profiles import load_profiles
 from data.data_manager import DataManager
 from strategy.rsi_macd import RsiMacdStrategy
 from backtester.engine import BacktestEngine
 from utils.logger import setup_logger
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from data.dataset_registry import DatasetRegistry, open_frame
 
 logger = setup_logger("RSI_Period_Validator")
 
-def run_rsi_period_optimization(code, start_period, end_period, step):
+def run_period(df, code, period, time_unit="60"):
+    logger.info(f"Testing RSI Period: {period}")
+    
+    # Instantiate Strategy with specific Period
+    strategy = RsiMacdStrategy(rsi_period=period)
+    
+    # Instantiate Engine
+    # Engine will pick up RSI Threshold from Map (if exists) or Default
+    engine = BacktestEngine(strategy)
+    
+    # Run Backtest
+    res = engine.run(df, code, save_results=False, time_unit=time_unit)
+    
+    return {
+        'period': period,
+        'return': res['return'],
+        'trades': res['total_trades'],
+        'win': res['win_trades'],
+        'sl': res['count_sl'],
+        'tp': res['count_tp'],
+        'mh_win': res['count_mh_win'],
+        'mh_loss': res['count_mh_loss']
+    }
+
+def run_period_shared(handle, code, period, time_unit):
+    # Worker process entry: map the published bars, no copy of the history is pickled.
+    # The frame is built on the worker's first task and reused for the rest
+    df = open_frame(handle)
+    return run_period(df, code, period, time_unit)
+
+def run_rsi_period_optimization(code, start_period, end_period, step, workers=1):
     logger.info(f"Starting RSI Period Optimization for {code} (Range: {start_period}-{end_period}, Step: {step})")
     
     # 1. Load Data
     dm = DataManager(use_api=False) # Use local data
-    df = dm.load_data(code)
+    # Same bars as the backtest and the bot: the symbol's profile timeframe
+    timeframe = load_profiles().get(code).timeframe
+    df = dm.load_data(code, time_unit=timeframe, prefer_legacy=True)
     
     if df is None or df.empty:
         logger.error(f"No data found for {code}")
         return
 
     # 2. Iterate Periods
-    results = []
+    periods = list(range(start_period, end_period + 1, step))
     
-    for period in range(start_period, end_period + 1, step):
-        logger.info(f"Testing RSI Period: {period}")
-        
-        # Instantiate Strategy with specific Period
-        strategy = RsiMacdStrategy(rsi_period=period)
-        
-        # Instantiate Engine
-        # Engine will pick up RSI Threshold from Map (if exists) or Default
-        engine = BacktestEngine(strategy)
-        
-        # Run Backtest
-        res = engine.run(df, code, save_results=False)
-        
-        results.append({
-            'period': period,
-            'return': res['return'],
-            'trades': res['total_trades'],
-            'win': res['win_trades'],
-            'sl': res['count_sl'],
-            'tp': res['count_tp'],
-            'mh_win': res['count_mh_win'],
-            'mh_loss': res['count_mh_loss']
-        })
+    if workers > 1:
+        # Publish the bars once; workers attach by handle instead of unpickling the DataFrame
+        with DatasetRegistry() as registry:
+            handle = registry.publish(code, df)
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(run_period_shared, [handle] * len(periods), [code] * len(periods), periods,
+                                        [timeframe] * len(periods)))
+    else:
+        results = [run_period(df, code, period, timeframe) for period in periods]
 
     # 3. Sort Results (by Return desc)
     sorted_results = sorted(results, key=lambda x: x['return'], reverse=True)
@@ -83,6 +104,7 @@ if __name__ == "__main__":
     parser.add_argument("--min", type=int, default=settings.RSI_PERIOD_OPT_MIN, help="Min Period")
     parser.add_argument("--max", type=int, default=settings.RSI_PERIOD_OPT_MAX, help="Max Period")
     parser.add_argument("--step", type=int, default=settings.RSI_PERIOD_OPT_STEP, help="Step")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes (shared-memory dataset)")
     
     args = parser.parse_args()
     
@@ -95,7 +117,7 @@ if __name__ == "__main__":
         print(f"Resolved Stock Name '{start_code}' to Code: {code}")
 
     try:
-        run_rsi_period_optimization(code, args.min, args.max, args.step)
+        run_rsi_period_optimization(code, args.min, args.max, args.step, args.workers)
     except KeyboardInterrupt:
         logger.info("Interrupted by user.")
     except Exception as e:
@@ -0,0 +1,156 @@
+import argparse
+import glob
+import os
+import re
+from datetime import datetime
+import pandas as pd
+from config import settings
+from backtester.results_db import ResultsDB, since_days, DATE_FORMAT
+
+
+def resolve_code(code):
+    if code and code in settings.NAME_TO_CODE:
+        return settings.NAME_TO_CODE[code]
+    return code
+
+
+def fmt(value, spec=""):
+    if value is None:
+        return "-"
+    return format(value, spec)
+
+
+def cmd_runs(db, args):
+    since = since_days(args.days) if args.days else None
+    runs = db.runs(code=resolve_code(args.code), timeframe=args.timeframe, kind=args.kind, since=since, limit=args.limit)
+
+    print(f"{'ID':<6} | {'Kind':<8} | {'Code':<8} | {'TF':<4} | {'Created':<19} | {'Return':<9} | {'Trades':<6} | {'RSI':<5} | {'SL':<6} | {'TP':<6} | {'Hold':<4}")
+    print("-" * 105)
+    for r in runs:
+        p, m = r['params'], r['metrics']
+        print(f"{r['id']:<6} | {r['kind']:<8} | {r['code']:<8} | {r['timeframe']:<4} | {r['created_at']:<19} | "
+              f"{fmt(m.get('return'), '>7.2f')}%  | {fmt(m.get('total_trades'), '<6.0f')} | {fmt(p.get('rsi_oversold'), '<5.0f')} | "
+              f"{fmt(p.get('stop_loss_pct'), '<6')} | {fmt(p.get('take_profit_pct'), '<6')} | {fmt(p.get('max_hold_days'), '<4.0f')}")
+
+
+def cmd_best(db, args):
+    since = since_days(args.days) if args.days else None
+    codes = [resolve_code(c) for c in args.codes.split(",")] if args.codes else None
+    runs = db.best_runs(metric=args.metric, kind=args.kind, since=since, timeframe=args.timeframe, codes=codes)
+    names = args.params.split(",")
+
+    window = f"last {args.days} days" if args.days else "all runs"
+    print(f"Best {args.metric} per symbol ({window}, kind={args.kind or 'any'})")
+    print(f"{'Code':<8} | {'Name':<15} | {'TF':<4} | {args.metric:<10} | " + " | ".join(f"{n:<16}" for n in names) + " | Run")
+    print("-" * (60 + 19 * len(names)))
+    for r in runs:
+        name = settings.STOCK_NAMES.get(r['code'], r['code'])
+        values = " | ".join(f"{fmt(r['params'].get(n)):<16}" for n in names)
+        print(f"{r['code']:<8} | {name:<15} | {r['timeframe']:<4} | {r['metric_value']:>10.2f} | {values} | {r['id']}")
+
+
+def cmd_trades(db, args):
+    if args.run_id:
+        run_id = args.run_id
+    else:
+        run = db.latest_run(code=resolve_code(args.code))
+        if run is None:
+            print("No backtest runs found.")
+            return
+        run_id = run['id']
+
+    trades = db.trades(run_id)
+    print(f"Trades for run {run_id} ({len(trades)} trades)")
+    if trades:
+        df = pd.DataFrame(trades).drop(columns=['run_id'])
+        print(df.to_string(index=False))
+        print(f"Total PnL: {df['pnl'].sum()}")
+
+
+def parse_summary(path):
+    """Parse a legacy summary_<code>_<timestamp>.txt file."""
+    fields = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                fields[key.strip()] = value.strip()
+
+    metrics = {}
+    numeric = {
+        'Final Balance': 'final_balance', 'Total Trades': 'total_trades', 'Win Trades': 'win_trades',
+        'Loss Trades': 'loss_trades', 'Total Fees': 'total_fees'
+    }
+    for key, name in numeric.items():
+        if key in fields:
+            metrics[name] = float(fields[key])
+    if 'Return' in fields:
+        metrics['return'] = float(fields['Return'].rstrip('%'))
+    trend = re.search(r"Slope: ([-\d.e]+)", fields.get('Trend', ''))
+    if trend:
+        metrics['slope'] = float(trend.group(1))
+
+    period = fields.get('Period', '').split(' ~ ')
+    period = (period[0], period[1]) if len(period) == 2 else (None, None)
+    return metrics, period
+
+
+def cmd_import(db, args):
+    """Ingest legacy summary_*.txt / trades_*.csv files (idempotent)."""
+    imported = 0
+    known = {r[0] for r in db.conn.execute("SELECT source FROM runs WHERE source IS NOT NULL")}
+    for path in sorted(glob.glob(os.path.join(args.dir, "summary_*.txt"))):
+        if path in known:
+            continue
+        match = re.match(r"summary_(\w+?)_(\d{8}_\d{6})\.txt$", os.path.basename(path))
+        if not match:
+            continue
+        code, timestamp = match.groups()
+        metrics, period = parse_summary(path)
+        trades_path = os.path.join(args.dir, f"trades_{code}_{timestamp}.csv")
+        trades = pd.read_csv(trades_path).to_dict('records') if os.path.exists(trades_path) else None
+        created_at = datetime.strptime(timestamp, "%Y%m%d_%H%M%S").strftime(DATE_FORMAT)
+
+        # Legacy summaries do not record the bar size; assume the configured one
+        timeframe = settings.TIMEFRAME_MAP.get(code, "60")
+        db.record_run("backtest", code, timeframe, {}, metrics, trades=trades,
+                      period=period, created_at=created_at, source=path)
+        imported += 1
+    print(f"Imported {imported} runs from {args.dir}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the backtest results database")
+    parser.add_argument("--db", default=settings.RESULTS_DB_PATH, help="Results DB path")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("runs", help="List recent runs")
+    p.add_argument("--code")
+    p.add_argument("--timeframe")
+    p.add_argument("--kind", choices=["backtest", "optimize"])
+    p.add_argument("--days", type=int, help="Only runs from the last N days")
+    p.add_argument("--limit", type=int, default=50)
+
+    p = sub.add_parser("best", help="Best run per symbol")
+    p.add_argument("--metric", default="return")
+    p.add_argument("--kind", choices=["backtest", "optimize"])
+    p.add_argument("--days", type=int, help="Only runs from the last N days")
+    p.add_argument("--timeframe")
+    p.add_argument("--codes", help="Comma separated codes or names")
+    p.add_argument("--params", default="stop_loss_pct,take_profit_pct", help="Comma separated params to show")
+
+    p = sub.add_parser("trades", help="Trades of a run (default: latest backtest)")
+    p.add_argument("--run-id", type=int)
+    p.add_argument("--code")
+
+    p = sub.add_parser("import", help="Import legacy summary/trades files")
+    p.add_argument("--dir", default="backtest_results")
+
+    args = parser.parse_args()
+    commands = {"runs": cmd_runs, "best": cmd_best, "trades": cmd_trades, "import": cmd_import}
+    with ResultsDB(args.db) as db:
+        commands[args.command](db, args)
+
+
+if __name__ == "__main__":
+    main()
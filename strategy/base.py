@@ -1,17 +1,55 @@
 from abc import ABC, abstractmethod
+from strategy.registry import IndicatorCache
 
 class BaseStrategy(ABC):
+    name = None
+    backend = None # Indicator backend, None = settings.INDICATOR_BACKEND
+
     def __init__(self):
         pass
 
+    def required_indicators(self):
+        """
+        Indicators the rules need, as a list of (name, params) specs,
+        e.g. [("rsi", {"period": 14}), ("macd", {"fast": 12, "slow": 26, "signal": 9})].
+        """
+        return []
+
+    def indicators(self, df, cache=None):
+        """Compute required indicators for df, into `cache` if one is shared with other strategies."""
+        cache = cache if cache is not None else IndicatorCache(df, backend=self.backend)
+        return cache.compute(self.required_indicators())
+
     @abstractmethod
-    def generate_signal(self, df):
+    def entry_signals(self, indicators, threshold=None):
+        """
+        Vectorized entry rule.
+        indicators: IndicatorCache holding required_indicators().
+        threshold: optional entry threshold from the engine (e.g. RSI oversold level).
+        Returns a bool array, True on bars where a position should be opened.
         """
-        Analyze the DataFrame and return a signal.
+        pass
+
+    def exit_signals(self, indicators):
+        """
+        Optional vectorized exit rule, applied by the engine on top of its
+        Stop Loss / Take Profit / Max Hold rules. Returns a bool array or None.
+        """
+        return None
+
+    def generate_signal(self, df, rsi_oversold=None):
+        """
+        Analyze the DataFrame and return a signal for the latest bar.
         df: pandas DataFrame with OHLCV data.
         Returns:
             dict with:
             'action': 'BUY' | 'SELL' | 'HOLD',
             'reason': str
         """
-        pass
+        if len(df) == 0:
+            return {'action': 'HOLD', 'reason': 'Not enough data'}
+        cache = self.indicators(df)
+        if self.entry_signals(cache, rsi_oversold)[-1]:
+            latest = df.iloc[-1]
+            return {'action': 'BUY', 'reason': f"{self.name} entry", 'price': latest['close'], 'time': latest['time']}
+        return {'action': 'HOLD', 'reason': 'No Signal'}
@@ -0,0 +1,36 @@
+import numpy as np
+from strategy.base import BaseStrategy
+from strategy.registry import register_strategy
+
+@register_strategy("ema_trend")
+class EmaTrendStrategy(BaseStrategy):
+    """
+    EMA crossover: enter when the fast EMA crosses above the slow EMA,
+    exit when it crosses back below. Uses the MACD spans by default, so
+    it shares its EMAs with RsiMacdStrategy on the same data.
+    """
+
+    def __init__(self, fast=12, slow=26, backend=None):
+        super().__init__()
+        self.fast = fast
+        self.slow = slow
+        self.backend = backend
+
+    def required_indicators(self):
+        return [("ema", {'span': self.fast}), ("ema", {'span': self.slow})]
+
+    def _spread(self, indicators):
+        return indicators.get("ema", span=self.fast) - indicators.get("ema", span=self.slow)
+
+    def entry_signals(self, indicators, threshold=None):
+        # threshold (RSI level) does not apply to this strategy
+        spread = self._spread(indicators)
+        crossed = np.zeros(spread.shape, dtype=bool)
+        crossed[1:] = (spread[1:] > 0) & (spread[:-1] <= 0)
+        return crossed
+
+    def exit_signals(self, indicators):
+        spread = self._spread(indicators)
+        crossed = np.zeros(spread.shape, dtype=bool)
+        crossed[1:] = (spread[1:] < 0) & (spread[:-1] >= 0)
+        return crossed
@@ -0,0 +1,192 @@
+"""
+Array kernels for the strategy indicators (RSI, EMA, MACD).
+
+They operate on float64 numpy arrays instead of pandas Series and accept
+either a 1-D series or a 2-D (time x series) matrix, so many symbols can be
+processed in one call. Results match the pandas implementation in
+RsiMacdStrategy (rolling mean RSI, ewm(adjust=False) EMA) to within 1e-9.
+
+The EMA recursion uses Numba when it is installed and otherwise a blocked
+NumPy recursive filter (closed form inside fixed-size blocks, one carry per
+block), so it stays vectorized without a per-element Python loop. The
+closed form is exact to a few ulps of the price level, which is within 1e-9
+of pandas below EXACT_LEVEL; higher-priced input takes a row-by-row loop
+(vectorized across columns) in pandas' operation order, as does input with
+missing values, with pandas' NaN handling.
+"""
+import math
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+BACKEND = "numba" if numba is not None else "numpy"
+
+
+EXACT_LEVEL = 2.0 ** 18 # Prices from here on (262,144 KRW) take the sequential recursion without Numba
+
+
+def _ema_recursive(values, alpha):
+    """The recursion in pandas' own operation order (identical rounding), one step per row."""
+    out = np.empty_like(values)
+    out[0] = values[0]
+    for t in range(1, values.shape[0]):
+        out[t] = alpha * values[t] + (1.0 - alpha) * out[t - 1]
+    return out
+
+
+if numba is not None:
+    _ema_numba = numba.njit(cache=True)(_ema_recursive)
+
+
+def _ema_blocked(values, alpha):
+    """
+    y[t] = alpha * x[t] + (1 - alpha) * y[t-1], y[0] = x[0], along axis 0.
+    Inside a block of length B, relative to its first value c:
+    y[k] - c = w^k * cumsum(alpha * (x[m] - c) * w^-m) + w^(k+1) * (carry - c).
+    B is chosen so that w^-B stays below 1e8 to keep the closed form accurate.
+    """
+    w = 1.0 - alpha
+    n = values.shape[0]
+    if w <= 0.0:
+        return values.copy()
+
+    block = int(min(256, max(1, math.floor(8.0 / -math.log10(w)))))
+    n_blocks = -(-n // block)
+    padded = np.zeros((n_blocks * block,) + values.shape[1:])
+    padded[:n] = values
+    blocks = padded.reshape((n_blocks, block) + values.shape[1:])
+
+    k = np.arange(block, dtype=np.float64)
+    shape = (1, block) + (1,) * (values.ndim - 1)
+    grow = (w ** -k).reshape(shape)
+    decay = (w ** k).reshape(shape)
+    decay_carry = (w ** (k + 1)).reshape(shape)
+
+    # Zero-state response of every block at once. The recursion is affine, so
+    # each block is filtered relative to its first value: the sums only see
+    # the local moves and the rounding error does not grow with the price level.
+    base = blocks[:, :1]
+    partial = decay * np.cumsum(alpha * (blocks - base) * grow, axis=1)
+
+    # Relative to its own base, block b ends at e[b] = W * e[b-1] + g[b] with
+    # W = w^B and g[b] = partial[b, -1] + W * (base[b-1] - base[b]). Expand
+    # that recursion as a series, dropping terms once W^j is below float
+    # precision, so the carries are also computed without a Python loop over
+    # blocks.
+    big_w = w ** block
+    shift = np.concatenate([np.zeros_like(base[:1, 0]), base[:-1, 0] - base[1:, 0]])
+    ends = partial[:, -1] + big_w * shift
+    carries = ends.copy()
+    weight = 1.0
+    for j in range(1, n_blocks):
+        weight *= big_w
+        if weight < 1e-17:
+            break
+        carries[j:] += weight * ends[:-j]
+
+    # Previous block's last value relative to this block's base (0 before the first)
+    prev = np.concatenate([np.zeros_like(carries[:1]), carries[:-1]]) + shift
+    out = base + partial + decay_carry * prev[:, None]
+    return out.reshape(padded.shape)[:n]
+
+
+def _ema_missing(values, alpha):
+    """
+    The recursion with pandas' ewm(adjust=False, ignore_na=False) NaN rules:
+    NaN before the first value stays NaN, a NaN row repeats the previous
+    average, and the value after a gap of k rows gets weight alpha against
+    (1 - alpha)^(k+1) for the previous average. One Python step per row,
+    vectorized across columns.
+    """
+    w = 1.0 - alpha
+    out = np.empty_like(values)
+    average = np.full(values.shape[1:], np.nan)
+    old_weight = np.ones(values.shape[1:])
+    for t in range(values.shape[0]):
+        x = values[t]
+        seen = ~np.isnan(x)
+        started = ~np.isnan(average)
+        old_weight = np.where(started, old_weight * w, old_weight)
+        update = started & seen
+        average = np.where(update, (old_weight * average + alpha * x) / (old_weight + alpha), average)
+        old_weight = np.where(update, 1.0, old_weight)
+        average = np.where(seen & ~started, x, average)
+        out[t] = average
+    return out
+
+
+def ema(values, span):
+    """Exponential moving average equal to pandas ewm(span=span, adjust=False).mean(), NaN included."""
+    values = np.asarray(values, dtype=np.float64)
+    alpha = 2.0 / (span + 1.0)
+    if values.shape[0] == 0:
+        return values.copy()
+    if np.isnan(values).any():
+        # The closed forms below would carry one NaN into every later row
+        return _ema_missing(values, alpha)
+    if numba is not None:
+        if values.ndim == 1:
+            return _ema_numba(values, alpha)
+        return np.column_stack([_ema_numba(np.ascontiguousarray(values[:, i]), alpha) for i in range(values.shape[1])])
+    if np.abs(values).max() >= EXACT_LEVEL:
+        # pandas' own rounding drifts up to ~10 ulps from the exact EMA; at
+        # 1,000,000 KRW that alone is above 1e-9, so only its operation order matches
+        return _ema_recursive(values, alpha)
+    return _ema_blocked(values, alpha)
+
+
+def rolling_mean(values, window):
+    """
+    Trailing mean over `window` rows along axis 0 (NaN for the first window-1 rows),
+    equal to pandas rolling(window).mean() for NaN-free input.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    out = np.full(values.shape, np.nan)
+    if values.shape[0] < window:
+        return out
+    if np.all(values == np.round(values)) and np.abs(values).sum() < 2 ** 52:
+        # Integer-valued input (tick prices and their diffs): cumulative sums are
+        # exact, so window sums are one subtraction instead of `window` adds.
+        csum = np.cumsum(values, axis=0)
+        sums = csum[window - 1:].copy()
+        sums[1:] -= csum[:-window]
+        out[window - 1:] = sums / window
+    else:
+        windows = np.lib.stride_tricks.sliding_window_view(values, window, axis=0)
+        out[window - 1:] = windows.mean(axis=-1)
+    return out
+
+
+def rsi(close, period=14):
+    """
+    RSI as computed by RsiMacdStrategy (simple rolling means of gains/losses).
+    `period` may be an int, or a list of periods for a 1-D close, in which
+    case the result is a (time x len(periods)) matrix sharing one diff pass.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    delta = np.empty_like(close)
+    delta[0] = np.nan
+    delta[1:] = close[1:] - close[:-1]
+    # NaN (first row) counts as 0, like Series.where(delta > 0, 0)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+
+    def _rsi(p):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = rolling_mean(gain, p) / rolling_mean(loss, p)
+            return 100 - (100 / (1 + rs))
+
+    if np.ndim(period) == 0:
+        return _rsi(int(period))
+    return np.column_stack([_rsi(int(p)) for p in period])
+
+
+def macd(close, fast=12, slow=26, signal=9):
+    """Return (macd, signal, histogram) arrays."""
+    close = np.asarray(close, dtype=np.float64)
+    macd_line = ema(close, fast) - ema(close, slow)
+    signal_line = ema(macd_line, signal)
+    return macd_line, signal_line, macd_line - signal_line
@@ -0,0 +1,119 @@
+"""
+Strategy and indicator registries.
+
+Strategies declare the indicators they need as (name, params) specs, e.g.
+("ema", {"span": 12}), and evaluate their entry/exit rules on an
+IndicatorCache. The cache computes each distinct spec once, so strategies
+sharing an indicator (the EMA 12 behind MACD and an EMA trend filter) reuse
+the same array when they run on the same data.
+"""
+import numpy as np
+import pandas as pd
+from config import settings
+from strategy import indicators
+
+INDICATORS = {}
+STRATEGIES = {}
+
+
+def register_indicator(name):
+    """Decorator: func(cache, **params) -> ndarray (or tuple of ndarrays)."""
+    def decorator(func):
+        INDICATORS[name] = func
+        return func
+    return decorator
+
+
+def register_strategy(name):
+    """Class decorator adding a strategy under `name`."""
+    def decorator(cls):
+        cls.name = name
+        STRATEGIES[name] = cls
+        return cls
+    return decorator
+
+
+def _load_builtin_strategies():
+    # Built-in strategies register themselves on import
+    from strategy import rsi_macd, ema_trend # noqa: F401
+
+
+def get_strategy(name, **kwargs):
+    _load_builtin_strategies()
+    if name not in STRATEGIES:
+        raise ValueError(f"Unknown strategy '{name}'. Available: {', '.join(available_strategies())}")
+    return STRATEGIES[name](**kwargs)
+
+
+def available_strategies():
+    _load_builtin_strategies()
+    return sorted(STRATEGIES)
+
+
+class IndicatorCache:
+    """
+    Memoized indicator arrays for one price series.
+    backend "pandas" reproduces the original Series computations exactly;
+    "array" uses the strategy.indicators kernels, which also take a
+    (time x symbol) close matrix, e.g. IndicatorCache({'close': matrix}, "array").
+    """
+
+    def __init__(self, df, backend=None):
+        self.close = np.asarray(df['close'], dtype=np.float64)
+        self.backend = backend or settings.INDICATOR_BACKEND
+        self._values = {}
+        self.computed = 0 # Distinct specs actually computed (the rest were cache hits)
+
+    def __len__(self):
+        return len(self.close)
+
+    def get(self, name, **params):
+        key = (name, tuple(sorted(params.items())))
+        if key not in self._values:
+            if name not in INDICATORS:
+                raise ValueError(f"Unknown indicator '{name}'")
+            self._values[key] = INDICATORS[name](self, **params)
+            self.computed += 1
+        return self._values[key]
+
+    def compute(self, specs):
+        for name, params in specs:
+            self.get(name, **params)
+        return self
+
+    def values_at(self, i):
+        """Computed indicator values at bar i: {spec repr: [float, ...]} (one per returned array)."""
+        values = {}
+        for key, value in self._values.items():
+            arrays = value if isinstance(value, tuple) else (value,)
+            values[repr(key)] = [float(a[i]) for a in arrays]
+        return values
+
+
+@register_indicator("ema")
+def _ema(cache, span):
+    if cache.backend == "array":
+        return indicators.ema(cache.close, span)
+    return pd.Series(cache.close).ewm(span=span, adjust=False).mean().to_numpy()
+
+
+@register_indicator("rsi")
+def _rsi(cache, period):
+    if cache.backend == "array":
+        return indicators.rsi(cache.close, period)
+    delta = pd.Series(cache.close).diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
+    rs = gain / loss
+    return (100 - (100 / (1 + rs))).to_numpy()
+
+
+@register_indicator("macd")
+def _macd(cache, fast, slow, signal):
+    # Built from the cached EMAs so other users of the same spans share them
+    macd_line = cache.get("ema", span=fast) - cache.get("ema", span=slow)
+    if cache.backend == "array":
+        signal_line = indicators.ema(macd_line, signal)
+    else:
+        signal_line = pd.Series(macd_line).ewm(span=signal, adjust=False).mean().to_numpy()
+    return macd_line, signal_line, macd_line - signal_line
@@ -1,36 +1,44 @@
 import pandas as pd
 import numpy as np
 from strategy.base import BaseStrategy
+from strategy.registry import register_strategy
 from config import settings
 
+@register_strategy("rsi_macd")
 class RsiMacdStrategy(BaseStrategy):
-    def __init__(self, rsi_period=14):
+    def __init__(self, rsi_period=14, backend=None):
         super().__init__()
         self.rsi_period = rsi_period
+        # "pandas" or "array" (strategy.indicators kernels)
+        self.backend = backend
         self.macd_fast = 12
         self.macd_slow = 26
         self.macd_signal = 9
         
         self.rsi_oversold_threshold = settings.RSI_OVERSOLD
 
+    def required_indicators(self):
+        return [
+            ("rsi", {'period': self.rsi_period}),
+            ("macd", {'fast': self.macd_fast, 'slow': self.macd_slow, 'signal': self.macd_signal})
+        ]
+
     def calculate_indicators(self, df):
-        # RSI
-        delta = df['close'].diff()
-        gain = (delta.where(delta > 0, 0)).rolling(window=self.rsi_period).mean()
-        loss = (-delta.where(delta < 0, 0)).rolling(window=self.rsi_period).mean()
-        
-        rs = gain / loss
-        df['rsi'] = 100 - (100 / (1 + rs))
-        
-        # MACD
-        exp12 = df['close'].ewm(span=self.macd_fast, adjust=False).mean()
-        exp26 = df['close'].ewm(span=self.macd_slow, adjust=False).mean()
-        df['macd'] = exp12 - exp26
-        df['signal'] = df['macd'].ewm(span=self.macd_signal, adjust=False).mean()
-        df['histogram'] = df['macd'] - df['signal']
-        
+        cache = self.indicators(df)
+        df['rsi'] = cache.get("rsi", period=self.rsi_period)
+        df['macd'], df['signal'], df['histogram'] = cache.get(
+            "macd", fast=self.macd_fast, slow=self.macd_slow, signal=self.macd_signal)
         return df
 
+    def entry_signals(self, indicators, threshold=None):
+        threshold = threshold if threshold is not None else self.rsi_oversold_threshold
+        rsi = indicators.get("rsi", period=self.rsi_period)
+        macd_line, signal_line, histogram = indicators.get(
+            "macd", fast=self.macd_fast, slow=self.macd_slow, signal=self.macd_signal)
+        # NaN comparisons are False, so warm-up bars never signal
+        macd_bullish = (macd_line > signal_line) & (histogram > 0)
+        return macd_bullish & (rsi < threshold)
+
     def generate_signal(self, df, rsi_oversold=None):
         if len(df) < self.macd_slow + self.macd_signal:
             return {'action': 'HOLD', 'reason': 'Not enough data'}
@@ -0,0 +1,180 @@
+"""
+Universe-wide entry screener.
+
+Instead of running generate_signal() symbol by symbol, the close prices of
+every stored symbol are aligned into one (time x symbol) matrix and the
+strategy's vectorized entry rule is evaluated on all columns at once with
+the strategy.indicators kernels, each column against its own threshold
+(profiles, i.e. RSI_OVERSOLD_MAP). The result is the set of symbols whose
+entry fires on the latest bar plus how often each one fired over the last
+`history` bars.
+
+Alignment: rows are the union of the symbols' bar times. A symbol with no
+bar at a row (listed later, halted, not yet downloaded up to the last bar)
+has NaN there and never signals on such a row. The kernels run on a
+compacted copy in which each column holds only its own bars, moved to the
+bottom rows, with its first close repeated above them (a constant prefix
+leaves the EMAs exactly where the symbol's own series starts them); the
+results are scattered back to the aligned rows, so indicators after a gap
+equal those of the symbol's own series. Signals also wait for MIN_BARS bars
+of the symbol's own history, like generate_signal(). Each column keeps
+WARMUP_BARS bars before the counted window, so EMA values at the window
+match a full-history run.
+
+Symbols are grouped by their profile timeframe (or one forced timeframe),
+one matrix per group; see screen_universe().
+"""
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+from config import settings
+from config.profiles import load_profiles
+from data.bar_store import parse_bar_times
+from strategy.registry import IndicatorCache
+from strategy.rsi_macd import RsiMacdStrategy
+from utils.logger import setup_logger
+
+logger = setup_logger("Screener")
+
+WARMUP_BARS = 500 # Bars before the counted window: EMA start-up effects decay below 1e-15
+MIN_BARS = 35 # Own bars a symbol needs before it can signal (generate_signal's MACD warm-up)
+
+# timeframe: bars of the matrix; times: int64 epoch seconds of the counted rows;
+# signals: bool (rows x codes); current: list of dicts for symbols firing on the
+# last row; frequency: DataFrame of per-symbol signal counts over the rows.
+ScreenResult = namedtuple("ScreenResult", ["timeframe", "times", "codes", "signals", "current", "frequency"])
+
+
+def _time_keys(values):
+    # YYYYMMDDHHMMSS as int64 sorts like the times it encodes; much cheaper than
+    # parsing every symbol's column to datetimes when only the order matters
+    values = np.asarray(values)
+    if values.dtype.kind in "OUS":
+        values = values.astype(str)
+    return values.astype(np.int64)
+
+
+def _labels(times):
+    return list(pd.to_datetime(np.asarray(times), unit='s').strftime("%Y%m%d%H%M%S"))
+
+
+def universe_codes(dm):
+    """Codes with stored bars in dm.data_dir."""
+    return sorted({code for code, _ in dm.stored_files().values()})
+
+
+def build_matrix(frames, rows):
+    """
+    Align the last `rows` bars of each frame ({code: get_ohlcv_frame-layout df}).
+    Returns (times, codes, close, present, before): the row times, the column
+    codes, the close matrix (NaN where a symbol has no bar), the bool matrix
+    of rows where the symbol has its own bar, and each symbol's bar count
+    before the first row.
+    """
+    tails = {code: df.tail(rows) for code, df in frames.items() if df is not None and len(df)}
+    codes = sorted(tails)
+    if not codes:
+        return np.empty(0, dtype=np.int64), [], np.empty((0, 0)), np.empty((0, 0), dtype=bool), np.empty(0, dtype=np.int64)
+    bar_times = [_time_keys(tails[code]['time'].values) for code in codes]
+    keys = np.unique(np.concatenate(bar_times))[-rows:]
+
+    close = np.full((len(keys), len(codes)), np.nan)
+    present = np.zeros(close.shape, dtype=bool)
+    before = np.zeros(len(codes), dtype=np.int64)
+    for j, (code, t) in enumerate(zip(codes, bar_times)):
+        keep = t >= keys[0]
+        index = np.searchsorted(keys, t[keep])
+        close[index, j] = tails[code]['close'].to_numpy(dtype=np.float64)[keep]
+        present[index, j] = True
+        before[j] = len(frames[code]) - int(keep.sum())
+    return parse_bar_times(keys), codes, close, present, before
+
+
+def compact(close, present):
+    """
+    Move each column's own bars (present rows) to the bottom rows, in order,
+    and fill the rows above with its first close. Returns (matrix, rows, cols,
+    slots) such that matrix[slots, cols] == close[rows, cols] for every own bar.
+    """
+    n = close.shape[0]
+    counts = present.sum(axis=0)
+    rows, cols = np.nonzero(present)
+    slots = n - counts[cols] + np.cumsum(present, axis=0)[rows, cols] - 1
+    # Columns without a bar get a constant 0 so the kernels stay on their NaN-free path
+    first = np.where(counts > 0, close[present.argmax(axis=0), np.arange(close.shape[1])], 0.0)
+    matrix = np.broadcast_to(first, close.shape).copy()
+    matrix[slots, cols] = close[rows, cols]
+    return matrix, rows, cols, slots
+
+
+def screen(frames, timeframe, profiles=None, strategy=None, history=None):
+    """
+    Evaluate the strategy's entry rule on every frame of one timeframe at once.
+    frames: {code: DataFrame} of `timeframe` bars (None / empty frames are skipped).
+    strategy: a registered strategy instance (default RsiMacdStrategy).
+    history: bars over which signal frequency is counted (settings.SCREENER_HISTORY_BARS).
+    """
+    profiles = profiles if profiles is not None else load_profiles()
+    strategy = strategy if strategy is not None else RsiMacdStrategy()
+    history = history or settings.SCREENER_HISTORY_BARS
+
+    times, codes, close, present, before = build_matrix(frames, history + WARMUP_BARS)
+    if not codes:
+        return ScreenResult(str(timeframe), times, codes, present, [], pd.DataFrame(
+            columns=['code', 'name', 'bars', 'signals', 'rate', 'last_signal']))
+    thresholds = np.array([profiles.get(code).rsi_oversold for code in codes], dtype=np.float64)
+    # Indicators on each symbol's own bars only, then back onto the aligned rows
+    own, rows, cols, slots = compact(close, present)
+    matrix = {'close': own}
+    cache = strategy.indicators(matrix, IndicatorCache(matrix, backend="array"))
+    own_signals = np.asarray(strategy.entry_signals(cache, thresholds), dtype=bool)
+    signals = np.zeros(present.shape, dtype=bool)
+    signals[rows, cols] = own_signals[slots, cols]
+    signals &= np.cumsum(present, axis=0) + before >= MIN_BARS
+
+    times, signals, present = times[-history:], signals[-history:], present[-history:]
+    last_close = close[-history:]
+    labels = _labels(times)
+
+    current = []
+    if len(times):
+        for j in np.flatnonzero(signals[-1]):
+            code = codes[j]
+            current.append({'code': code, 'name': profiles.get(code).name, 'time': labels[-1],
+                            'close': float(last_close[-1, j]), 'threshold': float(thresholds[j])})
+
+    counts = signals.sum(axis=0)
+    bars = present.sum(axis=0)
+    last_row = len(times) - 1 - np.argmax(signals[::-1], axis=0) if len(times) else np.zeros(len(codes), dtype=int)
+    frequency = pd.DataFrame({
+        'code': codes,
+        'name': [profiles.get(code).name for code in codes],
+        'bars': bars,
+        'signals': counts,
+        'rate': np.where(bars > 0, counts / np.maximum(bars, 1) * 100, 0.0),
+        'last_signal': [labels[i] if n else None for i, n in zip(last_row, counts)],
+    })
+    return ScreenResult(str(timeframe), times, codes, signals, current, frequency)
+
+
+def screen_universe(dm, codes=None, timeframe=None, profiles=None, strategy=None, history=None, workers=None):
+    """
+    Screen stored symbols (default: every symbol with stored bars), grouped by
+    profile timeframe unless `timeframe` forces one. Returns a list of ScreenResult.
+    """
+    profiles = profiles if profiles is not None else load_profiles()
+    codes = codes or universe_codes(dm)
+    groups = defaultdict(list)
+    for code in codes:
+        groups[str(timeframe or profiles.get(code).timeframe)].append(code)
+
+    results = []
+    with ThreadPoolExecutor(max_workers=workers or settings.SCREENER_LOAD_WORKERS) as pool:
+        for tf, group in sorted(groups.items()):
+            frames = dict(zip(group, pool.map(lambda code: dm.load_data(code, tf), group)))
+            missing = [code for code, df in frames.items() if df is None]
+            if missing:
+                logger.warning(f"No {tf}M data for {len(missing)} symbols: {', '.join(missing[:10])}")
+            results.append(screen(frames, tf, profiles, strategy, history))
+    return results
@@ -0,0 +1,115 @@
+import unittest
+import tempfile
+import shutil
+import sys
+import os
+from unittest.mock import MagicMock
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from api.mock_server import MockKiwoomServer
+from api.kiwoom import KiwoomAPI
+from bot.account import AccountService, FEE_RATE
+from bot.trader import TradingBot
+from utils.telegram_bot import TelegramBot
+
+CODES = ["005930", "000660"]
+
+
+class TestAccountService(unittest.TestCase):
+    def setUp(self):
+        self.server = MockKiwoomServer(page_size=100, history_days=5).start()
+        self.account = AccountService(KiwoomAPI(base_url=self.server.base_url), ttl=60)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_cached_within_ttl(self):
+        snapshot = self.account.snapshot()
+        self.assertEqual(snapshot['cash'], 1000000)
+        self.assertEqual(snapshot['holdings'], {})
+        self.account.snapshot()
+        self.assertEqual(self.server.stats['requests.kt00018'], 1)
+        self.account.snapshot(max_age=0)
+        self.assertEqual(self.server.stats['requests.kt00018'], 2)
+
+    def test_optimistic_update_then_reconcile(self):
+        self.account.snapshot()
+        price = self.server.last_price("005930")
+        self.server.broker.fill("BUY", "005930", 10, price)
+        self.account.apply_order("005930", "BUY", 10, price + 100)
+
+        self.assertAlmostEqual(self.account.cash, 1000000 - 10 * (price + 100) * (1 + FEE_RATE))
+        self.assertEqual(self.account.holdings, {"005930": 10})
+
+        self.account.reconcile_async().join()
+        self.assertEqual(self.account.cash, 1000000 - 10 * price) # The broker's figure
+        self.assertEqual(self.account.holdings, {"005930": 10})
+        self.assertEqual(self.server.stats['requests.kt00018'], 2)
+
+    def test_reservation_kept_until_settled(self):
+        self.account.snapshot()
+        price = self.server.last_price("005930")
+        reserve = 10 * (price + 100) * (1 + FEE_RATE)
+        order = {'code': "005930", 'side': "BUY", 'qty': 10, 'est_price': price + 100,
+                 'filled_qty': 0, 'fill_price': None}
+        self.account.apply_order("005930", "BUY", 10, price + 100, order=order)
+        # Still open at the broker: every later fetch keeps it reserved
+        for _ in range(2):
+            self.account.reconcile_async().join()
+            self.assertAlmostEqual(self.account.cash, 1000000 - reserve)
+
+        self.server.broker.fill("BUY", "005930", 10, price)
+        order.update(filled_qty=10, fill_price=price)
+        self.account.settle_order(order)
+        self.assertAlmostEqual(self.account.cash, 1000000 - 10 * price * (1 + FEE_RATE))
+        self.account.reconcile_async().join()
+        self.assertEqual(self.account.cash, 1000000 - 10 * price)
+        self.assertEqual(self.account.holdings, {"005930": 10})
+
+        rejected = dict(order, code="000660", filled_qty=0, fill_price=None)
+        self.account.apply_order("000660", "BUY", 10, price, order=rejected)
+        self.account.release_order(rejected)
+        self.account.reconcile_async().join()
+        self.assertEqual(self.account.cash, 1000000 - 10 * price)
+        self.assertEqual(self.account.holdings, {"005930": 10})
+
+
+class TestTradingCycleAccount(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.mkdtemp()
+        os.chdir(self.dir)
+        self.server = MockKiwoomServer(page_size=200, history_days=5, fill_delay=0.3).start()
+        self.override = settings.BASE_URL_OVERRIDE
+        settings.BASE_URL_OVERRIDE = self.server.base_url
+        self.bot = TradingBot()
+        self.bot.target_stocks = CODES
+        self.bot.telegram = TelegramBot(None, None)
+        self.bot.strategy.generate_signal = MagicMock(return_value={'action': 'BUY', 'reason': "test"})
+
+    def tearDown(self):
+        settings.BASE_URL_OVERRIDE = self.override
+        self.server.stop()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir)
+
+    def test_one_account_query_and_post_order_sizing(self):
+        self.bot.run_cycle()
+        # One account query for the cycle (fills are reported later)
+        self.assertEqual(self.server.stats['requests.kt00018'], 1)
+
+        self.assertTrue(self.bot.order_manager.wait(timeout=10))
+        # Both buys fit: the second was sized on the cash left after the first
+        self.assertEqual(self.server.stats['orders'], 2)
+        self.assertEqual(self.server.stats['orders_rejected'], 0)
+        self.assertEqual(set(self.bot.positions), set(CODES))
+
+        # Background reconcile after the fills
+        self.bot.account._reconciler.join()
+        self.assertEqual(self.bot.account.holdings, self.server.broker.holdings)
+
+
+if __name__ == '__main__':
+    unittest.main()
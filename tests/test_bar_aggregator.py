@@ -0,0 +1,145 @@
+import unittest
+import tempfile
+import shutil
+import time
+import sys
+import os
+from datetime import datetime
+from unittest.mock import MagicMock
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from api.mock_server import MockKiwoomServer, synthetic_bars
+from data.bar_aggregator import BarAggregator, Tick, read_ticks, write_ticks
+from data.bar_store import parse_bar_times
+from data.resample import resample_bars
+from bot.trader import TradingBot
+from utils.telegram_bot import TelegramBot
+
+
+def minute_ticks(code, days=3):
+    """Four ticks per minute bar of a synthetic 1-minute series, in time order."""
+    bars = synthetic_bars(code, "1", days=days, end=datetime(2026, 3, 13))
+    bars = bars.iloc[np.argsort(parse_bar_times(bars['time'].values), kind='stable')].reset_index(drop=True)
+    starts = parse_bar_times(bars['time'].values)
+    ticks = []
+    for t, row in zip(starts, bars.itertuples(index=False)):
+        volume = int(row.volume)
+        for offset, price, qty in ((0, row.open, volume // 2), (15, row.high, 0), (30, row.low, 0),
+                                   (59, row.close, volume - volume // 2)):
+            ticks.append(Tick(code, int(t) + offset, float(price), qty))
+    return bars, ticks
+
+
+class TestBarAggregator(unittest.TestCase):
+    def test_matches_resampled_bars(self):
+        bars, ticks = minute_ticks("005930")
+        closed = []
+        agg = BarAggregator(("30", "60"), on_bar=lambda *event: closed.append(event))
+        agg.replay(ticks)
+        agg.advance(ticks[-1].time + 3600)
+
+        for timeframe in ("30", "60"):
+            expected = resample_bars(bars, timeframe)
+            got = agg.frame("005930", timeframe)
+            self.assertEqual(list(got['time']), [str(t) for t in expected['time']])
+            for column in ('open', 'high', 'low', 'close', 'volume'):
+                np.testing.assert_array_equal(got[column].values, expected[column].values.astype(float))
+            self.assertEqual(sum(1 for _, tf, _ in closed if tf == timeframe), len(expected))
+
+    def test_session_boundaries(self):
+        agg = BarAggregator(("60",), close_delay=2)
+        agg.update("A", datetime(2026, 3, 13, 8, 50), 100, 5) # Pre-open folds into 09:00
+        agg.update("A", datetime(2026, 3, 13, 15, 10), 110, 1)
+        agg.update("A", datetime(2026, 3, 13, 15, 30), 112, 7) # Closing auction
+        agg.update("A", datetime(2026, 3, 13, 16, 0), 999, 1) # After-hours
+        agg.update("A", datetime(2026, 3, 14, 10, 0), 999, 1) # Saturday
+        self.assertEqual(agg.stats['off_session'], 2)
+
+        self.assertEqual(agg.advance(datetime(2026, 3, 13, 15, 30, 1)), 0) # Waits for late prints
+        self.assertEqual(agg.current("A", "60")['close'], 112)
+        self.assertEqual(agg.advance(datetime(2026, 3, 13, 15, 30, 2)), 1)
+        self.assertIsNone(agg.current("A", "60"))
+
+        self.assertEqual(list(agg.frame("A", "60")['time']), ["20260313090000", "20260313150000"])
+        last = agg.frame("A", "60").iloc[-1]
+        self.assertEqual((last['open'], last['high'], last['close'], last['volume']), (110, 112, 112, 8))
+
+        agg.update("A", datetime(2026, 3, 13, 15, 29, 59), 90, 1) # Bar already closed
+        self.assertEqual(agg.stats['late'], 1)
+        self.assertEqual(len(agg.frame("A", "60")), 2)
+
+    def test_replay_file_and_seed(self):
+        bars, ticks = minute_ticks("000660", days=2)
+        history = resample_bars(synthetic_bars("000660", "30", days=30, end=datetime(2026, 3, 1)), "30")
+        directory = tempfile.mkdtemp()
+        try:
+            path = os.path.join(directory, "ticks.csv")
+            write_ticks(path, ticks)
+            agg = BarAggregator(("30", "60"))
+            agg.seed("000660", history, "30")
+            agg.replay(read_ticks(path))
+        finally:
+            shutil.rmtree(directory)
+        agg.advance(ticks[-1].time + 3600)
+        frame = agg.frame("000660", "60")
+        expected = resample_bars(history, "60")
+        self.assertEqual(len(frame), len(expected) + len(resample_bars(bars, "60")))
+        self.assertEqual(list(frame['time'][:len(expected)]), list(expected['time']))
+
+    def test_hundreds_of_symbols(self):
+        codes = [f"{i:06d}" for i in range(300)]
+        base = parse_bar_times(np.array(["20260313090000"]))[0]
+        rng = np.random.default_rng(0)
+        prices = 10000 + rng.integers(-50, 50, size=(400, len(codes))).cumsum(axis=0)
+        agg = BarAggregator(("30", "60"))
+        began = time.perf_counter()
+        for step in range(400): # A tick per symbol every 50 s
+            t = int(base) + step * 50
+            agg.advance(t)
+            for code, price in zip(codes, prices[step]):
+                agg.update(code, t, price, 1)
+        elapsed = time.perf_counter() - began
+        self.assertEqual(agg.stats['ticks'], 400 * len(codes))
+        self.assertLess(elapsed, 10) # ~120k ticks; typically well under a second
+        self.assertEqual(len(agg.frame(codes[-1], "60")), 5) # 09:00 ~ 13:00 closed by 14:32
+
+
+class TestBotOnBars(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.mkdtemp()
+        os.chdir(self.dir)
+        self.server = MockKiwoomServer(page_size=200, history_days=5).start()
+        self.override = settings.BASE_URL_OVERRIDE
+        settings.BASE_URL_OVERRIDE = self.server.base_url
+
+    def tearDown(self):
+        self.bot.order_manager.shutdown()
+        settings.BASE_URL_OVERRIDE = self.override
+        self.server.stop()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir)
+
+    def test_signal_on_bar_close_without_chart_download(self):
+        bars, ticks = minute_ticks("005930", days=2)
+        agg = BarAggregator(("30", "60"))
+        self.bot = TradingBot(bars=agg)
+        self.bot.telegram = TelegramBot(None, None)
+        self.bot.target_stocks = ["005930"]
+        self.bot.strategy.generate_signal = MagicMock(return_value={'action': 'HOLD', 'reason': "test"})
+        agg.on_bar = self.bot.on_bar_close
+
+        agg.replay(ticks)
+        calls = self.bot.strategy.generate_signal.call_args_list
+        timeframe = self.bot.profiles.get("005930").timeframe
+        self.assertEqual(len(calls), len(resample_bars(bars, timeframe)) - 1) # The last bar is still open
+        self.assertEqual(len(calls[-1].args[0]), len(calls))
+        self.assertEqual(self.server.stats['requests.ka10080'], 0)
+        self.assertEqual(self.server.stats['requests.kt00018'], 1) # Cached across the bars
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.bar_store import BarStore
+from strategy.rsi_macd import RsiMacdStrategy
+
+
+def make_bars(n=200):
+    times = pd.date_range(start='2025-01-06 09:00', periods=n, freq='h')
+    close = 10000 + np.cumsum(np.random.RandomState(1).randint(-50, 51, n))
+    df = pd.DataFrame({
+        'time': times.strftime("%Y%m%d%H%M%S").astype(int),
+        'open': close - 10, 'high': close + 20, 'low': close - 30, 'close': close,
+        'volume': np.arange(n) * 1000,
+    })
+    return RsiMacdStrategy().calculate_indicators(df)
+
+
+class TestBarStore(unittest.TestCase):
+    def test_round_trip(self):
+        df = make_bars()
+        store = BarStore.from_frame(df, code="005930")
+
+        self.assertEqual(len(store), len(df))
+        self.assertEqual(store['close'].dtype, np.int32)
+        self.assertEqual(store['rsi'].dtype, np.float32)
+        self.assertEqual(store['time'].dtype, np.int64)
+
+        frame = store.to_frame()
+        np.testing.assert_array_equal(frame['close'].values, df['close'].values)
+        np.testing.assert_allclose(frame['macd'].values, df['macd'].values, rtol=1e-5)
+        self.assertEqual(frame['time'].iloc[0], pd.Timestamp('2025-01-06 09:00'))
+
+    def test_memory_smaller_than_frame(self):
+        df = make_bars()
+        df['time'] = df['time'].astype(str)
+        report = BarStore.from_frame(df).memory_report(df)
+        self.assertLess(report['store_bytes'], report['frame_bytes'])
+
+    def test_fractional_prices_rejected(self):
+        df = make_bars(10)
+        df['close'] = df['close'] + 0.5
+        with self.assertRaises(ValueError):
+            BarStore.from_frame(df)
+
+    def test_shared_memory_attach(self):
+        store = BarStore.from_frame(make_bars(), code="014710")
+        handle = store.to_shared()
+        try:
+            view = BarStore.attach(handle)
+            np.testing.assert_array_equal(view['close'], store['close'])
+            self.assertTrue(view.is_shared)
+            view.close()
+        finally:
+            store.unlink()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,37 @@
+import unittest
+import itertools
+import logging
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester.engine import BacktestEngine
+from backtester.batch_engine import BatchBacktestEngine
+from strategy.rsi_macd import RsiMacdStrategy
+from tests.test_exit_scan import make_hourly_bars
+
+logging.getLogger("Backtester").setLevel(logging.WARNING)
+logging.getLogger("BatchBacktester").setLevel(logging.WARNING)
+
+
+class TestBatchBacktestEngine(unittest.TestCase):
+    def test_matches_individual_runs(self):
+        df = make_hourly_bars()
+        param_sets = [dict(rsi_oversold=rsi, stop_loss_pct=sl, min_profit_yield=mp, max_hold_days=hold)
+                      for rsi, sl, mp, hold in itertools.product([40, 55, 70], [-5.0, -1.5], [0.0, 3.0], [1, 5])]
+        param_sets.append({}) # All defaults (threshold from the RSI map)
+
+        batch = BatchBacktestEngine(RsiMacdStrategy(), param_sets)
+        results = batch.run(df, "005930")
+
+        for k, params in enumerate(param_sets):
+            engine = BacktestEngine(RsiMacdStrategy(), **params)
+            expected = engine.run(df, "005930", save_results=False)
+            self.assertEqual(results[k], expected, params)
+            self.assertEqual(batch.trades[k], engine.trades, params)
+            self.assertEqual(batch.get_params(k), engine.get_params())
+
+
+if __name__ == '__main__':
+    unittest.main()
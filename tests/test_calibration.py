@@ -0,0 +1,116 @@
+import unittest
+import logging
+import tempfile
+import shutil
+import sys
+import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.profiles import ProfileRegistry, settings_defaults
+from api.mock_server import synthetic_bars
+from backtester.calibration import GRID_FIELDS, grid_sets, plateau, select, run_calibration
+from data.data_manager import DataManager
+
+logging.getLogger("BatchBacktester").setLevel(logging.WARNING)
+logging.getLogger("Calibration").setLevel(logging.WARNING)
+
+END = datetime(2026, 3, 13)
+CODES = ["005930", "000660", "014710"]
+GRID = {'rsi_oversold': [40, 50, 60], 'stop_loss_pct': [-5.0, -3.0], 'take_profit_pct': [6.0, 12.0],
+        'max_hold_days': [5]}
+
+
+def metrics(is_return, trades=10, oos_trades=5, oos_return=1.0):
+    n = len(is_return)
+    return {'return': list(is_return), 'trades': [trades + oos_trades] * n, 'is_return': list(is_return),
+            'is_trades': [trades] * n, 'oos_return': [oos_return] * n, 'oos_trades': [oos_trades] * n}
+
+
+class TestSelection(unittest.TestCase):
+    def test_plateau_beats_spike(self):
+        grid = {'rsi_oversold': [30, 35, 40, 45, 50, 55, 60], 'stop_loss_pct': [-3.0], 'take_profit_pct': [6.0],
+                'max_hold_days': [5]}
+        # A lone spike at 30 next to losses, a plateau around 50
+        returns = [80, -20, -10, 20, 25, 22, -5]
+        choice = select({"60": metrics(returns)}, grid, min_trades=5, min_oos_trades=1)
+        self.assertEqual(choice['params']['rsi_oversold'], 50)
+        self.assertEqual(choice['score'], 21)
+        np.testing.assert_array_equal(plateau(returns, (7, 1, 1, 1)), [-20, -20, -10, 7.5, 21, 10, -5])
+        np.testing.assert_array_equal(plateau([3.0], (1, 1, 1, 1)), [3.0])
+
+    def test_filters(self):
+        values = [10, 12, 11, 9, 10, 12, 11, 9, 10, 12, 11, 9]
+        self.assertIsNone(select({"60": metrics(values, trades=2)}, GRID, min_trades=5, min_oos_trades=1))
+        self.assertIsNone(select({"60": metrics(values, oos_return=-1.0)}, GRID, min_trades=5, min_oos_trades=1))
+        self.assertIsNone(select({"60": metrics([-v for v in values])}, GRID, min_trades=5, min_oos_trades=1))
+        # The better timeframe wins
+        choice = select({"60": metrics(values), "30": metrics([v * 2 for v in values])}, GRID,
+                        min_trades=5, min_oos_trades=1)
+        self.assertEqual(choice['timeframe'], "30")
+        self.assertEqual(set(choice['params']), set(GRID_FIELDS))
+
+
+class TestCalibrationRun(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.mkdtemp()
+        os.chdir(self.dir)
+        self.dm = DataManager(use_api=False)
+        for code in CODES:
+            synthetic_bars(code, "30", days=730, end=END).to_csv(self.dm._get_filename(code, "30"), index=False)
+        symbols = {code: {'name': f"S{code}", 'target': True} for code in CODES}
+        self.profiles = ProfileRegistry(settings_defaults(), symbols)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir)
+
+    def calibrate(self):
+        return run_calibration(CODES + ["999999"], grid=GRID, directory="calibration", workers=2,
+                               profiles=self.profiles)
+
+    def test_writes_loadable_versions(self):
+        first = self.calibrate()
+        self.assertEqual(first['version'], 1)
+        self.assertEqual(first['missing'], ["999999"])
+        self.assertEqual(sorted(first['calibrated'] + first['kept']), sorted(CODES))
+        self.assertTrue(first['calibrated'])
+
+        registry = ProfileRegistry.from_toml(os.path.join("calibration", "profiles.toml"))
+        for code in first['calibrated']:
+            choice = first['selections'][code]
+            profile = registry.get(code)
+            self.assertEqual(profile.timeframe, choice['timeframe'])
+            self.assertEqual({f: getattr(profile, f) for f in GRID_FIELDS}, choice['params'])
+            self.assertIn(choice['params'], grid_sets(GRID))
+
+        # Unchanged bars: every grid from the cache, nothing new published
+        second = self.calibrate()
+        self.assertEqual(second['cached'], 2 * len(CODES))
+        self.assertFalse(second['changed'])
+        self.assertEqual(second['version'], 1)
+
+        # Changed bars for one symbol: only its grids are walked again
+        path = self.dm._get_filename(CODES[0], "30")
+        df = pd.read_csv(path)
+        df.iloc[:-40].to_csv(path, index=False)
+        third = self.calibrate()
+        self.assertEqual(third['cached'], 2 * (len(CODES) - 1))
+        if third['changed']:
+            self.assertEqual(third['version'], 2)
+            self.assertTrue(os.path.exists(os.path.join("calibration", "profiles_v0001.toml")))
+
+        # A partial run keeps the other symbols' calibrated profiles
+        before = ProfileRegistry.from_toml(os.path.join("calibration", "profiles.toml"))
+        run_calibration(CODES[:1], grid=GRID, directory="calibration", workers=1, profiles=self.profiles)
+        after = ProfileRegistry.from_toml(os.path.join("calibration", "profiles.toml"))
+        for code in CODES[1:]:
+            self.assertEqual(after.get(code), before.get(code))
+
+
+if __name__ == '__main__':
+    unittest.main()
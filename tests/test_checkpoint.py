@@ -0,0 +1,161 @@
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+import logging
+import argparse
+from datetime import datetime
+from unittest.mock import patch
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester.checkpoint import OptimizationCheckpoint, BacktestStateStore, param_hash
+from backtester.engine import BacktestEngine
+from backtester.batch_engine import BatchBacktestEngine
+from api.mock_server import synthetic_bars
+from data.data_manager import DataManager
+from strategy.rsi_macd import RsiMacdStrategy
+from tests.test_exit_scan import make_hourly_bars
+
+logging.getLogger("Backtester").setLevel(logging.WARNING)
+logging.getLogger("BatchBacktester").setLevel(logging.WARNING)
+
+
+class TestOptimizationCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_param_hash_is_order_independent(self):
+        self.assertEqual(param_hash({'sl': -2.5, 'tp': 10.0}), param_hash({'tp': 10.0, 'sl': -2.5}))
+        self.assertNotEqual(param_hash({'sl': -2.5}), param_hash({'sl': -3.0}))
+
+    def test_record_and_reload(self):
+        cp = OptimizationCheckpoint("rsi_005930_abc_1", self.dir)
+        cp.record({'rsi': 40}, {'param': 40, 'return': 12.5, 'trades': np.int64(3)})
+        self.assertTrue(cp.is_done({'rsi': 40}))
+        self.assertFalse(cp.is_done({'rsi': 42}))
+
+        reloaded = OptimizationCheckpoint("rsi_005930_abc_1", self.dir)
+        self.assertEqual(len(reloaded), 1)
+        self.assertEqual(reloaded.get({'rsi': 40})['trades'], 3)
+
+    def test_truncated_line_is_skipped(self):
+        cp = OptimizationCheckpoint("run", self.dir)
+        cp.record({'rsi': 40}, {'return': 1.0})
+        with open(cp.path, "a") as f:
+            f.write('{"run_id": "run", "hash"')
+        self.assertEqual(len(OptimizationCheckpoint("run", self.dir)), 1)
+
+    def test_find_latest(self):
+        key = OptimizationCheckpoint.grid_key("pnl", "005930", {'sl': [-5, -1, 0.5]}, "100:a:b")
+        self.assertIsNone(OptimizationCheckpoint.find_latest(key, self.dir))
+        OptimizationCheckpoint(f"{key}_20260101_090000", self.dir).record({'sl': -5}, {})
+        OptimizationCheckpoint(f"{key}_20260102_090000", self.dir).record({'sl': -5}, {})
+        latest = OptimizationCheckpoint.find_latest(key, self.dir)
+        self.assertEqual(latest.run_id, f"{key}_20260102_090000")
+
+        other = OptimizationCheckpoint.grid_key("pnl", "005930", {'sl': [-5, -1, 0.5]}, "101:a:c")
+        self.assertNotEqual(key, other)
+        # Same ranges and data under another profile: its points do not apply
+        profile = OptimizationCheckpoint.grid_key("pnl", "005930", {'sl': [-5, -1, 0.5]}, "100:a:b",
+                                                  {'profile': {'rsi_oversold': 45.0}})
+        self.assertNotEqual(key, profile)
+
+
+class TestInterruptedSweep(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.mkdtemp()
+        os.chdir(self.dir) # Checkpoints and the results DB live under backtest_results/
+        dm = DataManager(use_api=False)
+        synthetic_bars("005930", "30", days=90, end=datetime(2026, 3, 13)).to_csv(dm._get_filename("005930", "30"), index=False)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir)
+
+    def sweep(self, interrupt_at=None):
+        import main
+        args = argparse.Namespace(min_rsi=30, max_rsi=50, step_rsi=2, run_id=None, new_run=False, resume=True)
+        walked = []
+        run = BatchBacktestEngine.run
+
+        def walk(engine, *a, **kw):
+            walked.append(len(engine.param_sets))
+            if len(walked) == interrupt_at:
+                raise KeyboardInterrupt
+            return run(engine, *a, **kw)
+
+        with patch.object(main.settings, 'OPTIMIZE_BATCH_SIZE', 4), patch.object(BatchBacktestEngine, 'run', walk):
+            main.run_rsi_optimize("005930", args)
+        return walked
+
+    def test_completed_batches_survive_an_interrupt(self):
+        with self.assertRaises(KeyboardInterrupt):
+            self.sweep(interrupt_at=2)
+        # The first batch of 4 thresholds was checkpointed; only the other 7 are walked again
+        self.assertEqual(self.sweep(), [4, 3])
+        self.assertEqual(self.sweep(), [])
+
+
+class TestIncrementalBacktest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.mkdtemp()
+        os.chdir(self.dir) # run() creates backtest_results/
+        self.store = BacktestStateStore(os.path.join(self.dir, "state"))
+        self.df = make_hourly_bars(n=2000)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir)
+
+    def run_engine(self, df, store=None):
+        engine = BacktestEngine(RsiMacdStrategy(), rsi_oversold=55)
+        return engine.run(df, "005930", save_results=False, state_store=store), engine.trades
+
+    def test_daily_increments_match_full_run(self):
+        expected, expected_trades = self.run_engine(self.df)
+        self.assertGreater(len(expected_trades), 5)
+
+        self.run_engine(self.df.iloc[:1500], self.store)
+        walked = []
+        original = BacktestEngine._check_entry_conditions
+        def count(engine, row, pos, current_time):
+            walked.append(row['time'])
+            return original(engine, row, pos, current_time)
+        with patch.object(BacktestEngine, '_check_entry_conditions', count):
+            for end in list(range(1507, 2000, 7)) + [2000]: # One session of new bars per run
+                result, trades = self.run_engine(self.df.iloc[:end], self.store)
+        # Only the new bars were walked (entry checks run on bars without a position)
+        self.assertLessEqual(len(walked), 500)
+        self.assertEqual(len(set(walked)), len(walked))
+        self.assertEqual(result, expected)
+        self.assertEqual(trades, expected_trades)
+
+    def test_changed_history_runs_in_full(self):
+        self.run_engine(self.df.iloc[:1500], self.store)
+        edited = self.df.copy()
+        edited.loc[100, 'close'] += 500 # A corrected bar in the stored history
+        expected, _ = self.run_engine(edited)
+        with patch.object(BacktestEngine, '_restore_state') as restore:
+            result, _ = self.run_engine(edited, self.store)
+        restore.assert_not_called()
+        self.assertEqual(result, expected)
+
+    def test_state_is_per_parameter_set(self):
+        self.run_engine(self.df.iloc[:1500], self.store)
+        other = BacktestEngine(RsiMacdStrategy(), rsi_oversold=40)
+        with patch.object(BacktestEngine, '_restore_state') as restore:
+            other.run(self.df, "005930", save_results=False, state_store=self.store)
+        restore.assert_not_called()
+        self.assertEqual(len(os.listdir(self.store.directory)), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+import unittest
+import tempfile
+import shutil
+import time
+import sys
+import os
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.data_index import DataIndex, scan_bars, last_trading_day
+from data.data_manager import DataManager
+from tests.test_resample import make_30m_bars
+
+
+class TestScanBars(unittest.TestCase):
+    def test_complete_series(self):
+        entry = scan_bars(make_30m_bars(5), "30")
+        self.assertEqual(entry['sessions'], 5)
+        self.assertEqual(entry['expected_bars'], 5 * 13)
+        self.assertEqual(entry['missing_bars'], 0)
+        self.assertEqual(entry['gaps'], [])
+        self.assertEqual(entry['start'], "20250304090000")
+
+    def test_gaps_bad_rows_and_duplicates(self):
+        df = make_30m_bars(5)
+        # Two bars missing on the 2nd session, the 3rd session entirely missing
+        df = df.drop(index=[15, 16] + list(range(26, 39))).reset_index(drop=True)
+        df = pd.concat([df, df.iloc[[0]]], ignore_index=True)
+        df['time'] = df['time'].astype(object)
+        df.loc[1, 'time'] = "garbage"
+        entry = scan_bars(df, "30")
+
+        self.assertEqual(entry['bad_times'], 1)
+        self.assertEqual(entry['duplicates'], 1)
+        self.assertEqual(entry['sessions'], 5)
+        self.assertEqual(entry['gap_sessions'], 3)
+        self.assertEqual(entry['missing_bars'], 1 + 2 + 13)
+        self.assertEqual(entry['gaps'][1], {'date': "2025-03-05", 'expected': 13, 'actual': 11})
+        self.assertEqual(entry['gaps'][2], {'date': "2025-03-06", 'expected': 13, 'actual': 0})
+
+    def test_partial_last_session_is_not_a_gap(self):
+        df = make_30m_bars(2).iloc[:-5]
+        entry = scan_bars(df, "30")
+        self.assertEqual(entry['missing_bars'], 0)
+        self.assertEqual(entry['expected_bars'], 13 + 8)
+
+    def test_hourly(self):
+        df = make_30m_bars(2)
+        df = df[df['time'] % 10000 == 0] # 09:00, 10:00, ..., 15:00
+        entry = scan_bars(df, "60")
+        self.assertEqual(entry['expected_bars'], 14)
+        self.assertEqual(entry['missing_bars'], 0)
+
+
+class TestDataIndex(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.mkdtemp()
+        os.chdir(self.dir)
+        self.dm = DataManager(use_api=False)
+        self.file = self.dm._get_filename("005930", "30")
+        make_30m_bars(5).to_csv(self.file, index=False)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir)
+
+    def test_incremental_rebuild_and_persistence(self):
+        files = self.dm.stored_files()
+        self.assertEqual(files, {self.file: ("005930", "30")})
+        self.assertEqual(self.dm.index.rebuild(files), 1)
+        self.assertEqual(self.dm.index.rebuild(files), 0)
+
+        # Reloaded from disk, still current
+        index = DataIndex(self.dm.data_dir)
+        self.assertTrue(index.is_current(self.file))
+        self.assertEqual(index.get(self.file)['rows'], 5 * 13)
+
+        time.sleep(0.01)
+        make_30m_bars(3).to_csv(self.file, index=False)
+        self.assertFalse(index.is_current(self.file))
+        self.assertEqual(index.rebuild(files), 1)
+        self.assertEqual(index.get(self.file)['rows'], 3 * 13)
+
+    def test_needs_refetch(self):
+        self.dm.index.rebuild(self.dm.stored_files())
+        as_of = "2025-03-10" # Monday after the stored sessions (Tue 03-04 ~ Mon 03-10)
+        self.assertEqual(self.dm.needs_refetch(["005930"], "30", as_of=as_of), {})
+
+        problems = self.dm.needs_refetch(["005930", "000660"], "30", as_of="2025-03-12")
+        self.assertEqual(problems["000660"], ["missing"])
+        self.assertTrue(problems["005930"][0].startswith("stale"))
+
+    def test_last_trading_day(self):
+        self.assertEqual(last_trading_day("2025-03-09").strftime("%Y-%m-%d"), "2025-03-07") # Sunday -> Friday
+        self.assertEqual(last_trading_day("2025-03-03").strftime("%Y-%m-%d"), "2025-02-28") # Holiday Monday
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+import tempfile
+import shutil
+import subprocess
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.data_manager import DataManager
+from tests.test_resample import make_30m_bars
+
+
+class TestDerivedTimeframes(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.mkdtemp()
+        os.chdir(self.dir)
+        self.dm = DataManager(use_api=False)
+        self.base_file = self.dm._get_filename("005930", "30")
+        make_30m_bars(5).to_csv(self.base_file, index=False)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir)
+
+    def test_resampled_and_cached(self):
+        df = self.dm.load_data("005930", "60")
+        self.assertEqual(len(df), 5 * 7)
+        cached = self.dm._get_derived_filename("005930", "60")
+        self.assertTrue(os.path.exists(cached))
+        # No separate 1H download is needed or written
+        self.assertFalse(os.path.exists(self.dm._get_filename("005930", "60")))
+
+        self.assertEqual(len(self.dm.load_data("005930", "D")), 5)
+        self.assertEqual(len(self.dm.load_data("005930", "30")), 5 * 13)
+
+    def test_cache_invalidated_when_base_changes(self):
+        self.assertEqual(len(self.dm.load_data("005930", "60")), 5 * 7)
+        make_30m_bars(2).to_csv(self.base_file, index=False)
+        self.assertEqual(len(self.dm.load_data("005930", "60")), 2 * 7)
+
+    def test_legacy_file_without_base(self):
+        os.remove(self.base_file)
+        make_30m_bars(1).to_csv(self.dm._get_filename("005930", "60"), index=False)
+        self.assertEqual(len(self.dm.load_data("005930", "60")), 13)
+
+    def test_longer_legacy_file_kept(self):
+        # Years of legacy 1H bars next to a recent, shorter 30M download
+        legacy = make_30m_bars(20).iloc[::2]
+        legacy.to_csv(self.dm._get_filename("005930", "60"), index=False)
+        self.assertEqual(len(self.dm.load_data("005930", "60", prefer_legacy=True)), len(legacy))
+        # Timeframe comparisons always get the period the base bars cover
+        self.assertEqual(len(self.dm.load_data("005930", "60")), 5 * 7)
+        # Once the base download reaches as far back, the resampled bars win
+        make_30m_bars(20).to_csv(self.base_file, index=False)
+        self.assertEqual(len(self.dm.load_data("005930", "60", prefer_legacy=True)), 20 * 7)
+
+
+class TestOfflineImports(unittest.TestCase):
+    def test_offline_paths_skip_broker_modules(self):
+        code = ("import sys, main; from backtester.batch_engine import BatchBacktestEngine; "
+                "from data.data_manager import DataManager; DataManager(use_api=False); "
+                "print(sorted(m for m in sys.modules if m.startswith(('kiwoom_rest_api', 'httpx', 'requests'))))")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=root)
+        self.assertEqual(out.stdout.strip().splitlines()[-1], "[]")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,46 @@
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.dataset_registry import DatasetRegistry, open_dataset, open_frame
+from tests.test_bar_store import make_bars
+
+
+def close_sum(handle):
+    return int(open_dataset(handle)['close'].sum())
+
+
+class TestDatasetRegistry(unittest.TestCase):
+    def check_backend(self, backend):
+        df = make_bars()
+        with DatasetRegistry(backend=backend) as registry:
+            handle = registry.publish("005930", df)
+            self.assertIs(registry.publish("005930", df), handle)
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                sums = list(pool.map(close_sum, [handle] * 3))
+        self.assertEqual(sums, [int(df['close'].sum())] * 3)
+
+    def test_shared_memory_backend(self):
+        self.check_backend("shm")
+
+    def test_mmap_backend(self):
+        self.check_backend("mmap")
+
+    def test_frame_built_once_per_process(self):
+        df = make_bars()
+        with DatasetRegistry(backend="mmap") as registry:
+            handle = registry.publish("005930", df)
+            frame = open_frame(handle)
+            self.assertIs(open_frame(handle), frame)
+            self.assertEqual(int(frame['close'].sum()), int(df['close'].sum()))
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            DatasetRegistry(backend="redis")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,58 @@
+import unittest
+import itertools
+import logging
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester.engine import BacktestEngine
+from backtester.exit_scan import ExitScanner, EXIT_STOP_LOSS, EXIT_NONE
+from strategy.rsi_macd import RsiMacdStrategy
+
+logging.getLogger("Backtester").setLevel(logging.WARNING)
+
+
+def make_hourly_bars(n=1200, seed=0):
+    # 7 hourly bars per business day, 09:00 ~ 15:00, across the 2025 holidays
+    days = pd.bdate_range('2025-01-02', periods=n // 7 + 1)
+    times = [d + pd.Timedelta(hours=h) for d in days for h in range(9, 16)][:n]
+    rs = np.random.RandomState(seed)
+    close = np.maximum(1000, 10000 + np.cumsum(rs.randint(-150, 151, n)))
+    return pd.DataFrame({
+        'time': [t.strftime("%Y%m%d%H%M%S") for t in times],
+        'open': close, 'high': close + 50, 'low': close - 50, 'close': close,
+        'volume': rs.randint(1, 1000, n)
+    })
+
+
+class TestExitScanner(unittest.TestCase):
+    def test_run_fast_matches_run(self):
+        df = make_hourly_bars()
+        scanner = BacktestEngine(RsiMacdStrategy()).prepare_scanner(df, "005930")
+        for sl, tp, hold, min_profit, rsi in itertools.product([-5.0, -1.5], [4.0, 12.0], [1, 5], [0.0, 3.0], [45, 70]):
+            params = dict(rsi_oversold=rsi, stop_loss_pct=sl, take_profit_pct=tp, max_hold_days=hold, min_profit_yield=min_profit)
+            slow = BacktestEngine(RsiMacdStrategy(), **params)
+            fast = BacktestEngine(RsiMacdStrategy(), **params)
+            res_slow = slow.run(df, "005930", save_results=False)
+            res_fast = fast.run_fast(df, "005930", save_results=False, scanner=scanner)
+            self.assertEqual(slow.trades, fast.trades, params)
+            self.assertEqual(res_slow, res_fast, params)
+
+    def test_first_exit_reasons(self):
+        df = make_hourly_bars(100)
+        df_ind = RsiMacdStrategy().calculate_indicators(df.copy())
+        df_ind['close'] = 10000.0
+        df_ind.loc[10, 'close'] = 9000.0 # -10% on bar 10
+        scanner = ExitScanner(df_ind)
+        exit_idx, reasons = scanner.first_exits(np.array([5, 95]), -5.0, 12.0, 5, 10, 3.0)
+        self.assertEqual(exit_idx[0], 10)
+        self.assertEqual(reasons[0], EXIT_STOP_LOSS)
+        self.assertEqual(exit_idx[1], 99)
+        self.assertEqual(reasons[1], EXIT_NONE)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from strategy import indicators
+from strategy.rsi_macd import RsiMacdStrategy
+
+
+def make_close(n=3000, seed=1):
+    rng = np.random.default_rng(seed)
+    close = np.round(10000 + np.cumsum(rng.normal(0, 30, n)), -1)
+    close[500:540] = close[500] # Flat stretch: zero gains and losses
+    return close
+
+
+class TestIndicators(unittest.TestCase):
+    def test_matches_pandas_backend(self):
+        # Tick prices (exact cumulative-sum path) and fractional prices
+        for close in (make_close(), make_close() / 7.0):
+            df = pd.DataFrame({'close': close})
+            expected = RsiMacdStrategy(backend="pandas").calculate_indicators(df.copy())
+            actual = RsiMacdStrategy(backend="array").calculate_indicators(df.copy())
+
+            for col in ['rsi', 'macd', 'signal', 'histogram']:
+                np.testing.assert_array_equal(np.isnan(expected[col].values), np.isnan(actual[col].values))
+                np.testing.assert_allclose(actual[col].values, expected[col].values, rtol=0, atol=1e-9)
+
+    def test_high_priced_symbols_match_pandas(self):
+        # 1,000,000 KRW and up: pandas' own rounding is about 1e-9 here
+        for close in (make_close() * 100, make_close(seed=5) * 500):
+            df = pd.DataFrame({'close': close})
+            expected = RsiMacdStrategy(backend="pandas").calculate_indicators(df.copy())
+            actual = RsiMacdStrategy(backend="array").calculate_indicators(df.copy())
+            for col in ['rsi', 'macd', 'signal', 'histogram']:
+                np.testing.assert_allclose(actual[col].values, expected[col].values, rtol=0, atol=1e-9)
+
+        matrix = np.column_stack([make_close(seed=s) * 100 for s in range(3)])
+        expected = pd.DataFrame(matrix).ewm(span=26, adjust=False).mean().values
+        np.testing.assert_allclose(indicators.ema(matrix, 26), expected, rtol=0, atol=1e-9)
+
+    def test_blocked_ema_matches_recursion(self):
+        close = make_close()
+        for span in (1, 2, 9, 26, 200):
+            expected = pd.Series(close).ewm(span=span, adjust=False).mean().values
+            np.testing.assert_allclose(indicators._ema_blocked(close, 2.0 / (span + 1)), expected, rtol=0, atol=1e-9)
+            # Filtered relative to each block's base: the error does not grow with an offset
+            shifted = indicators._ema_blocked(close + 990000.0, 2.0 / (span + 1)) - 990000.0
+            np.testing.assert_allclose(shifted, expected, rtol=0, atol=1e-9)
+
+    def test_ema_missing_values_match_pandas(self):
+        close = make_close(n=600)
+        close[:3] = np.nan # Leading gap
+        close[100] = np.nan # Single missing bar
+        close[300:320] = np.nan # Halt
+        other = make_close(n=600, seed=2)
+        other[450:] = np.nan # Trailing gap
+        matrix = np.column_stack([close, other, make_close(n=600, seed=3)])
+        for span in (2, 9, 26):
+            expected = pd.DataFrame(matrix).ewm(span=span, adjust=False).mean().values
+            actual = indicators.ema(matrix, span)
+            np.testing.assert_array_equal(np.isnan(actual), np.isnan(expected))
+            np.testing.assert_allclose(actual, expected, rtol=0, atol=1e-9)
+            np.testing.assert_allclose(indicators.ema(close, span), expected[:, 0], rtol=0, atol=1e-9)
+
+    def test_batch_symbols_and_periods(self):
+        matrix = np.column_stack([make_close(seed=s) for s in range(3)])
+        macd, _, _ = indicators.macd(matrix)
+        rsi = indicators.rsi(matrix, 14)
+        for i in range(3):
+            single_macd, _, _ = indicators.macd(matrix[:, i])
+            np.testing.assert_allclose(macd[:, i], single_macd, atol=1e-9)
+            np.testing.assert_allclose(rsi[:, i], indicators.rsi(matrix[:, i], 14), atol=1e-9)
+
+        close = matrix[:, 0]
+        by_period = indicators.rsi(close, [5, 14])
+        self.assertEqual(by_period.shape, (len(close), 2))
+        np.testing.assert_allclose(by_period[:, 1], indicators.rsi(close, 14), atol=1e-9)
+
+
+if __name__ == '__main__':
+    unittest.main()
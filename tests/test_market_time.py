@@ -1,6 +1,6 @@
 import unittest
 from datetime import datetime
-from utils.market_time import get_trading_days_diff
+from utils.market_time import get_trading_days_diff, trading_day_ordinals
 
 class TestMarketTime(unittest.TestCase):
     def test_normal_days(self):
@@ -40,5 +40,14 @@ class TestMarketTime(unittest.TestCase):
         end_holiday = datetime(2025, 1, 29)
         self.assertEqual(get_trading_days_diff(start, end_holiday), 0)
 
+    def test_ordinals_match_diff(self):
+        # Ordinal differences must agree with get_trading_days_diff (incl. Lunar New Year 2025)
+        dates = [datetime(2025, 1, 24), datetime(2025, 1, 25), datetime(2025, 1, 29),
+                 datetime(2025, 1, 30), datetime(2025, 2, 3)]
+        ordinals = trading_day_ordinals(dates)
+        for i in range(len(dates)):
+            for j in range(i, len(dates)):
+                self.assertEqual(ordinals[j] - ordinals[i], get_trading_days_diff(dates[i], dates[j]))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.mock_server import MockKiwoomServer, synthetic_bars
+from api.kiwoom import KiwoomAPI, _parse_page_values
+
+
+class TestMockKiwoomServer(unittest.TestCase):
+    def setUp(self):
+        self.server = MockKiwoomServer(page_size=40, history_days=20).start()
+        self.api = KiwoomAPI(base_url=self.server.base_url)
+
+    def tearDown(self):
+        self.server.stop()
+
+    def test_ohlcv_pagination(self):
+        expected = synthetic_bars("005930", "60", days=20)
+        data = self.api.get_ohlcv("005930", "60", days=30)
+
+        self.assertEqual(len(data), len(expected))
+        self.assertEqual([row['time'] for row in data], list(expected['time']))
+        self.assertEqual([row['close'] for row in data], list(expected['close'].astype(int)))
+        pages = -(-len(expected) // 40)
+        self.assertEqual(self.server.stats['requests.ka10080'], pages)
+
+    def test_ohlcv_stops_at_target_date(self):
+        self.server.history_days = 400
+        self.server.page_size = 130
+        frame = self.api.get_ohlcv_frame("000660", "30", days=3)
+        # One page (10 sessions of 30M bars) already reaches past 3 days
+        self.assertEqual(self.server.stats['requests.ka10080'], 1)
+        self.assertEqual(len(frame), 130)
+        self.assertTrue(frame['time'].is_monotonic_increasing)
+        self.assertEqual(frame['close'].dtype, 'int64')
+
+    def test_parse_page_skips_malformed_rows(self):
+        items = [
+            {'cntr_tm': "20250304100000", 'open_pric': "+100", 'high_pric': "+110", 'low_pric': "+90", 'cur_prc': "-105", 'trde_qty': "7"},
+            {'cntr_tm': "20250304090000", 'open_pric': "abc", 'cur_prc': "100"},
+            {'stck_bsop_date': "20250303", 'stck_cntg_hour': "150000", 'stck_oprc': "95", 'stck_prpr': "96"},
+        ]
+        values, valid = _parse_page_values(items)
+        self.assertEqual(valid.tolist(), [True, False, True])
+        self.assertEqual(values[0].tolist(), [100, 110, 90, 105, 7])
+        self.assertEqual(values[2].tolist(), [95, 0, 0, 96, 0])
+
+    def test_orders_update_holdings(self):
+        self.assertEqual(self.api.get_holdings(), {})
+        self.assertEqual(self.api.get_balance(), 1000000)
+
+        self.assertIsNotNone(self.api.place_order("005930", 3, "BUY"))
+        self.assertEqual(self.api.get_holdings(), {"005930": 3})
+        self.assertIsNotNone(self.api.place_order("005930", 3, "SELL"))
+        self.assertEqual(self.api.get_holdings(), {})
+        # Selling what is not held is rejected
+        self.assertIsNone(self.api.place_order("005930", 1, "SELL"))
+
+    def test_rate_limit(self):
+        self.server.rate_limit = 2
+        self.server.rate_limit_status = 200
+        results = [self.api.get_balance() for _ in range(4)]
+        self.assertIsNone(results[-1])
+        self.assertGreater(self.server.stats['rate_limited'], 0)
+
+    def test_error_injection(self):
+        self.server.error_rate = 1.0
+        self.assertIsNone(self.api.get_ohlcv("005930", "60", days=30))
+        self.assertGreater(self.server.stats['errors'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
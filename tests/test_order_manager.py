@@ -0,0 +1,89 @@
+import unittest
+import tempfile
+import shutil
+import json
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.mock_server import MockKiwoomServer
+from api.kiwoom import KiwoomAPI
+from bot.order_manager import OrderManager
+
+
+class TestOrderManager(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.log = os.path.join(self.dir, "orders.jsonl")
+        self.server = MockKiwoomServer(latency=0.05, history_days=5, fill_delay=0.2).start()
+        self.fills, self.rejects = [], []
+        self.manager = OrderManager(KiwoomAPI(base_url=self.server.base_url), on_fill=self.fills.append,
+                                    on_reject=self.rejects.append, poll_interval=0.05, fill_timeout=5, log_file=self.log)
+
+    def tearDown(self):
+        self.manager.shutdown()
+        self.server.stop()
+        shutil.rmtree(self.dir)
+
+    def test_submit_does_not_block_and_fills_are_confirmed(self):
+        codes = ["005930", "000660", "035420"]
+        start = time.monotonic()
+        records = [self.manager.submit(code, "BUY", 1, 0, "test") for code in codes]
+        # Three round-trips of 50 ms each would take 150 ms if sent inline
+        self.assertLess(time.monotonic() - start, 0.05)
+        self.assertTrue(all(self.manager.has_open(code) for code in codes))
+
+        self.assertTrue(self.manager.wait(timeout=5))
+        self.assertEqual([r['status'] for r in records], ["filled"] * 3)
+        self.assertEqual(sorted(r['code'] for r in self.fills), sorted(codes))
+        for record in records:
+            self.assertEqual(record['filled_qty'], 1)
+            self.assertEqual(record['fill_price'], self.server.last_price(record['code']))
+            self.assertLess(record['t_signal'], record['t_ack'])
+            self.assertLess(record['t_ack'], record['t_fill'])
+
+        with open(self.log, encoding="utf-8") as f:
+            entries = [json.loads(line) for line in f]
+        self.assertEqual(len(entries), 3)
+        for entry in entries:
+            self.assertGreaterEqual(entry['fill_ms'], 200)
+            self.assertLess(entry['ack_ms'], entry['fill_ms'])
+
+    def test_rejected_order(self):
+        record = self.manager.submit("005930", "SELL", 10, 0, "test") # Nothing held
+        self.assertTrue(self.manager.wait(timeout=5))
+        self.assertEqual(record['status'], "rejected")
+        self.assertEqual(self.rejects, [record])
+        self.assertEqual(self.fills, [])
+
+    def test_unfilled_order_cancelled_at_timeout(self):
+        self.server.fill_delay = 60
+        self.manager.fill_timeout = 0.2
+        record = self.manager.submit("005930", "BUY", 1, 0, "test")
+        self.assertTrue(self.manager.wait(timeout=5))
+        self.assertEqual(record['status'], "cancelled")
+        self.assertEqual(record['filled_qty'], 0)
+        self.assertEqual(self.rejects, [record])
+        self.assertEqual(self.server.stats['cancels'], 1)
+        self.assertEqual(self.server.broker.holdings, {})
+
+    def test_fill_after_timeout_is_kept(self):
+        # The fill lands after the timeout but before the cancel takes effect
+        self.server.fill_delay = 0.5
+        self.server.cancel_delay = 0.5
+        self.manager.fill_timeout = 0.2
+        record = self.manager.submit("005930", "BUY", 1, 0, "test")
+        self.assertTrue(self.manager.wait(timeout=5))
+        self.assertEqual(record['status'], "filled")
+        self.assertEqual(self.fills, [record])
+        self.assertEqual(self.rejects, [])
+        self.assertEqual(record['filled_qty'], 1)
+        self.assertLess(record['t_cancel'], record['t_fill'])
+        self.assertGreaterEqual(self.server.stats['requests.kt10003'], 1)
+        self.assertEqual(self.server.broker.holdings, {"005930": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import tempfile
+import shutil
+import time
+import sys
+import os
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from api.mock_server import MockKiwoomServer
+from bot.price_monitor import PriceMonitor, LocalPriceFeed
+from bot.trader import TradingBot
+from utils.telegram_bot import TelegramBot
+
+CODE = "005930"
+
+
+class TestPriceMonitor(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.mkdtemp()
+        os.chdir(self.dir)
+        self.server = MockKiwoomServer(page_size=200, history_days=5, fill_delay=0.1).start()
+        self.override = settings.BASE_URL_OVERRIDE
+        settings.BASE_URL_OVERRIDE = self.server.base_url
+        self.bot = TradingBot()
+        self.bot.telegram = TelegramBot(None, None)
+        self.bot.order_manager.poll_interval = 0.05
+
+        # A position held at the broker and in the bot
+        self.entry = self.server.last_price(CODE)
+        self.server.broker.fill("BUY", CODE, 10, self.entry)
+        self.bot.positions[CODE] = {'price': self.entry, 'qty': 10, 'time': datetime.now().isoformat()}
+        self.profile = self.bot.profiles.get(CODE)
+
+    def tearDown(self):
+        self.bot.price_monitor.stop()
+        self.bot.order_manager.shutdown()
+        settings.BASE_URL_OVERRIDE = self.override
+        self.server.stop()
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir)
+
+    def price_at(self, pct):
+        return int(self.entry * (1 + pct / 100))
+
+    def test_stop_loss_from_polled_price(self):
+        monitor = PriceMonitor(self.bot)
+        self.assertEqual(monitor.check_once(), [])
+
+        self.server.set_price(CODE, self.price_at(self.profile.stop_loss_pct - 1))
+        self.assertEqual(monitor.check_once(), [CODE])
+        self.assertEqual(monitor.check_once(), []) # Sell in flight
+        self.assertTrue(self.bot.order_manager.wait(timeout=5))
+
+        self.assertNotIn(CODE, self.bot.positions)
+        self.assertIn("Stop Loss", self.bot.last_exits[CODE]['reason'])
+        self.assertEqual(self.server.broker.holdings, {})
+        # Current-price requests only: no chart downloads
+        self.assertEqual(self.server.stats['requests.ka10001'], 2)
+        self.assertEqual(self.server.stats['requests.ka10080'], 0)
+
+    def test_thresholds_with_local_feed(self):
+        feed = LocalPriceFeed({CODE: self.price_at(0.5)})
+        monitor = PriceMonitor(self.bot, feed)
+        self.assertEqual(monitor.check_once(), [])
+
+        feed.set(CODE, self.price_at(self.profile.take_profit_pct + 1))
+        self.assertEqual(monitor.check_once(), [CODE])
+        self.assertTrue(self.bot.order_manager.wait(timeout=5))
+        self.assertEqual(self.bot.last_exits[CODE]['reason'], "Take Profit")
+        # Nothing left to watch: no price request
+        self.assertEqual(monitor.check_once(), [])
+        self.assertEqual(feed.requests, 2)
+
+    def test_background_thread(self):
+        self.bot.is_market_open = lambda: True
+        feed = LocalPriceFeed({CODE: self.price_at(self.profile.stop_loss_pct - 1)})
+        self.bot.price_monitor = PriceMonitor(self.bot, feed, interval=0.05)
+        self.bot.price_monitor.start()
+        deadline = time.monotonic() + 5
+        while CODE in self.bot.positions and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.bot.price_monitor.stop()
+        self.assertNotIn(CODE, self.bot.positions)
+        self.assertEqual(self.server.stats['orders'], 1) # One sell
+
+
+if __name__ == '__main__':
+    unittest.main()
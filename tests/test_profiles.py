@@ -0,0 +1,162 @@
+import unittest
+import logging
+import argparse
+import tempfile
+import shutil
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import settings
+from config.profiles import ProfileRegistry, load_profiles, settings_defaults, settings_symbols
+from api.mock_server import synthetic_bars
+from backtester.results_db import ResultsDB
+from data.data_manager import DataManager
+from backtester.engine import BacktestEngine
+from backtester.batch_engine import BatchBacktestEngine
+from strategy.rsi_macd import RsiMacdStrategy
+from tests.test_exit_scan import make_hourly_bars
+
+logging.getLogger("Backtester").setLevel(logging.WARNING)
+
+
+class TestProfileRegistry(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write_toml(self, text):
+        path = os.path.join(self.dir, "profiles.toml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_compiled_from_settings(self):
+        registry = ProfileRegistry.from_settings()
+        self.assertEqual(list(registry.targets), list(settings.TARGET_STOCKS))
+        for code in settings.TARGET_STOCKS:
+            profile = registry.get(code)
+            self.assertEqual(profile.timeframe, settings.TIMEFRAME_MAP.get(code, "60"))
+            self.assertEqual(profile.rsi_oversold, settings.RSI_OVERSOLD_MAP.get(code, settings.RSI_OVERSOLD))
+            self.assertEqual(profile.market_type, settings.MARKET_TYPE_MAP.get(code, "KOSPI"))
+            self.assertEqual(profile.stop_loss_pct, settings.STOP_LOSS_PCT)
+
+    def test_unknown_code_gets_defaults(self):
+        profile = ProfileRegistry.from_settings().get("999999")
+        self.assertNotIn("999999", ProfileRegistry.from_settings())
+        self.assertEqual(profile.code, "999999")
+        self.assertEqual(profile.rsi_oversold, settings.RSI_OVERSOLD)
+        self.assertEqual(profile.cooldown_days, settings.STOP_LOSS_COOLDOWN_DAYS)
+
+    def test_toml_overlay(self):
+        path = self.write_toml(
+            '[defaults]\nstop_loss_pct = -4.0\n\n'
+            '[symbols."005930"]\nrsi_oversold = 61\ntimeframe = "90"\n\n'
+            '[symbols."123456"]\nname = "신규종목"\ntarget = true\nmarket_type = "KOSDAQ"\n')
+        registry = ProfileRegistry.from_toml(path)
+        self.assertEqual(registry.get("005930").rsi_oversold, 61)
+        self.assertEqual(registry.get("005930").timeframe, "90")
+        self.assertEqual(registry.get("005930").stop_loss_pct, -4.0)
+        self.assertEqual(registry.get("000660").stop_loss_pct, -4.0)
+        self.assertEqual(registry.get("123456").market_type, "KOSDAQ")
+        self.assertEqual(registry.targets[-1], "123456")
+
+    def test_all_errors_reported(self):
+        path = self.write_toml(
+            '[symbols."005930"]\nrsi_oversold = 120\ntimeframe = "45"\n\n'
+            '[symbols."000660"]\nmarket_type = "NYSE"\nmax_hold_days = 20\n\n'
+            '[symbols."12345"]\nname = "x"\nfoo = 1\n')
+        with self.assertRaises(ValueError) as ctx:
+            ProfileRegistry.from_toml(path)
+        message = str(ctx.exception)
+        for fragment in ("005930: rsi_oversold", "005930: timeframe '45'", "000660: market_type 'NYSE'",
+                         "000660: need 0 <= max_hold_days", "12345: unknown field 'foo'"):
+            self.assertIn(fragment, message)
+
+    def test_invalid_exit_parameters(self):
+        with self.assertRaises(ValueError):
+            ProfileRegistry.from_settings(overrides={'take_profit_pct': -1.0})
+        with self.assertRaises(ValueError):
+            ProfileRegistry(settings_defaults(), settings_symbols(), overrides={'cooldown_days': "soon"})
+
+
+class TestEngineProfiles(unittest.TestCase):
+    def test_engines_use_symbol_profile(self):
+        df = make_hourly_bars()
+        registry = ProfileRegistry.from_settings(overrides={'stop_loss_pct': -1.5, 'max_hold_days': 1})
+
+        engine = BacktestEngine(RsiMacdStrategy(), profiles=registry)
+        result = engine.run(df, "005930", save_results=False)
+        self.assertEqual(engine.stop_loss_pct, -1.5)
+        self.assertEqual(engine.max_hold_days, 1)
+
+        # Same as passing the parameters explicitly
+        explicit = BacktestEngine(RsiMacdStrategy(), stop_loss_pct=-1.5, max_hold_days=1)
+        self.assertEqual(explicit.run(df, "005930", save_results=False), result)
+        self.assertEqual(BatchBacktestEngine(RsiMacdStrategy(), [{}], profiles=registry).run(df, "005930")[0], result)
+
+    def test_backtest_follows_profile_timeframe(self):
+        import main
+        cwd = os.getcwd()
+        directory = tempfile.mkdtemp()
+        os.chdir(directory)
+        try:
+            with open("profiles.toml", "w", encoding="utf-8") as f:
+                f.write('[symbols."005930"]\nname = "보정종목"\ntimeframe = "30"\n')
+            dm = DataManager(use_api=False)
+            synthetic_bars("005930", "30", days=120).to_csv(dm._get_filename("005930", "30"), index=False)
+            load_profiles("profiles.toml")
+            main.run_backtest("005930", full=True)
+            # The optimizers tune on the same bars
+            args = argparse.Namespace(min_profit=1.0, max_profit=2.0, step_profit=1.0, run_id=None, new_run=False,
+                                      resume=False)
+            main.run_min_profit_optimize("005930", args)
+            with ResultsDB() as db:
+                self.assertEqual(db.latest_run("005930")['timeframe'], "30")
+                optimized = db.runs(code="005930", kind="optimize")
+                self.assertEqual([run['timeframe'] for run in optimized], ["30", "30"])
+            summary = [f for f in os.listdir("backtest_results") if f.startswith("summary_005930")]
+            with open(os.path.join("backtest_results", summary[0]), encoding="utf-8") as f:
+                self.assertIn("보정종목(005930)", f.read())
+        finally:
+            load_profiles(reload=True)
+            os.chdir(cwd)
+            shutil.rmtree(directory)
+
+    def test_timeframe_comparison_ignores_calibrated_exits(self):
+        import compare_timeframes
+        cwd = os.getcwd()
+        directory = tempfile.mkdtemp()
+        os.chdir(directory)
+        try:
+            with open("profiles.toml", "w", encoding="utf-8") as f:
+                f.write('[symbols."005930"]\nstop_loss_pct = -1.0\ntake_profit_pct = 2.0\n')
+            dm = DataManager(use_api=False)
+            df = synthetic_bars("005930", "30", days=120)
+            df.to_csv(dm._get_filename("005930", "30"), index=False)
+            load_profiles("profiles.toml")
+            _, _, result = compare_timeframes.backtest_pair("005930", "30")
+            # The stated scenario, not the calibrated -1% / +2% exits
+            engine = BacktestEngine(RsiMacdStrategy(), stop_loss_pct=-5.0, take_profit_pct=12.0, max_hold_days=5,
+                                    max_hold_max_days=10, min_profit_yield=3.0,
+                                    profiles=ProfileRegistry.from_settings(overrides={'cooldown_days': 3}))
+            engine.initial_capital = 1000000
+            self.assertEqual(result, engine.run_fast(df, "005930", save_results=False, time_unit="30"))
+        finally:
+            load_profiles(reload=True)
+            os.chdir(cwd)
+            shutil.rmtree(directory)
+
+    def test_explicit_parameters_win(self):
+        registry = ProfileRegistry.from_settings(overrides={'rsi_oversold': 40, 'take_profit_pct': 5.0})
+        engine = BacktestEngine(RsiMacdStrategy(), rsi_oversold=65, take_profit_pct=9.0, profiles=registry)
+        engine.run_fast(make_hourly_bars(), "005930", save_results=False)
+        self.assertEqual(engine.get_params()['rsi_oversold'], 65)
+        self.assertEqual(engine.take_profit_pct, 9.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
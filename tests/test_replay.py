@@ -0,0 +1,95 @@
+import unittest
+import logging
+import tempfile
+import shutil
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.profiles import ProfileRegistry, settings_defaults
+from api.mock_server import synthetic_bars
+from bot.replay import ReplayBroker, ReplayClock, replay, parity_check, compare_trades
+
+logging.getLogger("Backtester").setLevel(logging.WARNING)
+logging.getLogger("TradingBot").setLevel(logging.WARNING)
+
+END = datetime(2026, 3, 13)
+
+
+def profiles(**fields):
+    symbols = {"035420": {'name': "NAVER", 'target': True, 'timeframe': "60", 'rsi_oversold': 50}}
+    symbols["035420"].update(fields)
+    return ProfileRegistry(settings_defaults(), symbols)
+
+
+class TestReplay(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.dir = tempfile.mkdtemp()
+        os.chdir(self.dir) # BacktestEngine creates backtest_results/
+        self.profiles = profiles()
+        self.df = synthetic_bars("035420", "60", days=180, end=END)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.dir)
+
+    def test_broker_serves_closed_bars(self):
+        clock = ReplayClock(datetime(2026, 3, 12, 10, 59))
+        broker = ReplayBroker({"035420": self.df}, clock, self.profiles)
+        self.assertEqual(broker.get_ohlcv_frame("035420")['time'].iloc[-1], "20260312090000")
+        clock.set(datetime(2026, 3, 12, 11, 0))
+        frame = broker.get_ohlcv_frame("035420")
+        self.assertEqual(frame['time'].iloc[-1], "20260312100000")
+        self.assertEqual(broker.get_current_price("035420"), frame['close'].iloc[-1])
+
+        clock.set(datetime(2026, 3, 12, 15, 30)) # The 15:00 bar ends at the close
+        self.assertEqual(broker.get_ohlcv_frame("035420")['time'].iloc[-1], "20260312150000")
+
+    def test_matches_backtest(self):
+        result = parity_check("035420", self.df, self.profiles)
+        self.assertGreater(result['backtest'], 3)
+        self.assertEqual(result['mismatches'], [])
+        self.assertEqual(result['matched'], result['backtest'])
+
+    def test_trades_aligned_by_entry_bar(self):
+        def trade(entry, exit, qty, reason="Take Profit"):
+            return {'entry_time': entry, 'exit_time': exit, 'entry_price': 100, 'exit_price': 110,
+                    'qty': qty, 'reason': reason}
+        # The backtest has one early trade the bot skipped; later sizes differ with the capital
+        expected = [trade("20260302090000", "20260302130000", 9), trade("20260303090000", "20260303110000", 10),
+                    trade("20260304090000", "20260304140000", 11)]
+        got = [trade("20260303090000", "20260303110000", 9), trade("20260304090000", "20260304140000", 9),
+               trade("20260305090000", "20260305100000", 9, "Stop Loss")]
+        matched, mismatches = compare_trades(expected, got)
+        self.assertEqual(matched, 2)
+        self.assertEqual([(t, a is None, b is None) for t, a, b in mismatches],
+                         [("20260302090000", False, True), ("20260305090000", True, False)])
+        # Before any divergence the quantity must agree too
+        matched, mismatches = compare_trades(expected[1:], got[:2])
+        self.assertEqual((matched, [t for t, _, _ in mismatches]), (1, ["20260303090000"]))
+
+    def test_replay_runs_bot_on_simulated_clock(self):
+        result = replay({"035420": self.df}, self.profiles)
+        self.assertEqual(result['steps'], len(self.df))
+        self.assertTrue(result['trades'])
+        # Fill notices went to the notifier; positions carry replayed times
+        fills = [m for m in result['messages'] if " BUY: " in m or " SELL: " in m]
+        self.assertEqual(len(fills), len(result['orders']))
+        for position in result['open_positions'].values():
+            self.assertLess(datetime.fromisoformat(position['time']), END + timedelta(days=1))
+        for trade in result['trades']:
+            self.assertLess(trade['entry_time'], trade['exit_time'])
+
+    def test_live_schedule(self):
+        result = replay({"035420": self.df}, self.profiles, schedule="live",
+                        start=datetime(2026, 3, 9), end=datetime(2026, 3, 14))
+        self.assertEqual(result['steps'], 5 * 7) # 09:01 ~ 15:01 on five sessions
+        for order in result['orders']:
+            self.assertEqual(order['time'].minute, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
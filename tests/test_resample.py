@@ -0,0 +1,64 @@
+import unittest
+import numpy as np
+import pandas as pd
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.resample import resample_bars
+
+
+def make_30m_bars(days=3):
+    # 13 bars per session: 09:00, 09:30, ..., 15:00 (start labels)
+    dates = pd.bdate_range('2025-03-04', periods=days)
+    times = [d + pd.Timedelta(minutes=9 * 60 + 30 * k) for d in dates for k in range(13)]
+    n = len(times)
+    close = 10000 + np.arange(n) * 10
+    return pd.DataFrame({
+        'time': [int(t.strftime("%Y%m%d%H%M%S")) for t in times],
+        'open': close - 5, 'high': close + 20, 'low': close - 20, 'close': close,
+        'volume': np.arange(1, n + 1)
+    })
+
+
+class TestResample(unittest.TestCase):
+    def test_30m_to_60m_session_aligned(self):
+        df = make_30m_bars()
+        out = resample_bars(df, 60)
+
+        self.assertEqual(len(out), 3 * 7)
+        self.assertEqual(out['time'].iloc[0], 20250304090000)
+        self.assertEqual(out['time'].iloc[6], 20250304150000)
+        # 09:00 bar = 09:00 + 09:30 bars
+        first = out.iloc[0]
+        self.assertEqual(first['open'], df['open'].iloc[0])
+        self.assertEqual(first['close'], df['close'].iloc[1])
+        self.assertEqual(first['high'], df['high'].iloc[:2].max())
+        self.assertEqual(first['volume'], df['volume'].iloc[:2].sum())
+        # 15:00 bar holds only the 15:00 ~ 15:30 period
+        self.assertEqual(out['volume'].iloc[6], df['volume'].iloc[12])
+        self.assertEqual(out['volume'].sum(), df['volume'].sum())
+
+    def test_string_times_and_unsorted_input(self):
+        df = make_30m_bars(1)
+        df['time'] = df['time'].astype(str)
+        out = resample_bars(df.iloc[::-1], 120)
+        self.assertEqual(list(out['time']), ["20250304090000", "20250304110000", "20250304130000", "20250304150000"])
+        self.assertEqual(out['open'].iloc[0], df['open'].iloc[0])
+        self.assertEqual(out['close'].iloc[0], df['close'].iloc[3])
+
+    def test_daily_bars_skip_holidays(self):
+        df = make_30m_bars(3)
+        # Same session shifted onto the 2025-03-03 substitute holiday
+        holiday = df.iloc[:13].copy()
+        holiday['time'] = holiday['time'] - 1000000
+        out = resample_bars(pd.concat([holiday, df]), "D")
+
+        self.assertEqual(list(out['time']), [20250304090000, 20250305090000, 20250306090000])
+        self.assertEqual(out['volume'].iloc[0], df['volume'].iloc[:13].sum())
+        self.assertEqual(out['close'].iloc[2], df['close'].iloc[-1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import tempfile
+import shutil
+import os
+import sys
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester.results_db import ResultsDB
+
+
+class TestResultsDB(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.db = ResultsDB(os.path.join(self.dir, "results.db"))
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.dir)
+
+    def test_record_and_query_trades(self):
+        trades = [{
+            'entry_time': datetime(2025, 1, 14, 14), 'exit_time': datetime(2025, 1, 20, 9),
+            'entry_price': 4545.0, 'exit_price': 4445.0, 'qty': 219,
+            'pnl': -23947, 'pnl_pct': -2.41, 'reason': 'Stop Loss'
+        }]
+        run_id = self.db.record_run("backtest", "014710", "60", {'rsi_oversold': 48},
+                                    {'return': -2.4, 'total_trades': 1, 'trend': 'UPTREND'}, trades=trades)
+
+        latest = self.db.latest_run("014710")
+        self.assertEqual(latest['id'], run_id)
+        self.assertEqual(latest['params']['rsi_oversold'], 48)
+        self.assertNotIn('trend', latest['metrics'])
+        self.assertEqual(self.db.trades(run_id)[0]['entry_time'], "2025-01-14 14:00:00")
+
+    def test_best_runs_per_code(self):
+        for code, sl, ret in [("014710", -2.5, 10.0), ("014710", -3.0, 25.0), ("005930", -1.0, 5.0)]:
+            self.db.record_run("optimize", code, "60", {'stop_loss_pct': sl}, {'return': ret})
+        self.db.record_run("optimize", "014710", "60", {'stop_loss_pct': -9.0}, {'return': 99.0},
+                           created_at="2020-01-01 00:00:00")
+
+        best = {r['code']: r for r in self.db.best_runs(kind="optimize", since="2025-01-01 00:00:00")}
+        self.assertEqual(best["014710"]['params']['stop_loss_pct'], -3.0)
+        self.assertEqual(best["005930"]['metric_value'], 5.0)
+
+        best_all = {r['code']: r for r in self.db.best_runs(kind="optimize")}
+        self.assertEqual(best_all["014710"]['metric_value'], 99.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import tempfile
+import shutil
+import time
+import sys
+import os
+from datetime import datetime
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config.profiles import ProfileRegistry, settings_defaults
+from api.mock_server import synthetic_bars
+from data.bar_store import parse_bar_times
+from data.data_manager import DataManager
+from strategy.rsi_macd import RsiMacdStrategy
+from strategy import indicators
+from strategy.screener import compact, screen, screen_universe, MIN_BARS
+
+END = datetime(2026, 3, 13)
+
+
+def registry(codes):
+    # Thresholds spread over 40..69 so columns are checked against their own level
+    symbols = {code: {'name': code, 'target': True, 'rsi_oversold': 40 + i % 30} for i, code in enumerate(codes)}
+    return ProfileRegistry(settings_defaults(), symbols)
+
+
+class TestScreener(unittest.TestCase):
+    def setUp(self):
+        self.codes = [f"{i:06d}" for i in range(12)]
+        self.frames = {code: synthetic_bars(code, "60", days=400, end=END) for code in self.codes}
+        self.frames[self.codes[1]] = self.frames[self.codes[1]].tail(200) # Listed later
+        self.frames[self.codes[2]] = self.frames[self.codes[2]].head(1500) # Not updated since
+        halted = self.frames[self.codes[3]]
+        self.frames[self.codes[3]] = halted.drop(halted.index[1117:1187]) # Ten sessions halted inside the window
+        self.profiles = registry(self.codes)
+
+    def test_matches_per_symbol_entry_rule(self):
+        result = screen(self.frames, "60", self.profiles, history=1000)
+        strategy = RsiMacdStrategy(backend="pandas")
+        for j, code in enumerate(result.codes):
+            df = self.frames[code]
+            expected = strategy.entry_signals(strategy.indicators(df), self.profiles.get(code).rsi_oversold)
+            expected[:MIN_BARS - 1] = False # generate_signal holds below 35 bars
+            times = parse_bar_times(df['time'].values)
+            shown = np.isin(times, result.times)
+            got = result.signals[np.searchsorted(result.times, times[shown]), j]
+            np.testing.assert_array_equal(got, expected[shown], err_msg=code)
+
+        stale = result.codes.index(self.codes[2])
+        self.assertFalse(result.signals[-1, stale]) # No bar on the last row: never current
+        halted = result.codes.index(self.codes[3])
+        resumed = np.searchsorted(result.times, parse_bar_times(self.frames[self.codes[3]]['time'].values[1117:1118]))[0]
+        self.assertTrue(result.signals[resumed:, halted].any()) # Signals after the gap are checked above
+        self.assertEqual(result.frequency.set_index('code').loc[self.codes[1], 'bars'], 200)
+
+    def test_indicators_follow_own_bars_across_gaps(self):
+        closes = [self.frames[code]['close'].to_numpy(dtype=np.float64)[-600:] for code in self.codes[3:5]]
+        close = np.column_stack(closes)
+        present = np.ones(close.shape, dtype=bool)
+        present[200:260, 0] = False # Halted
+        present[:90, 1] = False # Listed later
+        close[~present] = np.nan
+        own, rows, cols, slots = compact(close, present)
+        histogram = indicators.macd(own)[2]
+        for j in range(2):
+            expected = indicators.macd(close[present[:, j], j])[2]
+            np.testing.assert_allclose(histogram[slots[cols == j], j], expected, rtol=0, atol=1e-9)
+
+    def test_current_set_matches_generate_signal(self):
+        fired = 0
+        for end in (datetime(2026, 3, 10), datetime(2026, 3, 11), datetime(2026, 3, 12), END):
+            frames = {code: df[parse_bar_times(df['time'].values) < np.datetime64(end, 's').astype(np.int64)]
+                      for code, df in self.frames.items()}
+            result = screen(frames, "60", self.profiles, history=100)
+            current = {item['code'] for item in result.current}
+            strategy = RsiMacdStrategy()
+            expected = {code for code, df in frames.items()
+                        if df['time'].iloc[-1] == frames[self.codes[0]]['time'].iloc[-1]
+                        and strategy.generate_signal(df, self.profiles.get(code).rsi_oversold)['action'] == "BUY"}
+            self.assertEqual(current, expected)
+            fired += len(current)
+        self.assertGreater(fired, 0)
+
+    def test_stored_universe(self):
+        cwd = os.getcwd()
+        directory = tempfile.mkdtemp()
+        os.chdir(directory)
+        try:
+            dm = DataManager(use_api=False)
+            for code in ("005930", "000660"):
+                synthetic_bars(code, "30", days=120, end=END).to_csv(dm._get_filename(code, "30"), index=False)
+            profiles = ProfileRegistry(settings_defaults(), {
+                "005930": {'name': "삼성전자", 'target': True, 'timeframe': "30"},
+                "000660": {'name': "SK하이닉스", 'target': True, 'timeframe': "60"},
+            })
+            results = screen_universe(dm, profiles=profiles)
+            self.assertEqual([(r.timeframe, r.codes) for r in results], [("30", ["005930"]), ("60", ["000660"])])
+            forced = screen_universe(dm, timeframe="30", profiles=profiles)
+            self.assertEqual(forced[0].codes, ["000660", "005930"])
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(directory)
+
+    def test_full_listing(self):
+        base = synthetic_bars("000000", "60", days=300, end=END)
+        rng = np.random.default_rng(0)
+        codes = [f"{i:06d}" for i in range(2000)]
+        frames = {}
+        for code in codes:
+            df = base.copy()
+            df['close'] = np.round(20000 * np.exp(np.cumsum(rng.normal(0, 0.006, len(df)))), -1)
+            frames[code] = df
+        began = time.perf_counter()
+        result = screen(frames, "60", registry(codes))
+        elapsed = time.perf_counter() - began
+        self.assertEqual(result.signals.shape, (1000, len(codes)))
+        self.assertLess(elapsed, 20) # Typically about a second
+        self.assertTrue(result.frequency['signals'].gt(0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
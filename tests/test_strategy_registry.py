@@ -0,0 +1,52 @@
+import unittest
+import logging
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backtester.engine import BacktestEngine
+from backtester.batch_engine import BatchBacktestEngine, run_strategies
+from strategy.registry import IndicatorCache, available_strategies, get_strategy
+from tests.test_exit_scan import make_hourly_bars
+
+logging.getLogger("Backtester").setLevel(logging.WARNING)
+logging.getLogger("BatchBacktester").setLevel(logging.WARNING)
+
+
+class TestStrategyRegistry(unittest.TestCase):
+    def test_registry(self):
+        self.assertIn("rsi_macd", available_strategies())
+        self.assertIn("ema_trend", available_strategies())
+        self.assertEqual(get_strategy("rsi_macd", rsi_period=9).rsi_period, 9)
+        with self.assertRaises(ValueError):
+            get_strategy("no_such_strategy")
+
+    def test_shared_indicators(self):
+        df = make_hourly_bars(300)
+        cache = IndicatorCache(df)
+        for name in ["rsi_macd", "ema_trend"]:
+            get_strategy(name).indicators(df, cache=cache)
+        # rsi, macd, ema 12, ema 26: the EMAs behind MACD are reused by ema_trend
+        self.assertEqual(cache.computed, 4)
+
+    def test_strategy_exit_rule_engines_agree(self):
+        df = make_hourly_bars()
+        params = dict(stop_loss_pct=-3.0, take_profit_pct=8.0)
+
+        slow = BacktestEngine(get_strategy("ema_trend"), **params)
+        res_slow = slow.run(df, "005930", save_results=False)
+        self.assertTrue(any(t['reason'] == "Strategy Exit" for t in slow.trades))
+
+        results = run_strategies(df, [get_strategy("rsi_macd"), get_strategy("ema_trend")], "005930", **params)
+        res_fast, fast = results["ema_trend"]
+        self.assertEqual(fast.trades, slow.trades)
+        self.assertEqual(res_fast, res_slow)
+
+        batch = BatchBacktestEngine(get_strategy("ema_trend"), [params])
+        self.assertEqual(batch.run(df, "005930")[0], res_slow)
+        self.assertEqual(batch.trades[0], slow.trades)
+
+
+if __name__ == '__main__':
+    unittest.main()
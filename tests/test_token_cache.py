@@ -0,0 +1,118 @@
+import unittest
+import tempfile
+import shutil
+import time
+import json
+import sys
+import os
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.mock_server import MockKiwoomServer
+from api.kiwoom import KiwoomAPI, _library
+from api.token_cache import CachedTokenManager, cache_key
+
+
+class TestTokenCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, "cache", "token.json")
+        self.server = MockKiwoomServer(page_size=100, history_days=5).start()
+        # Points the library config (used by the token request) at the mock server
+        self.api = KiwoomAPI(base_url=self.server.base_url)
+        self.key = cache_key(self.server.base_url, "test-key")
+
+    def tearDown(self):
+        self.server.stop()
+        shutil.rmtree(self.dir)
+
+    def manager(self, **kwargs):
+        # A new instance per call stands in for another process sharing the file
+        return CachedTokenManager(_library().TokenManager(), self.key, self.path, **kwargs)
+
+    def test_concurrent_processes_share_one_token(self):
+        managers = [self.manager() for _ in range(6)]
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            tokens = list(pool.map(lambda m: m.get_token(), managers))
+
+        self.assertEqual(len(set(tokens)), 1)
+        self.assertEqual(self.server.stats['requests.token'], 1)
+        self.assertEqual(sum(m.issued_count for m in managers), 1)
+        # A later process reuses it from disk
+        self.assertEqual(self.manager().get_token(), tokens[0])
+        self.assertEqual(self.server.stats['requests.token'], 1)
+
+    def test_token_replaced_inside_refresh_margin(self):
+        first = self.manager().get_token()
+        # Every token is "about to expire" with a margin longer than its 24h lifetime
+        late = self.manager(refresh_margin=2 * 86400)
+        self.assertNotEqual(late.get_token(), first)
+        self.assertEqual(self.server.stats['requests.token'], 2)
+
+    def test_force_refresh_and_invalidate(self):
+        manager = self.manager()
+        first = manager.get_token()
+        second = manager.refresh(force=True)
+        self.assertNotEqual(second, first)
+        self.assertEqual(self.manager().get_token(), second)
+
+        manager.invalidate()
+        self.assertNotEqual(self.manager().get_token(), second)
+        self.assertEqual(self.server.stats['requests.token'], 3)
+
+    def test_failed_issue_is_not_cached(self):
+        manager = self.manager()
+        rejected = {'return_code': 3, 'return_msg': "Invalid app key"}
+        with mock.patch.object(manager.issuer, '_request_new_token',
+                               side_effect=lambda: manager.issuer._update_token_info(rejected)):
+            with self.assertRaises(RuntimeError):
+                manager.get_token()
+        self.assertFalse(os.path.exists(self.path))
+        # Another process issues its own token instead of reading a None one
+        other = self.manager()
+        self.assertTrue(other.get_token())
+        self.assertEqual(other.issued_count, 1)
+        self.assertEqual(manager.get_token(), other.get_token())
+
+        # A tokenless entry left in the file by an older version counts as missing
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({self.key: {'token': None, 'expires': time.time() + 3600}}, f)
+        self.assertTrue(self.manager().get_token())
+        self.assertEqual(self.server.stats['requests.token'], 2)
+
+    def test_background_refresh(self):
+        manager = self.manager()
+        manager.get_token()
+        # Due for refresh about one second from now
+        manager.refresh_margin = manager.expires - time.time() - 1.0
+        manager.start_auto_refresh()
+        deadline = time.time() + 10
+        while manager.issued_count < 2 and time.time() < deadline:
+            time.sleep(0.1)
+        manager.stop_auto_refresh()
+        self.assertEqual(manager.issued_count, 2)
+
+    def test_rejected_token_is_reissued(self):
+        self.assertEqual(len(self.api.get_ohlcv("005930", "60", days=5)), len(self.server.bars("005930", "60")))
+        self.server._tokens.clear() # Server-side revocation
+        self.assertEqual(self.api.get_ohlcv("005930", "60", days=5), [])
+        self.assertEqual(self.server.stats['unauthorized'], 1)
+        self.assertTrue(self.api.get_ohlcv("005930", "60", days=5))
+        self.assertEqual(self.server.stats['requests.token'], 2)
+
+    def test_issuer_uses_its_own_credentials(self):
+        keys = {'APP_KEY_PAPER': "paper-key", 'APP_SECRET_PAPER': "paper-secret",
+                'APP_KEY_REAL': "real-key", 'APP_SECRET_REAL': "real-secret"}
+        with mock.patch.dict(os.environ, keys):
+            paper = KiwoomAPI(mode="PAPER", base_url=self.server.base_url)
+            # Switches the library's global config to the REAL key
+            real = KiwoomAPI(mode="REAL", base_url=self.server.base_url)
+        self.assertEqual(_library().config.API_KEY, "real-key")
+        self.assertEqual(self.server.token_keys[paper.token_manager.get_token()], "paper-key")
+        self.assertEqual(self.server.token_keys[real.token_manager.get_token()], "real-key")
+
+
+if __name__ == '__main__':
+    unittest.main()
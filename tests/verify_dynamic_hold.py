@@ -9,6 +9,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from bot.trader import TradingBot
 from config import settings
+from config.profiles import ProfileRegistry
 
 class TestDynamicHolding(unittest.TestCase):
     def setUp(self):
@@ -30,7 +31,9 @@ class TestDynamicHolding(unittest.TestCase):
         
         # Initialize Bot with mocks
         with patch('bot.trader.KiwoomAPI'), patch('bot.trader.TelegramBot'), patch('bot.trader.setup_logger'):
-            self.bot = TradingBot()
+            self.bot = TradingBot(profiles=ProfileRegistry.from_settings(settings, overrides={
+                'stop_loss_pct': -5.0, 'take_profit_pct': 12.0, 'max_hold_days': 5,
+                'max_hold_max_days': 10, 'min_profit_yield': 1.0}))
             
         # Mock execute_sell to track calls
         self.bot.execute_sell = MagicMock()
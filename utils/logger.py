@@ -18,7 +18,8 @@ def setup_logger(name="RequestLogger"):
             os.makedirs(log_dir)
             
         today = datetime.now().strftime("%Y%m%d")
-        fh = logging.FileHandler(f"{log_dir}/bot_{today}.log")
+        # delay: the file is opened on the first record, not at import time
+        fh = logging.FileHandler(f"{log_dir}/bot_{today}.log", delay=True)
         fh.setLevel(logging.DEBUG)
 
         # Create formatter
@@ -1,6 +1,9 @@
 from datetime import timedelta
+import numpy as np
 from config.holidays import MARKET_HOLIDAYS
 
+_HOLIDAYS = np.array(sorted(MARKET_HOLIDAYS), dtype='datetime64[D]')
+
 def get_trading_days_diff(start_date, end_date):
     """
     Calculate the number of trading days between start_date and end_date.
@@ -45,3 +48,23 @@ def get_trading_days_diff(start_date, end_date):
         trading_days += 1
         
     return trading_days
+
+def trading_day_ordinals(dates):
+    """
+    Vectorized trading-day ordinal for each date: the number of trading days
+    (weekdays not in MARKET_HOLIDAYS) from 2000-01-01 up to and including it.
+
+    For any two dates, ordinal(end) - ordinal(start) == get_trading_days_diff(start, end)
+    when end >= start, so holding periods and cooldowns can be compared as integers.
+    dates: array-like of datetimes / datetime64 values.
+    """
+    days = np.asarray(dates, dtype='datetime64[D]')
+    return np.busday_count(np.datetime64('2000-01-01'), days + np.timedelta64(1, 'D'), holidays=_HOLIDAYS)
+
+def is_trading_day(dates):
+    """
+    Vectorized check for KRX trading days (weekdays not in MARKET_HOLIDAYS).
+    dates: a single date/datetime or an array-like of them.
+    """
+    days = np.asarray(dates, dtype='datetime64[D]')
+    return np.is_busday(days, holidays=_HOLIDAYS)
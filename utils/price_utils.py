@@ -1,3 +1,5 @@
+import numpy as np
+
 def get_tick_size(price, market_type="KOSPI"):
     """
     Calculate the Tick Size (minimum price fluctuation) based on price range and market type.
@@ -38,3 +40,17 @@ def get_tick_size(price, market_type="KOSPI"):
                 return 500
             else:
                 return 1000
+
+def get_tick_sizes(prices, market_type="KOSPI"):
+    """
+    Vectorized get_tick_size for a numpy array of prices.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    bounds = [1000, 5000, 10000, 50000]
+    ticks = [1, 5, 10, 50]
+    if market_type == "KOSDAQ":
+        ticks.append(100)
+    else:
+        bounds += [100000, 500000]
+        ticks += [100, 500, 1000]
+    return np.array(ticks, dtype=np.float64)[np.searchsorted(bounds, prices, side='right')]
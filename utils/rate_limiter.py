@@ -0,0 +1,25 @@
+import threading
+import time
+
+
+class RateLimiter:
+    """
+    Thread-safe request spacing: at most `rate` calls per `per` seconds,
+    shared by every thread holding the same instance (one API quota).
+    """
+
+    def __init__(self, rate, per=1.0):
+        self.interval = per / rate
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until the caller's slot; returns the seconds waited."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        wait = slot - now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
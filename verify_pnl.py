@@ -1,20 +1,25 @@
 import pandas as pd
 import os
+from config import settings
+from backtester.results_db import ResultsDB
 
-# Update this path to the actual file generated in the previous step
-csv_file = "backtest_results/trades_014710_20260115_213213.csv" 
+# Prefer the latest backtest recorded in the results DB
+df = None
+if os.path.exists(settings.RESULTS_DB_PATH):
+    with ResultsDB() as db:
+        run = db.latest_run()
+        if run:
+            print(f"Using latest run from DB: #{run['id']} {run['code']} ({run['created_at']})")
+            df = pd.DataFrame(db.trades(run['id']))
 
-if not os.path.exists(csv_file):
-    print(f"File not found: {csv_file}")
-    # Try finding the latest file
-    files = sorted([f for f in os.listdir("backtest_results") if f.endswith(".csv")])
-    if files:
-        csv_file = os.path.join("backtest_results", files[-1])
-        print(f"Using latest file: {csv_file}")
-    else:
+if df is None or df.empty:
+    # Fallback: the latest trades file
+    files = sorted([f for f in os.listdir("backtest_results") if f.startswith("trades_") and f.endswith(".csv")])
+    if not files:
         exit(1)
-
-df = pd.read_csv(csv_file)
+    csv_file = os.path.join("backtest_results", files[-1])
+    print(f"Using latest file: {csv_file}")
+    df = pd.read_csv(csv_file)
 
 total_pnl = df['pnl'].sum()
 initial_capital = 1000000